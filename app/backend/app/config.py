@@ -8,17 +8,58 @@ class Settings(BaseSettings):
     TIMES_PER_APOSTADOR: int = 7
     MIN_TEAMS_PROTECTION: int = 20
     DISPLAY_COLUMN: str = "teamName"
+    SEASON_ROUNDS: int = 38
+
+    RANKING_SESSION_CACHE_SIZE: int = 8
+    RANKING_HISTORY_SIZE: int = 16
+
+    SIMULATION_RUNS: int = 5000
+    SIMULATION_CHUNK_SIZE: int = 500
+    SIMULATION_CHUNK_MB: int = 32
+    SIMULATION_WORKERS: int = 1
+    SIMULATION_SEED: int = 2026
 
     DATABASE_URL: str = "sqlite:///./bolao.db"
+    # "auto" tunes the pool/connections for the backend; "default" keeps SQLAlchemy's.
+    DB_ENGINE_PROFILE: str = "auto"
+    # Postgres (per worker process). Neon suspends idle compute after 5 min.
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 5
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 240
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_TIMEOUT_MS: int = 30000
+    DB_WARMUP_CONNECTIONS: int = 0
+    # SQLite
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_CACHE_SIZE_KB: int = 16384
+    SQLITE_MMAP_SIZE: int = 64 * 1024 * 1024
 
     SOFASCORE_BASE_URL: str = "https://www.sofascore.com/api/v1"
+    SOFASCORE_BADGE_URL: str = "https://api.sofascore.app/api/v1/team/{team_id}/image"
     SOFASCORE_USER_AGENT: str = (
         "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
     )
     SOFASCORE_MAX_RETRIES: int = 3
     SOFASCORE_RETRY_DELAY: float = 2.0
+    SOFASCORE_MAX_RETRY_DELAY: float = 30.0
+    SOFASCORE_BREAKER_THRESHOLD: int = 3
+    SOFASCORE_BREAKER_COOLDOWN: float = 600.0
+    SOFASCORE_HEDGE: bool = False
+    SOFASCORE_HEDGE_DELAY: float = 3.0
 
     SCRAPEDO_TOKEN: str = ""
+    SCRAPEDO_BASE_URL: str = "https://api.scrape.do/"
+    SCRAPER_COOKIES_FILE: str = "./.cloudscraper_cookies.json"
+
+    BADGE_CONCURRENCY: int = 4
+    BADGE_RATE_PER_SECOND: float = 5.0
+    BADGE_REVALIDATE_HOURS: float = 168.0
+
+    HTTP_CACHE_MAX_STALE: int = 86400
+
+    SSE_HEARTBEAT_SECONDS: float = 15.0
+    SSE_DEBOUNCE_SECONDS: float = 0.5
 
     ADMIN_USERNAME: str = "admin"
     ADMIN_PASSWORD: str = "bolao2026"
@@ -26,6 +67,13 @@ class Settings(BaseSettings):
     JWT_EXPIRE_MINUTES: int = 480
 
     CRON_SECRET: str = "change-me-to-a-random-cron-secret"
+    SYNC_LOCK_TTL: float = 900.0
+
+    LIVE_POLLING: bool = False
+    LIVE_POLL_SECONDS: int = 120
+    LIVE_IDLE_MAX_SECONDS: int = 3 * 3600
+    LIVE_BACKOFF_AFTER: int = 5
+    LIVE_BACKOFF_MAX_SECONDS: int = 1800
 
     class Config:
         env_prefix = "BOLAO_"
@@ -1,17 +1,150 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import DeclarativeBase, sessionmaker
+import asyncio
+import logging
+from collections.abc import Callable
+from pathlib import Path
+from typing import TypeVar
+
+from sqlalchemy import URL, Engine, create_engine, event, make_url, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
 
 from .config import settings
 
-connect_args = {}
-if settings.DATABASE_URL.startswith("sqlite"):
-    connect_args["check_same_thread"] = False
+logger = logging.getLogger("bolao.db")
+
+T = TypeVar("T")
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def engine_options(url: URL | str, profile: str | None = None) -> dict:
+    """
+    ``create_engine`` keyword arguments for the backend of ``url``.
+    ``profile="default"`` keeps SQLAlchemy's defaults (the benchmark
+    baseline); ``"auto"`` (DB_ENGINE_PROFILE) tunes the pool for Postgres:
+    Neon suspends idle compute and drops its connections, so they are
+    pinged on checkout and recycled before DB_POOL_RECYCLE.
+    """
+    u = make_url(url)
+    profile = profile or settings.DB_ENGINE_PROFILE
+    options: dict = {}
+    if u.drivername in ("sqlite", "sqlite+pysqlite"):
+        options["connect_args"] = {"check_same_thread": False}
+    if profile == "default":
+        return options
+    if u.get_backend_name() == "postgresql":
+        options.update(
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+        )
+    return options
+
+
+def _sqlite_pragmas(dbapi_conn, _record) -> None:
+    # WAL lets readers keep going while the sync writes; NORMAL is durable
+    # in WAL mode except for the last commits on power loss.
+    cursor = dbapi_conn.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    cursor.execute(f"PRAGMA cache_size=-{int(settings.SQLITE_CACHE_SIZE_KB)}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+    cursor.close()
+
+
+def _postgres_session(dbapi_conn, _record) -> None:
+    cursor = dbapi_conn.cursor()
+    cursor.execute(f"SET statement_timeout = {int(settings.DB_STATEMENT_TIMEOUT_MS)}")
+    cursor.close()
+    # Keep the SET out of the first transaction's rollback.
+    dbapi_conn.commit()
+
 
-engine = create_engine(settings.DATABASE_URL, connect_args=connect_args)
+def apply_profile(engine: Engine, profile: str | None = None) -> Engine:
+    """Per-connection tuning (SQLite pragmas, Postgres statement_timeout)."""
+    if (profile or settings.DB_ENGINE_PROFILE) == "default":
+        return engine
+    backend = engine.dialect.name
+    if backend == "sqlite" and engine.url.database not in (None, "", ":memory:"):
+        event.listen(engine, "connect", _sqlite_pragmas)
+    elif backend == "postgresql" and settings.DB_STATEMENT_TIMEOUT_MS:
+        event.listen(engine, "connect", _postgres_session)
+    return engine
+
+
+engine = apply_profile(create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL)))
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+def async_database_url(url: str) -> URL:
+    """
+    DATABASE_URL for the async drivers (aiosqlite / asyncpg). asyncpg takes
+    ``ssl`` instead of libpq's ``sslmode`` and rejects ``channel_binding``,
+    both of which come in Neon connection strings.
+    """
+    u = make_url(url)
+    if u.get_backend_name() == "sqlite":
+        return u.set(drivername="sqlite+aiosqlite")
+    if u.get_backend_name() == "postgresql":
+        query = dict(u.query)
+        sslmode = query.pop("sslmode", None)
+        query.pop("channel_binding", None)
+        if sslmode:
+            query["ssl"] = sslmode
+        return u.set(drivername="postgresql+asyncpg", query=query)
+    return u
+
+
+_async_url = async_database_url(settings.DATABASE_URL)
+async_engine = create_async_engine(_async_url, **engine_options(_async_url))
+apply_profile(async_engine.sync_engine)
+
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+async def warm_up() -> None:
+    """
+    Open DB_WARMUP_CONNECTIONS connections on both engines at startup, so
+    the first requests don't pay for a Neon compute cold start or for the
+    TLS handshakes.
+    """
+    n = settings.DB_WARMUP_CONNECTIONS
+    if n <= 0:
+        return
+
+    async def ping_async() -> None:
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    def ping_sync() -> None:
+        conns = [engine.connect() for _ in range(n)]
+        for conn in conns:
+            conn.execute(text("SELECT 1"))
+            conn.close()
+
+    try:
+        await asyncio.gather(asyncio.to_thread(ping_sync), *(ping_async() for _ in range(n)))
+        logger.info("Banco: %d conexões abertas no aquecimento.", n)
+    except Exception as e:
+        logger.warning("Banco: falha no aquecimento: %s", e)
+
+
+def run_migrations(url: str | None = None) -> None:
+    """``alembic upgrade head`` against DATABASE_URL (or ``url``)."""
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    if url:
+        config.set_main_option("sqlalchemy.url", url.replace("%", "%%"))
+    command.upgrade(config, "head")
+
+
 class Base(DeclarativeBase):
     pass
 
@@ -22,3 +155,55 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def _call_with_session(fn: Callable[..., T], args: tuple) -> T:
+    with SessionLocal() as db:
+        return fn(db, *args)
+
+
+async def run_in_session(fn: Callable[..., T], *args) -> T:
+    """
+    Run ``fn(db, *args)`` with a sync session in a worker thread. For
+    CPU-heavy work (ranking builds, serialisation): ``AsyncSession.run_sync``
+    runs on the event loop thread and would block it.
+    """
+    return await asyncio.to_thread(_call_with_session, fn, args)
+
+
+UPSERT_CHUNK_SIZE = 1000
+
+
+def dialect_insert(db: Session, model):
+    """``INSERT`` construct supporting ``ON CONFLICT`` for the bound dialect."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(model)
+    if dialect == "sqlite":
+        return sqlite.insert(model)
+    raise NotImplementedError(f"Upsert não suportado para o dialeto {dialect}.")
+
+
+def bulk_upsert(
+    db: Session,
+    model,
+    rows: list[dict],
+    index_elements: list[str],
+    update_columns: list[str],
+) -> None:
+    """
+    ``INSERT ... ON CONFLICT (index_elements) DO UPDATE`` with multi-row
+    VALUES: one statement per UPSERT_CHUNK_SIZE rows.
+    """
+    for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+        stmt = dialect_insert(db, model).values(rows[start:start + UPSERT_CHUNK_SIZE])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=index_elements,
+            set_={c: stmt.excluded[c] for c in update_columns},
+        )
+        db.execute(stmt)
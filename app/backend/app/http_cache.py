@@ -0,0 +1,102 @@
+"""ETag / conditional GET for the public read endpoints."""
+
+from fastapi import HTTPException, Request, Response
+
+from .config import settings
+from .services import data_version
+from .services.payload_cache import EncodedPayload
+from .services.session_utils import get_session_date, seconds_until_session
+
+
+def version_token(version: int | None = None) -> str:
+    return f"{data_version.epoch()}.{data_version.current() if version is None else version}"
+
+
+def parse_version_token(token: str) -> int | None:
+    """Data version in a token of the current epoch, or None (other database, malformed)."""
+    epoch, _, version = token.strip().strip('"').partition(".")
+    if epoch != data_version.epoch() or not version.isdigit():
+        return None
+    return int(version)
+
+
+def current_etag() -> str:
+    """Strong ETag for every public read: data version plus the session it is relative to."""
+    return f'"{version_token()}.{get_session_date().isoformat()}"'
+
+
+def cache_control() -> str:
+    """
+    Clients revalidate every use (a 304 when nothing changed), so edits show
+    up at once. Data only changes on admin edits and on the Tue/Fri syncs, so
+    they may keep serving a stale copy while revalidating in the background
+    until the next session boundary.
+    """
+    stale = min(seconds_until_session(), settings.HTTP_CACHE_MAX_STALE)
+    return f"public, max-age=0, stale-while-revalidate={stale}"
+
+
+# Compressed bodies get their own ETag, as a strong ETag names exact bytes.
+ENCODING_SUFFIX = {"gzip": "-gz", "br": "-br"}
+
+
+def _encoded_etag(etag: str, coding: str) -> str:
+    return f'{etag[:-1]}{ENCODING_SUFFIX[coding]}"'
+
+
+def _match(if_none_match: str, etag: str) -> str | None:
+    """The variant of ``etag`` (plain or per encoding) ``If-None-Match`` names, if any."""
+    variants = {etag, *(_encoded_etag(etag, coding) for coding in ENCODING_SUFFIX)}
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip().removeprefix("W/")
+        if candidate == "*":
+            return etag
+        if candidate in variants:
+            return candidate
+    return None
+
+
+def cache_headers(etag: str) -> dict[str, str]:
+    return {
+        "ETag": etag,
+        "Cache-Control": cache_control(),
+        # The ETag minus its session suffix, for ``/api/ranking?since=``.
+        "X-Data-Version": etag.strip('"').rpartition(".")[0],
+    }
+
+
+def conditional_get(request: Request, response: Response) -> None:
+    """
+    Route dependency: answers 304 when the client already holds the current
+    version, before the endpoint touches the database.
+    """
+    etag = current_etag()
+    headers = cache_headers(etag)
+    if_none_match = request.headers.get("if-none-match")
+    matched = _match(if_none_match, etag) if if_none_match else None
+    if matched:
+        raise HTTPException(status_code=304, headers={**headers, "ETag": matched})
+    response.headers.update(headers)
+
+
+def _accepts(request: Request, coding: str) -> bool:
+    for part in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = part.strip().partition(";")
+        if name.strip().lower() == coding:
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+def payload_response(request: Request, payload: EncodedPayload, etag: str) -> Response:
+    """Serve pre-encoded JSON, picking brotli or gzip when the client accepts it."""
+    headers = cache_headers(etag)
+    body = payload.raw
+    if payload.gzip is not None:
+        headers["Vary"] = "Accept-Encoding"
+        if payload.br is not None and _accepts(request, "br"):
+            body, headers["Content-Encoding"] = payload.br, "br"
+        elif _accepts(request, "gzip"):
+            body, headers["Content-Encoding"] = payload.gzip, "gzip"
+        if "Content-Encoding" in headers:
+            headers["ETag"] = _encoded_etag(etag, headers["Content-Encoding"])
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import os
 from contextlib import asynccontextmanager
@@ -18,8 +19,12 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
 
-from .database import Base, engine
-from .routers import admin, apostadores, auth, historico, ranking, standings, teams
+from .database import Base, async_engine, engine, run_migrations, warm_up
+from .routers import admin, apostadores, auth, export, historico, ranking, standings, teams
+from .services import (
+    data_version, http_clients, live_polling, ranking_events, simulation_service,
+    strategy_health,
+)
 
 STATIC_DIR = Path(__file__).resolve().parent.parent / "static"
 FRONTEND_DIR = Path(__file__).resolve().parent.parent / "frontend_dist"
@@ -28,9 +33,21 @@ FRONTEND_DIR = Path(__file__).resolve().parent.parent / "frontend_dist"
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     Base.metadata.create_all(bind=engine)
+    run_migrations()
+    data_version.load()
     STATIC_DIR.mkdir(parents=True, exist_ok=True)
     (STATIC_DIR / "badges").mkdir(exist_ok=True)
+    await warm_up()
+    await http_clients.startup()
+    ranking_events.start()
+    live_polling.start()
     yield
+    live_polling.shutdown()
+    ranking_events.shutdown()
+    simulation_service.shutdown()
+    await asyncio.to_thread(strategy_health.save, True)
+    await http_clients.shutdown()
+    await async_engine.dispose()
 
 
 app = FastAPI(
@@ -67,6 +84,7 @@ app.include_router(apostadores.router, prefix="/api/apostadores", tags=["apostad
 app.include_router(ranking.router, prefix="/api/ranking", tags=["ranking"])
 app.include_router(historico.router, prefix="/api/historico", tags=["historico"])
 app.include_router(standings.router, prefix="/api/standings", tags=["standings"])
+app.include_router(export.router, prefix="/api/export", tags=["export"])
 app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
 app.include_router(admin.router, prefix="/api/admin", tags=["admin"])
 
@@ -1,6 +1,17 @@
 from datetime import date, datetime
 
-from sqlalchemy import Date, DateTime, ForeignKey, Integer, String, UniqueConstraint
+from sqlalchemy import (
+    DDL,
+    Date,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    UniqueConstraint,
+    event,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .database import Base
@@ -32,6 +43,15 @@ class Team(Base):
 
 class Apostador(Base):
     __tablename__ = "apostadores"
+    __table_args__ = (
+        # Substring search (ILIKE '%x%') on Postgres; SQLite scans the small table.
+        Index(
+            "ix_apostadores_nome_trgm",
+            "nome",
+            postgresql_using="gin",
+            postgresql_ops={"nome": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     nome: Mapped[str] = mapped_column(String(100), unique=True)
@@ -51,6 +71,7 @@ class Palpite(Base):
     __table_args__ = (
         UniqueConstraint("apostador_id", "prioridade", name="uq_apostador_prioridade"),
         UniqueConstraint("apostador_id", "team_id", name="uq_apostador_team"),
+        Index("ix_palpites_team_id", "team_id"),
     )
 
     id: Mapped[int] = mapped_column(primary_key=True)
@@ -68,6 +89,9 @@ class Snapshot(Base):
         UniqueConstraint(
             "session_date", "apostador_id", name="uq_session_apostador"
         ),
+        # Historico order; one apostador's history.
+        Index("ix_snapshots_session_rank", "session_date", "rank"),
+        Index("ix_snapshots_apostador_session", "apostador_id", "session_date"),
     )
 
     id: Mapped[int] = mapped_column(primary_key=True)
@@ -78,3 +102,59 @@ class Snapshot(Base):
     rank: Mapped[int] = mapped_column(Integer)
 
     apostador: Mapped["Apostador"] = relationship(back_populates="snapshots")
+
+
+class TeamStanding(Base):
+    """Per-session copy of the team values the ranking needs, for rebuilding past rankings."""
+
+    __tablename__ = "team_standings"
+    __table_args__ = (
+        UniqueConstraint("session_date", "team_id", name="uq_session_team"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    session_date: Mapped[date] = mapped_column(Date)
+    team_id: Mapped[int] = mapped_column(ForeignKey("teams.id"))
+    position: Mapped[int] = mapped_column(Integer)
+    points: Mapped[int] = mapped_column(Integer)
+    matches: Mapped[int] = mapped_column(Integer)
+    updated_at: Mapped[datetime] = mapped_column(DateTime)
+
+
+class AppState(Base):
+    """Small key/value store for operational state that must survive restarts."""
+
+    __tablename__ = "app_state"
+
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    value: Mapped[str] = mapped_column(Text, default="")
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=brasilia_now, onupdate=brasilia_now
+    )
+
+
+class SyncJob(Base):
+    """A standings sync run in the background; see services.sync_jobs."""
+
+    __tablename__ = "sync_jobs"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    source: Mapped[str] = mapped_column(String(20))
+    status: Mapped[str] = mapped_column(String(20), default="queued", index=True)
+    stage: Mapped[str] = mapped_column(String(20), default="queued")
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    message: Mapped[str] = mapped_column(Text, default="")
+    result: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=brasilia_now)
+    started_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=brasilia_now, onupdate=brasilia_now
+    )
+
+
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
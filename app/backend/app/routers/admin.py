@@ -1,63 +1,40 @@
-import asyncio
 import logging
-import traceback
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..auth import get_current_admin
 from ..config import settings
-from ..database import get_db
-from ..models import Apostador
-from ..schemas import ConfigOut, SyncResponse
-from ..services import badges_service, historico_service, sync_service
+from ..database import get_async_db
+from ..models import SyncJob
+from ..schemas import ConfigOut, SyncJobOut
+from ..services import sync_jobs
 
 logger = logging.getLogger("bolao.admin")
 router = APIRouter()
 
 CRON_SYNC_RETRIES = 2
-CRON_RETRY_DELAY = 10.0
 
 
-async def _run_sync(db: Session, source: str) -> SyncResponse:
-    try:
-        standings = await sync_service.sync_standings(db)
-    except Exception as e:
-        logger.error("%s — sync_standings falhou: %s\n%s", source, e, traceback.format_exc())
-        raise HTTPException(status_code=502, detail=f"Sync falhou: {e}")
-
-    try:
-        team_ids = [s["teamId"] for s in standings]
-        badges_downloaded = await badges_service.download_all_badges(team_ids)
-    except Exception as e:
-        logger.warning("%s — badges falhou (não-crítico): %s", source, e)
-        badges_downloaded = 0
-
-    apostadores_count = db.query(Apostador).count()
-    session_key = None
-    if apostadores_count > 0:
-        try:
-            session_key = historico_service.record_snapshot(db)
-        except Exception as e:
-            logger.error("%s — record_snapshot falhou: %s\n%s", source, e, traceback.format_exc())
-
-    badge_msg = f", {badges_downloaded} escudos novos" if badges_downloaded else ""
-    msg = f"{source} OK: {len(standings)} times atualizados{badge_msg}."
-    logger.info(msg)
-    return SyncResponse(
-        teams_count=len(standings),
-        apostadores_count=apostadores_count,
-        historico_session=session_key,
-        message=msg,
-    )
+@router.post("/sync", response_model=SyncJobOut, status_code=202)
+async def sync_data(
+    db: AsyncSession = Depends(get_async_db),
+    _admin: str = Depends(get_current_admin),
+):
+    return sync_jobs.job_out(await sync_jobs.enqueue(db, "Sync"))
 
 
-@router.post("/sync", response_model=SyncResponse)
-async def sync_data(
-    db: Session = Depends(get_db),
+@router.get("/sync/{job_id}", response_model=SyncJobOut)
+async def get_sync_job(
+    job_id: int,
+    db: AsyncSession = Depends(get_async_db),
     _admin: str = Depends(get_current_admin),
 ):
-    return await _run_sync(db, "Sync")
+    await sync_jobs.fail_abandoned(db)
+    job = await db.get(SyncJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Sync não encontrado.")
+    return sync_jobs.job_out(job)
 
 
 @router.get("/config", response_model=ConfigOut)
@@ -72,25 +49,13 @@ def get_config(_admin: str = Depends(get_current_admin)):
     )
 
 
-@router.api_route("/cron/sync", methods=["GET", "POST"], response_model=SyncResponse)
+@router.api_route(
+    "/cron/sync", methods=["GET", "POST"], response_model=SyncJobOut, status_code=202
+)
 async def cron_sync(
     token: str = Query(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     if token != settings.CRON_SECRET:
         raise HTTPException(status_code=403, detail="Token inválido.")
-
-    last_error = None
-    for attempt in range(CRON_SYNC_RETRIES + 1):
-        try:
-            return await _run_sync(db, f"Cron sync (tentativa {attempt + 1})")
-        except HTTPException as e:
-            last_error = e
-            if attempt < CRON_SYNC_RETRIES:
-                logger.warning(
-                    "Cron sync tentativa %d falhou, retentando em %.0fs...",
-                    attempt + 1, CRON_RETRY_DELAY,
-                )
-                await asyncio.sleep(CRON_RETRY_DELAY)
-
-    raise last_error
+    return sync_jobs.job_out(await sync_jobs.enqueue(db, "Cron sync", retries=CRON_SYNC_RETRIES))
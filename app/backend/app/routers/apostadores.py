@@ -4,13 +4,19 @@ from sqlalchemy.orm import Session
 from ..auth import get_current_admin
 from ..config import settings
 from ..database import get_db
+from ..http_cache import conditional_get
 from ..models import Apostador, Palpite, Team
 from ..schemas import ApostadorCreate, ApostadorOut, ApostadorUpdate, ImportResult
+from ..services import ranking_cache
 
 router = APIRouter()
 
 
-@router.get("", response_model=list[ApostadorOut])
+@router.get(
+    "",
+    response_model=list[ApostadorOut],
+    dependencies=[Depends(conditional_get)],
+)
 def list_apostadores(db: Session = Depends(get_db)):
     return (
         db.query(Apostador).order_by(Apostador.ordem_inscricao).all()
@@ -89,6 +95,7 @@ def create_apostador(
         )
 
     db.commit()
+    ranking_cache.invalidate("apostador")
     db.refresh(apostador)
     return apostador
 
@@ -175,6 +182,8 @@ def import_apostadores(
         created += 1
 
     db.commit()
+    if created:
+        ranking_cache.invalidate("import")
     return ImportResult(created=created, skipped=skipped, errors=errors)
 
 
@@ -255,6 +264,7 @@ def update_apostador(
             )
 
     db.commit()
+    ranking_cache.invalidate("apostador")
     db.refresh(apostador)
     return apostador
 
@@ -270,3 +280,4 @@ def delete_apostador(
         raise HTTPException(status_code=404, detail="Apostador não encontrado.")
     db.delete(apostador)
     db.commit()
+    ranking_cache.invalidate("apostador")
@@ -0,0 +1,143 @@
+import csv
+import io
+import json
+from collections.abc import Iterable, Iterator
+from typing import Literal
+
+from fastapi import APIRouter, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+
+from ..config import settings
+from ..database import SessionLocal
+from ..models import Apostador, Palpite, Snapshot, Team
+from ..services import ranking_cache
+
+router = APIRouter()
+
+Formato = Literal["ndjson", "csv"]
+
+EXPORT_BATCH_SIZE = 500
+
+_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+
+def _encode(rows: Iterable[dict], columns: list[str], formato: Formato) -> Iterator[bytes]:
+    """Encode dict rows in batches, so bytes start flowing before the query ends."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if formato == "csv" else None
+    if writer:
+        writer.writerow(columns)
+
+    count = 0
+    for row in rows:
+        if writer:
+            writer.writerow([row[c] for c in columns])
+        else:
+            buffer.write(json.dumps(row, ensure_ascii=False, default=str))
+            buffer.write("\n")
+        count += 1
+        if count % EXPORT_BATCH_SIZE == 0:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def _stream(name: str, rows: Iterable[dict], columns: list[str], formato: Formato) -> StreamingResponse:
+    extension = "ndjson" if formato == "ndjson" else "csv"
+    return StreamingResponse(
+        _encode(rows, columns, formato),
+        media_type=_MEDIA_TYPES[formato],
+        headers={"Content-Disposition": f'attachment; filename="bolao-{name}.{extension}"'},
+    )
+
+
+def _slots(prefix: str) -> list[str]:
+    return [f"{prefix}_{i}" for i in range(1, settings.TIMES_PER_APOSTADOR + 1)]
+
+
+# The generators open their own session: dependency-managed sessions are
+# closed before a StreamingResponse body is sent.
+
+
+def _ranking_rows() -> Iterator[dict]:
+    with SessionLocal() as db:
+        ranking = ranking_cache.get_ranking(db)
+    for e in ranking.entries:
+        row = e.model_dump(exclude={"pontos", "times", "times_codes", "team_ids", "team_positions"})
+        row.update(zip(_slots("time"), e.times))
+        row.update(zip(_slots("pontos"), e.pontos))
+        yield row
+
+
+def _historico_rows() -> Iterator[dict]:
+    stmt = (
+        select(
+            Snapshot.session_date,
+            Snapshot.rodada,
+            Apostador.nome.label("apostador"),
+            Snapshot.pontuacao,
+            Snapshot.rank,
+        )
+        .join(Apostador, Snapshot.apostador_id == Apostador.id)
+        .order_by(Snapshot.session_date, Snapshot.rank)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    with SessionLocal() as db:
+        for r in db.execute(stmt):
+            yield dict(r._mapping)
+
+
+def _apostadores_rows() -> Iterator[dict]:
+    stmt = (
+        select(
+            Apostador.id,
+            Apostador.nome,
+            Apostador.ordem_inscricao,
+            Palpite.prioridade,
+            Team.sofascore_id,
+            Team.name,
+        )
+        .join(Palpite, Palpite.apostador_id == Apostador.id)
+        .join(Team, Palpite.team_id == Team.id)
+        .order_by(Apostador.ordem_inscricao, Palpite.prioridade)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    current: dict | None = None
+    current_id = None
+    with SessionLocal() as db:
+        for r in db.execute(stmt):
+            if r.id != current_id:
+                if current is not None:
+                    yield current
+                current_id = r.id
+                current = {"apostador": r.nome, "ordem_inscricao": r.ordem_inscricao}
+                current.update({c: None for c in _slots("time") + _slots("team_id")})
+            if 1 <= r.prioridade <= settings.TIMES_PER_APOSTADOR:
+                current[f"time_{r.prioridade}"] = r.name
+                current[f"team_id_{r.prioridade}"] = r.sofascore_id
+    if current is not None:
+        yield current
+
+
+@router.get("/ranking")
+def export_ranking(formato: Formato = Query("csv")):
+    columns = [
+        "rank", "apostador", "ordem_inscricao", "total", "total_jogos",
+        "media_pontos", "aproveitamento", "delta_pontos", "delta_rank",
+    ] + _slots("time") + _slots("pontos")
+    return _stream("ranking", _ranking_rows(), columns, formato)
+
+
+@router.get("/historico")
+def export_historico(formato: Formato = Query("csv")):
+    columns = ["session_date", "rodada", "apostador", "pontuacao", "rank"]
+    return _stream("historico", _historico_rows(), columns, formato)
+
+
+@router.get("/apostadores")
+def export_apostadores(formato: Formato = Query("csv")):
+    columns = ["apostador", "ordem_inscricao"] + _slots("time") + _slots("team_id")
+    return _stream("apostadores", _apostadores_rows(), columns, formato)
@@ -1,18 +1,41 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request
+from pydantic import TypeAdapter
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from ..database import get_db
+from ..database import run_in_session
+from ..http_cache import conditional_get, current_etag, payload_response
 from ..models import Apostador, Snapshot
-from ..schemas import SnapshotOut
+from ..schemas import HistoricoEvolucao, SnapshotOut
+from ..services.payload_cache import get_payload
 
 router = APIRouter()
 
+_snapshots_adapter = TypeAdapter(list[SnapshotOut])
 
-@router.get("", response_model=list[SnapshotOut])
-def get_historico(
+
+@router.get(
+    "",
+    response_model=list[SnapshotOut],
+    dependencies=[Depends(conditional_get)],
+)
+async def get_historico(
+    request: Request,
     apostador: str | None = Query(None),
-    db: Session = Depends(get_db),
 ):
+    if apostador:
+        return await run_in_session(_query_historico, apostador)
+
+    etag = current_etag()
+    payload = await get_payload(
+        "historico",
+        etag,
+        lambda db: _snapshots_adapter.dump_json(_query_historico(db)),
+    )
+    return payload_response(request, payload, etag)
+
+
+def _query_historico(db: Session, apostador: str | None = None) -> list[SnapshotOut]:
     query = (
         db.query(
             Snapshot.session_date,
@@ -26,7 +49,10 @@ def get_historico(
     )
 
     if apostador:
-        query = query.filter(Apostador.nome.ilike(f"%{apostador}%"))
+        # As a subquery, so the planner looks the few matching apostadores up
+        # first and seeks their snapshots by apostador_id.
+        matching = select(Apostador.id).where(Apostador.nome.ilike(f"%{apostador}%"))
+        query = query.filter(Snapshot.apostador_id.in_(matching))
 
     rows = query.all()
     return [
@@ -39,3 +65,67 @@ def get_historico(
         )
         for r in rows
     ]
+
+
+@router.get(
+    "/evolucao",
+    response_model=HistoricoEvolucao,
+    dependencies=[Depends(conditional_get)],
+)
+async def get_evolucao(request: Request):
+    """Histórico em colunas (sessões x apostadores) para o gráfico de evolução."""
+    etag = current_etag()
+    payload = await get_payload(
+        "historico_evolucao",
+        etag,
+        lambda db: _build_evolucao(db).model_dump_json().encode(),
+    )
+    return payload_response(request, payload, etag)
+
+
+def _build_evolucao(db: Session) -> HistoricoEvolucao:
+    rows = (
+        db.query(
+            Snapshot.session_date,
+            Snapshot.rodada,
+            Snapshot.apostador_id,
+            Apostador.nome,
+            Apostador.ordem_inscricao,
+            Snapshot.pontuacao,
+            Snapshot.rank,
+        )
+        .join(Apostador, Snapshot.apostador_id == Apostador.id)
+        .order_by(Snapshot.session_date, Apostador.ordem_inscricao)
+        .all()
+    )
+
+    sessions: list = []
+    rodadas: list[int] = []
+    session_idx: dict = {}
+    apostadores: dict[int, tuple[int, str]] = {}
+    for r in rows:
+        if r.session_date not in session_idx:
+            session_idx[r.session_date] = len(sessions)
+            sessions.append(r.session_date)
+            rodadas.append(r.rodada)
+        else:
+            i = session_idx[r.session_date]
+            rodadas[i] = max(rodadas[i], r.rodada)
+        apostadores[r.apostador_id] = (r.ordem_inscricao, r.nome)
+
+    ordered = sorted(apostadores, key=lambda ap_id: apostadores[ap_id][0])
+    col = {ap_id: j for j, ap_id in enumerate(ordered)}
+    pontuacao: list[list[int | None]] = [[None] * len(ordered) for _ in sessions]
+    rank: list[list[int | None]] = [[None] * len(ordered) for _ in sessions]
+    for r in rows:
+        i, j = session_idx[r.session_date], col[r.apostador_id]
+        pontuacao[i][j] = r.pontuacao
+        rank[i][j] = r.rank
+
+    return HistoricoEvolucao(
+        sessions=sessions,
+        rodadas=rodadas,
+        apostadores=[apostadores[ap_id][1] for ap_id in ordered],
+        pontuacao=pontuacao,
+        rank=rank,
+    )
@@ -1,13 +1,166 @@
-from fastapi import APIRouter, Depends
+from datetime import date
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from ..database import get_db
-from ..schemas import RankingResponse
-from ..services.ranking_service import build_ranking
+from ..database import get_db, run_in_session
+from ..http_cache import (
+    conditional_get,
+    current_etag,
+    parse_version_token,
+    payload_response,
+    version_token,
+)
+from ..schemas import (
+    EliminacaoResponse,
+    RankingDelta,
+    RankingEntry,
+    RankingPage,
+    RankingResponse,
+    SimulacaoResponse,
+)
+from ..services import elimination_service, ranking_cache, ranking_events, simulation_service
+from ..services.ranking_service import has_session_standings
+from ..services.session_utils import get_session_date
+from ..services.payload_cache import EncodedPayload, get_payload
 
 router = APIRouter()
 
 
-@router.get("", response_model=RankingResponse)
-def get_ranking(db: Session = Depends(get_db)):
-    return build_ranking(db)
+@router.get(
+    "",
+    response_model=RankingResponse,
+    dependencies=[Depends(conditional_get)],
+)
+async def get_ranking(
+    request: Request,
+    session: date | None = Query(None, description="Sessão passada (YYYY-MM-DD)"),
+    since: str | None = Query(None, description="Versão já recebida (X-Data-Version); devolve só as mudanças"),
+):
+    if since is not None:
+        if session is not None:
+            raise HTTPException(status_code=400, detail="Use since ou session, não os dois.")
+        payload = await run_in_session(
+            lambda db: EncodedPayload.encode(_ranking_delta(db, since).model_dump_json().encode())
+        )
+        response = payload_response(request, payload, current_etag())
+        # A delta depends on ``since``; it must not share the full ranking's ETag.
+        del response.headers["ETag"]
+        response.headers["Cache-Control"] = "no-store"
+        return response
+
+    if session is not None and session != get_session_date():
+        if not await run_in_session(has_session_standings, session):
+            raise HTTPException(
+                status_code=404,
+                detail=f"Sem classificação registrada para a sessão {session.isoformat()}.",
+            )
+        return await run_in_session(ranking_cache.get_session_ranking, session)
+
+    etag = current_etag()
+    payload = await get_payload(
+        "ranking",
+        etag,
+        lambda db: ranking_cache.get_ranking(db).model_dump_json().encode(),
+    )
+    return payload_response(request, payload, etag)
+
+
+def _ranking_delta(db: Session, since: str) -> RankingDelta:
+    since_version = parse_version_token(since)
+    version, ranking, diff = ranking_cache.get_ranking_delta(
+        db, since_version if since_version is not None else -1
+    )
+    changed, removed = diff if diff is not None else (ranking.entries, [])
+    return RankingDelta(
+        version=version_token(version),
+        since=since,
+        full_refresh=diff is None,
+        updated_at=ranking.updated_at,
+        display_column=ranking.display_column,
+        rodada=ranking.rodada,
+        changed=changed,
+        removed=removed,
+    )
+
+
+def _ranking_page(db: Session, offset: int, limit: int) -> RankingPage:
+    ranking, _ = ranking_cache.get_rank_index(db)
+    return RankingPage(
+        updated_at=ranking.updated_at,
+        display_column=ranking.display_column,
+        rodada=ranking.rodada,
+        total=len(ranking.entries),
+        offset=offset,
+        entries=ranking.entries[offset:offset + limit],
+    )
+
+
+@router.get(
+    "/top",
+    response_model=RankingPage,
+    dependencies=[Depends(conditional_get)],
+)
+def get_ranking_top(
+    k: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_db),
+):
+    """Os ``k`` primeiros do ranking atual."""
+    return _ranking_page(db, 0, k)
+
+
+@router.get(
+    "/page",
+    response_model=RankingPage,
+    dependencies=[Depends(conditional_get)],
+)
+def get_ranking_page(
+    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db),
+):
+    return _ranking_page(db, offset, limit)
+
+
+@router.get(
+    "/apostador/{apostador_id}",
+    response_model=RankingEntry,
+    dependencies=[Depends(conditional_get)],
+)
+def get_ranking_apostador(apostador_id: int, db: Session = Depends(get_db)):
+    ranking, positions = ranking_cache.get_rank_index(db)
+    position = positions.get(apostador_id)
+    if position is None:
+        raise HTTPException(status_code=404, detail="Apostador não encontrado.")
+    return ranking.entries[position]
+
+
+@router.get("/stream")
+async def stream_ranking():
+    """Server-Sent Events: ``version`` and ``ranking-diff`` on every data change, pings in between."""
+    return StreamingResponse(
+        ranking_events.subscribe(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get(
+    "/simulacao",
+    response_model=SimulacaoResponse,
+    dependencies=[Depends(conditional_get)],
+)
+def get_simulacao(db: Session = Depends(get_db)):
+    """Chances de título/pódio e posição esperada por simulação do restante da temporada."""
+    return simulation_service.get_simulacao(db)
+
+
+@router.get(
+    "/eliminacao",
+    response_model=EliminacaoResponse,
+    dependencies=[Depends(conditional_get)],
+)
+def get_eliminacao(db: Session = Depends(get_db)):
+    """Pontuação mínima/máxima possível e quem já está eliminado ou com pódio garantido."""
+    return elimination_service.get_eliminacao(db)
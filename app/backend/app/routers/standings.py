@@ -1,14 +1,22 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Request
 
-from ..database import get_db
+from ..http_cache import conditional_get, current_etag, payload_response
 from ..models import Team
 from ..schemas import TeamOut
+from ..services.payload_cache import get_payload
+from ..services.teams_service import encode_teams
 
 router = APIRouter()
 
 
-@router.get("", response_model=list[TeamOut])
-def get_standings(db: Session = Depends(get_db)):
+@router.get(
+    "",
+    response_model=list[TeamOut],
+    dependencies=[Depends(conditional_get)],
+)
+async def get_standings(request: Request):
     """Retorna a tabela do Brasileirão ordenada por posição."""
-    return db.query(Team).order_by(Team.position).all()
+    etag = current_etag()
+    payload = await get_payload("standings", etag, lambda db: encode_teams(db, Team.position))
+    return payload_response(request, payload, etag)
+
@@ -1,13 +1,21 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Request
 
-from ..database import get_db
+from ..http_cache import conditional_get, current_etag, payload_response
 from ..models import Team
 from ..schemas import TeamOut
+from ..services.payload_cache import get_payload
+from ..services.teams_service import encode_teams
 
 router = APIRouter()
 
 
-@router.get("", response_model=list[TeamOut])
-def list_teams(db: Session = Depends(get_db)):
-    return db.query(Team).order_by(Team.slug).all()
+@router.get(
+    "",
+    response_model=list[TeamOut],
+    dependencies=[Depends(conditional_get)],
+)
+async def list_teams(request: Request):
+    etag = current_etag()
+    payload = await get_payload("teams", etag, lambda db: encode_teams(db, Team.slug))
+    return payload_response(request, payload, etag)
+
@@ -100,6 +100,59 @@ class RankingResponse(BaseModel):
     entries: list[RankingEntry]
 
 
+class RankingPage(BaseModel):
+    updated_at: str
+    display_column: str
+    rodada: int
+    total: int
+    offset: int
+    entries: list[RankingEntry]
+
+
+class RankingDelta(BaseModel):
+    """Changes since the version a client holds; with ``full_refresh``, ``changed`` is the whole ranking."""
+    version: str
+    since: str
+    full_refresh: bool
+    updated_at: str
+    display_column: str
+    rodada: int
+    changed: list[RankingEntry]
+    removed: list[int]
+
+
+class SimulacaoEntry(BaseModel):
+    rank: int
+    apostador: str
+    ordem_inscricao: int
+    total: int
+    chance_titulo: float
+    chance_podio: float
+    rank_esperado: float
+
+
+class SimulacaoResponse(BaseModel):
+    rodada: int
+    simulacoes: int
+    entries: list[SimulacaoEntry]
+
+
+class EliminacaoEntry(BaseModel):
+    rank: int
+    apostador: str
+    ordem_inscricao: int
+    total: int
+    total_minimo: int
+    total_maximo: int
+    eliminado: bool
+    podio_garantido: bool
+
+
+class EliminacaoResponse(BaseModel):
+    rodada: int
+    entries: list[EliminacaoEntry]
+
+
 # --- Historico ---
 
 
@@ -113,6 +166,16 @@ class SnapshotOut(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class HistoricoEvolucao(BaseModel):
+    """Histórico em formato largo: ``pontuacao[i][j]`` é a sessão ``i`` do apostador ``j``."""
+
+    sessions: list[date]
+    rodadas: list[int]
+    apostadores: list[str]
+    pontuacao: list[list[int | None]]
+    rank: list[list[int | None]]
+
+
 # --- Admin ---
 
 
@@ -120,9 +183,23 @@ class SyncResponse(BaseModel):
     teams_count: int
     apostadores_count: int
     historico_session: str | None = None
+    unchanged: bool = False
     message: str
 
 
+class SyncJobOut(BaseModel):
+    id: int
+    source: str
+    status: str
+    stage: str
+    attempts: int
+    message: str
+    result: SyncResponse | None = None
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+
+
 class ConfigOut(BaseModel):
     season_year: int
     tournament_id: int
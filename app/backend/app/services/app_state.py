@@ -0,0 +1,57 @@
+"""Read/write helpers for the ``app_state`` key/value table."""
+
+from datetime import timedelta
+
+from sqlalchemy.orm import Session
+
+from ..database import bulk_upsert, dialect_insert
+from ..models import AppState
+from .session_utils import brasilia_now
+
+
+def get_value(db: Session, key: str) -> str | None:
+    return db.query(AppState.value).filter(AppState.key == key).scalar()
+
+
+def set_value(db: Session, key: str, value: str) -> None:
+    """Upsert ``key``; the caller commits."""
+    bulk_upsert(
+        db,
+        AppState,
+        [{"key": key, "value": value, "updated_at": brasilia_now()}],
+        index_elements=["key"],
+        update_columns=["value", "updated_at"],
+    )
+
+
+def try_lock(db: Session, key: str, owner: str, ttl: float) -> bool:
+    """
+    Take the lock row ``key`` for ``owner``. Locks not refreshed within
+    ``ttl`` seconds are considered abandoned and taken over. Commits.
+    """
+    now = brasilia_now()
+    db.query(AppState).filter(
+        AppState.key == key, AppState.updated_at < now - timedelta(seconds=ttl)
+    ).delete(synchronize_session=False)
+    stmt = (
+        dialect_insert(db, AppState)
+        .values(key=key, value=owner, updated_at=now)
+        .on_conflict_do_nothing(index_elements=["key"])
+    )
+    acquired = db.execute(stmt).rowcount == 1
+    db.commit()
+    return acquired
+
+
+def refresh_lock(db: Session, key: str, owner: str) -> None:
+    """Extend a held lock; the caller commits."""
+    db.query(AppState).filter(AppState.key == key, AppState.value == owner).update(
+        {"updated_at": brasilia_now()}, synchronize_session=False
+    )
+
+
+def release_lock(db: Session, key: str, owner: str) -> None:
+    db.query(AppState).filter(AppState.key == key, AppState.value == owner).delete(
+        synchronize_session=False
+    )
+    db.commit()
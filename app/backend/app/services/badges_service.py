@@ -1,15 +1,51 @@
-"""Download and cache team badges from Sofascore."""
+"""
+Download and cache team badges from Sofascore.
+
+Downloads run concurrently, each on its own copy of the shared scraper
+session, bounded by the number of copies and a token bucket.
+Files are written to a temp file and renamed into place off the event loop.
+Each badge's ETag/Last-Modified is kept in a ``_meta.json`` sidecar so
+existing badges can be revalidated with a conditional request after
+BADGE_REVALIDATE_HOURS.
+"""
 
 import asyncio
+import json
 import logging
+import os
+import time
 from pathlib import Path
 
 from ..config import settings
+from . import http_clients
 
 logger = logging.getLogger("bolao.badges")
 
 BADGES_DIR = Path(__file__).resolve().parent.parent.parent / "static" / "badges"
-BADGE_URL = "https://api.sofascore.app/api/v1/team/{team_id}/image"
+META_FILE = "_meta.json"
+MIN_BADGE_SIZE = 100
+
+
+class TokenBucket:
+    """Allows ``rate`` acquisitions per second, with bursts of up to ``capacity``."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
 
 
 def _ensure_dir():
@@ -24,40 +60,117 @@ def badge_exists(sofascore_id: int) -> bool:
     return badge_path(sofascore_id).is_file()
 
 
-async def download_badge(sofascore_id: int) -> bool:
-    if badge_exists(sofascore_id):
-        return True
-
-    _ensure_dir()
-
-    from functools import lru_cache
+def _cached_ids() -> dict[int, float]:
+    """Ids with a badge on disk and the file's mtime, from a single directory listing."""
+    with os.scandir(BADGES_DIR) as entries:
+        return {
+            int(e.name[:-5]): e.stat().st_mtime
+            for e in entries
+            if e.name.endswith(".webp") and e.name[:-5].isdigit() and e.is_file()
+        }
 
-    from .sofascore import _get_scraper
 
-    url = BADGE_URL.format(team_id=sofascore_id)
+def _load_meta() -> dict[str, dict]:
+    try:
+        return json.loads((BADGES_DIR / META_FILE).read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+async def download_badge(
+    sofascore_id: int, meta: dict | None = None, scraper=None
+) -> tuple[bool, dict | None]:
+    """
+    Fetch one badge; with ``meta`` (its sidecar entry) the request is
+    conditional. ``scraper`` must not be in use by another thread; without
+    it a copy of the shared one is used. Returns (written, new sidecar
+    entry or None on failure).
+    """
+    url = settings.SOFASCORE_BADGE_URL.format(team_id=sofascore_id)
+    headers = {}
+    if meta:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+    own = scraper is None
     try:
-        scraper = _get_scraper()
-        resp = await asyncio.to_thread(scraper.get, url, timeout=15)
-        if resp.status_code == 200 and len(resp.content) > 100:
-            badge_path(sofascore_id).write_bytes(resp.content)
+        if own:
+            scraper = await asyncio.to_thread(http_clients.scraper_copy)
+        resp = await asyncio.to_thread(scraper.get, url, headers=headers, timeout=15)
+        checked = {**(meta or {}), "checked_at": time.time()}
+        if resp.status_code == 304 and meta:
+            return False, checked
+        if resp.status_code == 200 and len(resp.content) > MIN_BADGE_SIZE:
+            await asyncio.to_thread(_write_atomic, badge_path(sofascore_id), resp.content)
             logger.info("Badge %d salvo (%d bytes).", sofascore_id, len(resp.content))
-            return True
+            checked["etag"] = resp.headers.get("ETag")
+            checked["last_modified"] = resp.headers.get("Last-Modified")
+            return True, checked
         logger.warning("Badge %d: status %d", sofascore_id, resp.status_code)
     except Exception as e:
         logger.warning("Badge %d: %s", sofascore_id, e)
-    return False
+    finally:
+        if own and scraper is not None:
+            scraper.close()
+    return False, None
 
 
 async def download_all_badges(sofascore_ids: list[int]) -> int:
-    """Download badges for all team IDs, skipping those already cached."""
+    """
+    Download missing badges and revalidate stale ones. Returns how many
+    files were written.
+    """
     _ensure_dir()
+    cached, meta = await asyncio.to_thread(lambda: (_cached_ids(), _load_meta()))
+    stale_before = time.time() - settings.BADGE_REVALIDATE_HOURS * 3600
+
+    todo: list[tuple[int, dict | None]] = []
+    for team_id in dict.fromkeys(sofascore_ids):
+        if team_id not in cached:
+            todo.append((team_id, None))
+        # Badges saved before the sidecar existed count as checked when written.
+        elif meta.get(str(team_id), {}).get("checked_at", cached[team_id]) < stale_before:
+            todo.append((team_id, meta.get(str(team_id))))
+    if not todo:
+        return 0
+
+    bucket = TokenBucket(settings.BADGE_RATE_PER_SECOND, settings.BADGE_CONCURRENCY)
+    # One scraper per concurrent download: sessions aren't thread-safe.
+    scrapers: asyncio.Queue = asyncio.Queue()
+    for _ in range(min(settings.BADGE_CONCURRENCY, len(todo))):
+        scrapers.put_nowait(await asyncio.to_thread(http_clients.scraper_copy))
+
+    async def fetch(team_id: int, entry: dict | None):
+        scraper = await scrapers.get()
+        try:
+            await bucket.acquire()
+            return team_id, await download_badge(team_id, entry, scraper)
+        finally:
+            scrapers.put_nowait(scraper)
+
+    try:
+        results = await asyncio.gather(*(fetch(team_id, entry) for team_id, entry in todo))
+    finally:
+        while not scrapers.empty():
+            scrapers.get_nowait().close()
+
     downloaded = 0
-    for team_id in sofascore_ids:
-        if badge_exists(team_id):
-            continue
-        ok = await download_badge(team_id)
-        if ok:
-            downloaded += 1
-        await asyncio.sleep(0.3)
-    logger.info("Badges: %d novos, %d total.", downloaded, len(sofascore_ids))
+    for team_id, (written, entry) in results:
+        downloaded += written
+        if entry is not None:
+            meta[str(team_id)] = entry
+    await asyncio.to_thread(
+        _write_atomic, BADGES_DIR / META_FILE, json.dumps(meta, indent=1).encode()
+    )
+    logger.info(
+        "Badges: %d baixados, %d verificados, %d total.",
+        downloaded, len(todo), len(sofascore_ids),
+    )
     return downloaded
@@ -0,0 +1,93 @@
+"""
+Data version used to key in-memory caches and HTTP ETags.
+
+The version is persisted in ``app_state`` together with an epoch (a random
+id created with the row), so a restart resumes it instead of invalidating
+every client cache. A database without the row starts a new epoch, so its
+versions never collide with tokens handed out for another database.
+"""
+
+import logging
+import secrets
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
+from ..database import SessionLocal
+from . import app_state
+
+logger = logging.getLogger("bolao.version")
+
+STATE_KEY = "data_version"
+
+_lock = threading.Lock()
+_version = 0
+_epoch = secrets.token_hex(4)
+_listeners: list[Callable[[int], None]] = []
+
+# Bumps may come from the event loop thread, which must not wait on the
+# database; saves run one at a time on their own thread.
+_saver = ThreadPoolExecutor(max_workers=1, thread_name_prefix="data-version")
+_save_lock = threading.Lock()
+_saved = -1
+_loaded = False
+
+
+def current() -> int:
+    return _version
+
+
+def epoch() -> str:
+    return _epoch
+
+
+def bump(reason: str) -> int:
+    """Mark the persisted data as changed. Returns the new version."""
+    global _version
+    with _lock:
+        _version += 1
+        version = _version
+    logger.debug("Versão de dados %d (%s).", version, reason)
+    for listener in _listeners:
+        listener(version)
+    return version
+
+
+def add_listener(listener: Callable[[int], None]) -> None:
+    """Call ``listener(version)`` after every bump, from the bumping thread."""
+    _listeners.append(listener)
+
+
+def _save(version: int) -> None:
+    global _saved
+    with _save_lock:
+        if version <= _saved:  # a later version was saved already
+            return
+        try:
+            with SessionLocal() as db:
+                app_state.set_value(db, STATE_KEY, f"{_epoch}.{version}")
+                db.commit()
+            _saved = version
+        except Exception as e:
+            logger.warning("Versão de dados %d não salva: %s", version, e)
+
+
+def load() -> None:
+    """Restore the persisted version once per process and save every bump."""
+    global _version, _epoch, _saved, _loaded
+    if _loaded:
+        return
+    try:
+        with SessionLocal() as db:
+            raw = app_state.get_value(db, STATE_KEY)
+        saved_epoch, _, version = (raw or "").partition(".")
+        with _lock:
+            if saved_epoch and version.isdigit():
+                _epoch, _version = saved_epoch, max(_version, int(version))
+                _saved = _version
+        _save(_version)
+        logger.info("Versão de dados %s.%d restaurada.", _epoch, _version)
+    except Exception as e:
+        logger.warning("Versão de dados não restaurada: %s", e)
+    add_listener(lambda version: _saver.submit(_save, version))
+    _loaded = True
@@ -0,0 +1,115 @@
+"""
+Mathematical elimination: who can still finish 1st, who is sure of the podium.
+
+Every apostador gets a worst case (no more points) and a best case (all
+picked teams win their remaining matches), both as tie-break vectors
+(total, pontos prioridade 1..7, -ordem_inscricao). Reaching a bound on the
+total forces every pick to its bound, so if b's worst vector beats a's
+best vector lexicographically, b finishes ahead of a in every outcome.
+Bounds are taken per apostador, ignoring that two apostadores may share
+teams, so the flags are always correct but can be conservative.
+"""
+
+import logging
+import threading
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..schemas import EliminacaoEntry, EliminacaoResponse
+from . import data_version, ranking_cache
+
+logger = logging.getLogger("bolao.eliminacao")
+
+PODIUM_SIZE = 3
+
+_lock = threading.Lock()
+_cached: tuple[int, EliminacaoResponse] | None = None
+
+
+def _dense_ids(vectors: np.ndarray) -> np.ndarray:
+    """Ids that order rows lexicographically (equal rows share an id)."""
+    order = np.lexsort(vectors.T[::-1])
+    ordered = vectors[order]
+    new_group = np.ones(len(ordered), dtype=bool)
+    new_group[1:] = np.any(ordered[1:] != ordered[:-1], axis=1)
+    ids = np.empty(len(vectors), dtype=np.int64)
+    ids[order] = np.cumsum(new_group)
+    return ids
+
+
+def compute_bounds(
+    pontos: np.ndarray, picks: np.ndarray, remaining: np.ndarray, ordem: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Returns (total_minimo, total_maximo, eliminado, podio_garantido) per row.
+    ``remaining`` is indexed by team row, including the sentinel.
+    """
+    n = len(pontos)
+    best_pontos = pontos + 3 * remaining[picks]
+    worst = np.column_stack([pontos.sum(axis=1), pontos, -ordem])
+    best = np.column_stack([best_pontos.sum(axis=1), best_pontos, -ordem])
+
+    ids = _dense_ids(np.vstack([worst, best]))
+    worst_ids, best_ids = ids[:n], ids[n:]
+    sorted_worst = np.sort(worst_ids)
+    sorted_best = np.sort(best_ids)
+
+    # Nobody's own worst case beats their own best case, so no self-exclusion here.
+    surely_ahead = n - np.searchsorted(sorted_worst, best_ids, side="right")
+    maybe_ahead = n - np.searchsorted(sorted_best, worst_ids, side="right")
+    maybe_ahead -= best_ids > worst_ids
+
+    return worst[:, 0], best[:, 0], surely_ahead > 0, maybe_ahead < PODIUM_SIZE
+
+
+def _run(db: Session) -> EliminacaoResponse:
+    state = ranking_cache.get_state(db)
+    if not state.order:
+        return EliminacaoResponse(rodada=state.rodada, entries=[])
+
+    remaining = np.clip(settings.SEASON_ROUNDS - state.teams.matches, 0, None)
+    remaining[state.teams.sentinel] = 0
+    minimo, maximo, eliminado, podio = compute_bounds(
+        state.scores.pontos, state.matrix.picks, remaining, state.matrix.ordem
+    )
+
+    entries = []
+    for idx, row in enumerate(state.order):
+        entry = state.entries[row]
+        entries.append(
+            EliminacaoEntry(
+                rank=idx + 1,
+                apostador=entry.apostador,
+                ordem_inscricao=entry.ordem_inscricao,
+                total=entry.total,
+                total_minimo=int(minimo[row]),
+                total_maximo=int(maximo[row]),
+                eliminado=bool(eliminado[row]),
+                podio_garantido=bool(podio[row]),
+            )
+        )
+    logger.info(
+        "Eliminação: %d eliminados, %d com pódio garantido.",
+        int(eliminado.sum()), int(podio.sum()),
+    )
+    return EliminacaoResponse(rodada=state.rodada, entries=entries)
+
+
+def get_eliminacao(db: Session) -> EliminacaoResponse:
+    """Elimination flags for the current data version; computed once per version."""
+    global _cached
+    version = data_version.current()
+    cached = _cached
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    with _lock:
+        cached = _cached
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        result = _run(db)
+        if data_version.current() == version:
+            _cached = (version, result)
+    return result
@@ -1,14 +1,48 @@
 import logging
+from datetime import date
 
+from sqlalchemy import Date, literal, select, true
 from sqlalchemy.orm import Session
 
-from ..models import Apostador, Snapshot, Team
-from ..services.ranking_service import build_ranking
-from ..services.session_utils import format_date_key, get_session_date
+from ..database import bulk_upsert, dialect_insert
+from ..models import Snapshot, Team, TeamStanding
+from . import ranking_cache
+from .session_utils import format_date_key, get_session_date
 
 logger = logging.getLogger("bolao.historico")
 
 
+def _record_team_standings(db: Session, session_date: date) -> None:
+    """
+    Keep the session's team values so its full ranking can be rebuilt later.
+    Copied server-side with a single INSERT ... SELECT ... ON CONFLICT.
+    """
+    columns = ["session_date", "team_id", "position", "points", "matches", "updated_at"]
+    # Keep the WHERE: SQLite parses "INSERT ... SELECT ... FROM t ON CONFLICT" as a join's ON.
+    stmt = dialect_insert(db, TeamStanding).from_select(
+        columns,
+        select(
+            literal(session_date, Date), Team.id, Team.position,
+            Team.points, Team.matches, Team.updated_at,
+        ).where(true()),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["session_date", "team_id"],
+        set_={c: stmt.excluded[c] for c in columns[2:]},
+    )
+    db.execute(stmt)
+
+
+def session_recorded(db: Session) -> bool:
+    """Whether the current session already has snapshot rows."""
+    return (
+        db.query(Snapshot.id)
+        .filter(Snapshot.session_date == get_session_date())
+        .first()
+        is not None
+    )
+
+
 def record_snapshot(db: Session) -> str | None:
     """
     Record a historical snapshot for the current session.
@@ -16,51 +50,41 @@ def record_snapshot(db: Session) -> str | None:
     New session appends new rows.
     Returns the session key or None if no data.
     """
-    ranking = build_ranking(db)
-    if not ranking.entries:
+    state = ranking_cache.get_state(db)
+    if not state.order:
         logger.info("Historico: sem dados de ranking.")
         return None
 
-    max_matches = db.query(Team.matches).order_by(Team.matches.desc()).first()
-    rodada = max_matches[0] if max_matches else 0
-
     session_date = get_session_date()
     session_key = format_date_key(session_date)
 
-    existing = (
-        db.query(Snapshot).filter(Snapshot.session_date == session_date).all()
+    apostador_ids = state.matrix.apostador_ids.tolist()
+    totals = state.scores.total.tolist()
+    rows = [
+        {
+            "session_date": session_date,
+            "rodada": state.rodada,
+            "apostador_id": apostador_ids[row],
+            "pontuacao": totals[row],
+            "rank": idx + 1,
+        }
+        for idx, row in enumerate(state.order)
+    ]
+    bulk_upsert(
+        db,
+        Snapshot,
+        rows,
+        index_elements=["session_date", "apostador_id"],
+        update_columns=["rodada", "pontuacao", "rank"],
     )
-    if existing:
-        for snap in existing:
-            db.delete(snap)
-        db.flush()
-        logger.info(
-            "Historico: sessão %s sobrescrita (%d linhas removidas).",
-            session_key,
-            len(existing),
-        )
-
-    apostador_map = {a.nome: a.id for a in db.query(Apostador).all()}
-
-    for entry in ranking.entries:
-        ap_id = apostador_map.get(entry.apostador)
-        if ap_id is None:
-            continue
-        db.add(
-            Snapshot(
-                session_date=session_date,
-                rodada=rodada,
-                apostador_id=ap_id,
-                pontuacao=entry.total,
-                rank=entry.rank,
-            )
-        )
+    _record_team_standings(db, session_date)
 
     db.commit()
+    ranking_cache.bump_keeping_ranking("snapshot")
     logger.info(
         "Historico: sessão %s, rodada %d — %d registros.",
         session_key,
-        rodada,
-        len(ranking.entries),
+        state.rodada,
+        len(rows),
     )
     return session_key
@@ -0,0 +1,158 @@
+"""
+Shared outbound HTTP clients, opened in ``main.lifespan`` and closed on
+shutdown.
+
+The httpx client keeps connections alive between retries and speaks
+HTTP/2. The cloudscraper session is reused so the Cloudflare challenge is
+solved once; its clearance cookies and user agent are persisted to
+SCRAPER_COOKIES_FILE so a restart doesn't solve it again.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+from pathlib import Path
+
+import cloudscraper
+import httpx
+
+from ..config import settings
+
+logger = logging.getLogger("bolao.http")
+
+_lock = threading.Lock()
+_httpx: httpx.AsyncClient | None = None
+_httpx_loop: asyncio.AbstractEventLoop | None = None
+_scraper: cloudscraper.CloudScraper | None = None
+
+
+def _cookies_file() -> Path | None:
+    return Path(settings.SCRAPER_COOKIES_FILE) if settings.SCRAPER_COOKIES_FILE else None
+
+
+def _new_httpx() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        timeout=15.0,
+        http2=True,
+        limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+    )
+
+
+def _create_scraper() -> cloudscraper.CloudScraper:
+    return cloudscraper.create_scraper(
+        browser={"browser": "chrome", "platform": "windows", "mobile": False}
+    )
+
+
+def _new_scraper() -> cloudscraper.CloudScraper:
+    scraper = _create_scraper()
+    path = _cookies_file()
+    if path is None or not path.is_file():
+        return scraper
+    try:
+        saved = json.loads(path.read_text())
+        # cf_clearance is bound to the user agent that earned it.
+        scraper.headers["User-Agent"] = saved["user_agent"]
+        for c in saved["cookies"]:
+            scraper.cookies.set(
+                c["name"], c["value"], domain=c["domain"], path=c["path"], expires=c["expires"]
+            )
+        logger.info("cloudscraper: %d cookies restaurados.", len(saved["cookies"]))
+    except Exception as e:
+        logger.warning("cloudscraper: cookies ignorados (%s).", e)
+    return scraper
+
+
+def get_httpx() -> httpx.AsyncClient:
+    """
+    Shared async client; created on demand when used outside the app
+    lifespan. Its pool is bound to an event loop, so a caller on another
+    loop (scripts using ``asyncio.run``) gets a fresh client.
+    """
+    global _httpx, _httpx_loop
+    loop = asyncio.get_running_loop()
+    if _httpx is None or _httpx.is_closed or _httpx_loop is not loop:
+        if _httpx is not None and not _httpx.is_closed:
+            _close_stale(_httpx, _httpx_loop)
+        _httpx, _httpx_loop = _new_httpx(), loop
+    return _httpx
+
+
+def _close_stale(client: httpx.AsyncClient, loop: asyncio.AbstractEventLoop | None) -> None:
+    """Close a client bound to another loop on that loop, if it's still running."""
+    if loop is not None and not loop.is_closed() and loop.is_running():
+        asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+    else:
+        # Known leak: its pool can only be closed on the loop that opened it.
+        logger.warning("httpx: cliente de um event loop encerrado descartado sem fechar.")
+
+
+def get_scraper() -> cloudscraper.CloudScraper:
+    global _scraper
+    with _lock:
+        if _scraper is None:
+            _scraper = _new_scraper()
+        return _scraper
+
+
+def scraper_copy() -> cloudscraper.CloudScraper:
+    """
+    A new scraper carrying the shared one's clearance (user agent and
+    cookies). Sessions aren't thread-safe: concurrent workers each use a
+    copy, and the caller closes it.
+    """
+    shared = get_scraper()
+    scraper = _create_scraper()
+    with _lock:
+        scraper.headers["User-Agent"] = shared.headers.get("User-Agent", "")
+        scraper.cookies.update(shared.cookies)
+    return scraper
+
+
+def save_scraper_cookies() -> None:
+    """Persist the scraper's cookies; called after successful requests and on shutdown."""
+    path = _cookies_file()
+    scraper = _scraper
+    if path is None or scraper is None:
+        return
+    data = {
+        "user_agent": scraper.headers.get("User-Agent", ""),
+        "cookies": [
+            {
+                "name": c.name,
+                "value": c.value,
+                "domain": c.domain,
+                "path": c.path,
+                "expires": c.expires,
+            }
+            for c in scraper.cookies
+        ],
+    }
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_text(json.dumps(data))
+        tmp.replace(path)
+    except OSError as e:
+        logger.warning("cloudscraper: falha ao salvar cookies: %s", e)
+
+
+async def startup() -> None:
+    get_httpx()
+    get_scraper()
+
+
+async def shutdown() -> None:
+    global _httpx, _httpx_loop, _scraper
+    if _httpx is not None and not _httpx.is_closed:
+        if _httpx_loop is asyncio.get_running_loop():
+            await _httpx.aclose()
+        else:
+            _close_stale(_httpx, _httpx_loop)
+    _httpx, _httpx_loop = None, None
+    with _lock:
+        save_scraper_cookies()
+        if _scraper is not None:
+            _scraper.close()
+            _scraper = None
@@ -0,0 +1,114 @@
+"""
+Live polling of the standings during match windows.
+
+When LIVE_POLLING is enabled, an in-process scheduler polls Sofascore
+every LIVE_POLL_SECONDS while games may be in progress and sleeps until
+the next window, at most LIVE_IDLE_MAX_SECONDS, in between. The windows
+(``session_utils.MATCH_WINDOWS``) are only a heuristic of the usual
+kick-off times, so inside one the interval doubles after
+LIVE_BACKOFF_AFTER polls in a row without changes, up to
+LIVE_BACKOFF_MAX_SECONDS, and drops back on the first change. Polls reuse the sync change detection
+(content hash + per-team diff), so only real changes re-rank. They never
+write snapshots; they flag the session so the next regular sync records it.
+"""
+
+import logging
+from datetime import datetime, timedelta, timezone
+
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..database import AsyncSessionLocal, run_in_session
+from . import app_state, sync_jobs, sync_service
+from .session_utils import in_match_window, seconds_until_match_window
+
+logger = logging.getLogger("bolao.live")
+
+JOB_ID = "live_poll"
+LOCK_OWNER = "live"
+
+_scheduler: AsyncIOScheduler | None = None
+_unchanged = 0
+
+
+def next_delay(unchanged: int = 0) -> int:
+    """Seconds until the next poll, after ``unchanged`` polls in a row without changes."""
+    if in_match_window():
+        extra = min(unchanged - settings.LIVE_BACKOFF_AFTER + 1, 16)
+        if extra <= 0:
+            return settings.LIVE_POLL_SECONDS
+        return max(
+            min(settings.LIVE_POLL_SECONDS * 2**extra, settings.LIVE_BACKOFF_MAX_SECONDS),
+            settings.LIVE_POLL_SECONDS,
+        )
+    return max(
+        min(seconds_until_match_window(), settings.LIVE_IDLE_MAX_SECONDS),
+        settings.LIVE_POLL_SECONDS,
+    )
+
+
+def _store(db: Session, standings: list[dict]) -> bool:
+    result = sync_service.store_standings(db, standings)
+    if not result.unchanged:
+        app_state.set_value(db, sync_jobs.SNAPSHOT_PENDING_KEY, "1")
+        db.commit()
+    return not result.unchanged
+
+
+async def poll_once() -> bool:
+    """Fetch and apply the standings once. Returns whether anything changed."""
+    async with AsyncSessionLocal() as db:
+        locked = await db.run_sync(
+            app_state.try_lock, sync_jobs.LOCK_KEY, LOCK_OWNER, settings.SYNC_LOCK_TTL
+        )
+    if not locked:
+        logger.info("Live: sync em andamento, pulando.")
+        return False
+
+    try:
+        standings = await sync_service.fetch_standings()
+        return await run_in_session(_store, standings)
+    finally:
+        async with AsyncSessionLocal() as db:
+            await db.run_sync(app_state.release_lock, sync_jobs.LOCK_KEY, LOCK_OWNER)
+
+
+async def _run() -> None:
+    global _unchanged
+    changed = False
+    try:
+        changed = await poll_once()
+        if changed:
+            logger.info("Live: classificação atualizada.")
+    except Exception as e:
+        logger.warning("Live: falha ao atualizar: %s", e)
+    finally:
+        # Failed polls count as unchanged, so a failing upstream is backed off too.
+        _unchanged = 0 if changed or not in_match_window() else _unchanged + 1
+        _schedule(next_delay(_unchanged))
+
+
+def _schedule(delay: int) -> None:
+    if _scheduler is None:
+        return
+    run_date = datetime.now(timezone.utc) + timedelta(seconds=delay)
+    _scheduler.add_job(_run, "date", run_date=run_date, id=JOB_ID, replace_existing=True)
+    logger.debug("Live: próxima consulta em %ds.", delay)
+
+
+def start() -> None:
+    global _scheduler
+    if not settings.LIVE_POLLING or _scheduler is not None:
+        return
+    _scheduler = AsyncIOScheduler(timezone=timezone.utc)
+    _scheduler.start()
+    _schedule(0 if in_match_window() else next_delay())
+    logger.info("Live: polling ativo (%ds durante os jogos).", settings.LIVE_POLL_SECONDS)
+
+
+def shutdown() -> None:
+    global _scheduler
+    if _scheduler is not None:
+        _scheduler.shutdown(wait=False)
+        _scheduler = None
@@ -0,0 +1,76 @@
+"""Pre-encoded JSON bodies for hot read endpoints, built once per data version."""
+
+import asyncio
+import gzip
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from sqlalchemy.orm import Session
+
+from ..database import run_in_session
+
+try:
+    import brotli
+except ImportError:  # optional: only gzip is served without it
+    brotli = None
+
+# Below this size compression isn't worth the extra header and CPU.
+MIN_COMPRESS_SIZE = 1024
+
+
+@dataclass(frozen=True)
+class EncodedPayload:
+    raw: bytes
+    gzip: bytes | None = None
+    br: bytes | None = None
+
+    @classmethod
+    def encode(cls, body: bytes) -> "EncodedPayload":
+        if len(body) < MIN_COMPRESS_SIZE:
+            return cls(raw=body)
+        return cls(
+            raw=body,
+            gzip=gzip.compress(body, compresslevel=6),
+            br=brotli.compress(body, quality=5) if brotli is not None else None,
+        )
+
+
+_lock = threading.Lock()
+_payloads: dict[str, tuple[str, EncodedPayload]] = {}
+# Builds in progress, so concurrent misses for the same key share one build.
+_building: dict[str, tuple[str, asyncio.Task]] = {}
+
+
+def _build(db: Session, build: Callable[[Session], bytes]) -> EncodedPayload:
+    return EncodedPayload.encode(build(db))
+
+
+async def get_payload(name: str, key: str, build: Callable[[Session], bytes]) -> EncodedPayload:
+    """
+    Return the payload cached under ``name`` for ``key``. On a miss,
+    ``build(db)`` and the compression run once, in a worker thread.
+    """
+    with _lock:
+        cached = _payloads.get(name)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    loop = asyncio.get_running_loop()
+    pending = _building.get(name)
+    if pending is None or pending[0] != key or pending[1].get_loop() is not loop:
+        task = loop.create_task(run_in_session(_build, build))
+        _building[name] = (key, task)
+        task.add_done_callback(lambda t: _store(name, key, t))
+        pending = (key, task)
+    # Shielded: a client going away must not cancel the build others wait on.
+    return await asyncio.shield(pending[1])
+
+
+def _store(name: str, key: str, task: asyncio.Task) -> None:
+    if _building.get(name, (None, None))[1] is task:
+        del _building[name]
+    if task.cancelled() or task.exception() is not None:
+        return
+    with _lock:
+        _payloads[name] = (key, task.result())
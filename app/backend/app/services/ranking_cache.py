@@ -0,0 +1,187 @@
+"""In-memory cache of the built ranking, keyed by data version and session."""
+
+import threading
+from collections import OrderedDict
+from datetime import date
+
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..schemas import RankingEntry, RankingResponse
+from . import data_version
+from .ranking_service import (
+    RankingState,
+    build_ranking,
+    diff_ranking,
+    load_ranking_state,
+    update_ranking_state,
+)
+from .session_utils import get_session_date
+
+_lock = threading.Lock()
+_key: tuple[int, date] | None = None
+_state: RankingState | None = None
+_ranking: RankingResponse | None = None
+_sessions: OrderedDict[tuple[date, int], RankingResponse] = OrderedDict()
+# Rankings served at recent versions, for deltas against what a client holds.
+_history: OrderedDict[tuple[int, date], RankingResponse] = OrderedDict()
+_positions: tuple[tuple[int, date], dict[int, int]] | None = None
+_deltas: dict[tuple[int, tuple[int, date]], tuple[list[RankingEntry], list[int]]] = {}
+
+
+def _remember(key: tuple[int, date], ranking: RankingResponse) -> None:
+    # Caller holds _lock.
+    if key not in _history:
+        _history[key] = ranking
+        while len(_history) > settings.RANKING_HISTORY_SIZE:
+            _history.popitem(last=False)
+
+
+def _store(
+    key: tuple[int, date], state: RankingState
+) -> tuple[RankingState, RankingResponse]:
+    global _key, _state, _ranking
+    ranking = state.response()
+    with _lock:
+        if data_version.current() == key[0]:
+            _key, _state, _ranking = key, state, ranking
+            _remember(key, ranking)
+    return state, ranking
+
+
+def get_ranking(db: Session) -> RankingResponse:
+    """
+    Return the ranking for the current data version, building it on a miss.
+    The session date is part of the key because the deltas are computed
+    against the previous session's snapshot.
+    """
+    return _get_ranking(db, (data_version.current(), get_session_date()))
+
+
+def _get_ranking(db: Session, key: tuple[int, date]) -> RankingResponse:
+    with _lock:
+        if _key == key and _ranking is not None:
+            return _ranking
+    return _store(key, load_ranking_state(db))[1]
+
+
+def get_rank_index(db: Session) -> tuple[RankingResponse, dict[int, int]]:
+    """
+    Current ranking and a map from apostador id to its index in
+    ``entries``, built once per data version for single-entry and top-K reads.
+    """
+    global _positions
+    key = (data_version.current(), get_session_date())
+    with _lock:
+        if _key == key and _state is not None and _ranking is not None:
+            state, ranking = _state, _ranking
+            if _positions is not None and _positions[0] == key:
+                return ranking, _positions[1]
+        else:
+            state = None
+    if state is None:
+        state, ranking = _store(key, load_ranking_state(db))
+
+    ids = state.matrix.apostador_ids
+    positions = {int(ids[row]): i for i, row in enumerate(state.order)}
+    with _lock:
+        _positions = (key, positions)
+    return ranking, positions
+
+
+def get_ranking_delta(
+    db: Session, since: int
+) -> tuple[int, RankingResponse, tuple[list[RankingEntry], list[int]] | None]:
+    """
+    Current version and ranking, plus the entries changed and removed since
+    the ranking served at version ``since``. The diff is None when that
+    version has left the last RANKING_HISTORY_SIZE (or belongs to another
+    session), and the client has to take the whole ranking.
+    """
+    key = (data_version.current(), get_session_date())
+    ranking = _get_ranking(db, key)
+    with _lock:
+        old = _history.get((since, key[1]))
+        diff = _deltas.get((since, key))
+    if old is None or diff is not None:
+        return key[0], ranking, diff
+
+    diff = diff_ranking(old, ranking)
+    with _lock:
+        if len(_deltas) >= settings.RANKING_HISTORY_SIZE:
+            _deltas.clear()
+        _deltas[(since, key)] = diff
+    return key[0], ranking, diff
+
+
+def get_state(db: Session) -> RankingState:
+    """Columnar state behind ``get_ranking``, for services that reuse it."""
+    key = (data_version.current(), get_session_date())
+    with _lock:
+        if _key == key and _state is not None:
+            return _state
+    return _store(key, load_ranking_state(db))[0]
+
+
+def get_session_ranking(db: Session, session: date) -> RankingResponse:
+    """
+    Ranking as it stood at a past session, rebuilt from its recorded team
+    standings. Keeps the last RANKING_SESSION_CACHE_SIZE rebuilds.
+    """
+    key = (session, data_version.current())
+    with _lock:
+        ranking = _sessions.get(key)
+        if ranking is not None:
+            _sessions.move_to_end(key)
+            return ranking
+
+    ranking = build_ranking(db, session)
+    with _lock:
+        _sessions[key] = ranking
+        while len(_sessions) > settings.RANKING_SESSION_CACHE_SIZE:
+            _sessions.popitem(last=False)
+    return ranking
+
+
+def invalidate(reason: str) -> int:
+    """Bump the data version, dropping the cached ranking."""
+    global _key, _state, _ranking
+    with _lock:
+        _key, _state, _ranking = None, None, None
+    return data_version.bump(reason)
+
+
+def bump_keeping_ranking(reason: str) -> int:
+    """
+    Bump the data version for writes that don't change the current ranking
+    (e.g. recording the current session's snapshot), carrying the cached
+    ranking over to the new version.
+    """
+    global _key
+    with _lock:
+        old_key = _key
+        version = data_version.bump(reason)
+        if old_key is not None and old_key[0] == version - 1:
+            _key = (version, old_key[1])
+            if _ranking is not None:
+                _remember(_key, _ranking)
+    return version
+
+
+def apply_team_changes(db: Session, team_pks: set[int] | None, reason: str) -> int:
+    """
+    Bump the data version after a standings write. When the cached state is
+    current, patch it for the changed teams instead of dropping it;
+    ``team_pks=None`` (e.g. new teams) forces a full rebuild on the next read.
+    """
+    global _key, _state, _ranking
+    session = get_session_date()
+    with _lock:
+        state = _state if _key is not None and _key[1] == session else None
+        version = data_version.bump(reason)
+        if state is None or _key[0] != version - 1 or team_pks is None:
+            _key, _state, _ranking = None, None, None
+            return version
+
+    _store((version, session), update_ranking_state(db, state, team_pks))
+    return version
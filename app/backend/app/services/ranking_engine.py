@@ -0,0 +1,172 @@
+"""
+Columnar ranking engine.
+
+Picks live in an (apostadores x TIMES_PER_APOSTADOR) matrix of indices into
+the team arrays. Index ``n_teams`` is a sentinel row of zeros used for empty
+slots and for palpites pointing at unknown teams.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass
+class TeamTable:
+    pks: np.ndarray
+    sofascore_ids: np.ndarray
+    points: np.ndarray
+    matches: np.ndarray
+    positions: np.ndarray
+    names: np.ndarray
+    codes: np.ndarray
+
+    @property
+    def sentinel(self) -> int:
+        return len(self.pks)
+
+    @classmethod
+    def from_rows(cls, rows) -> "TeamTable":
+        """
+        Build from objects exposing id, sofascore_id, points, matches,
+        position, name and name_code (ORM ``Team`` rows or query tuples).
+        """
+        rows = list(rows)
+
+        def column(attr: str) -> np.ndarray:
+            return np.array([getattr(r, attr) for r in rows] + [0], dtype=np.int64)
+
+        return cls(
+            pks=np.array([r.id for r in rows], dtype=np.int64),
+            sofascore_ids=column("sofascore_id"),
+            points=column("points"),
+            matches=column("matches"),
+            positions=column("position"),
+            names=np.array([r.name for r in rows] + [""], dtype=object),
+            codes=np.array([r.name_code for r in rows] + [""], dtype=object),
+        )
+
+    def lookup(self, team_pks: np.ndarray) -> np.ndarray:
+        """Map team primary keys to row indices (sentinel when unknown)."""
+        if not len(self.pks):
+            return np.full(team_pks.shape, self.sentinel, dtype=np.int64)
+        sorter = np.argsort(self.pks)
+        pos = np.searchsorted(self.pks, team_pks, sorter=sorter)
+        pos = np.clip(pos, 0, len(self.pks) - 1)
+        idx = sorter[pos]
+        return np.where(self.pks[idx] == team_pks, idx, self.sentinel)
+
+
+@dataclass
+class PickMatrix:
+    apostador_ids: np.ndarray
+    ordem: np.ndarray
+    picks: np.ndarray
+    pick_pks: np.ndarray
+
+    @classmethod
+    def from_palpites(
+        cls,
+        apostador_ids: np.ndarray,
+        ordem: np.ndarray,
+        palpites: np.ndarray,
+        teams: TeamTable,
+        width: int,
+    ) -> "PickMatrix":
+        """
+        ``palpites`` is an (n, 3) array of (apostador_id, team_id, prioridade).
+        Each apostador's palpites fill the row in prioridade order; unused
+        slots hold the sentinel.
+        """
+        n = len(apostador_ids)
+        picks = np.full((n, width), teams.sentinel, dtype=np.int64)
+        pick_pks = np.zeros((n, width), dtype=np.int64)
+        if n and len(palpites):
+            row_sorter = np.argsort(apostador_ids)
+            row_pos = np.searchsorted(apostador_ids, palpites[:, 0], sorter=row_sorter)
+            row_pos = np.clip(row_pos, 0, n - 1)
+            rows = row_sorter[row_pos]
+            known = apostador_ids[rows] == palpites[:, 0]
+            rows, palpites = rows[known], palpites[known]
+
+            order = np.lexsort((palpites[:, 2], rows))
+            rows, team_pks = rows[order], palpites[order, 1]
+            group_start = np.searchsorted(rows, rows, side="left")
+            cols = np.arange(len(rows)) - group_start
+            fits = cols < width
+            rows, cols, team_pks = rows[fits], cols[fits], team_pks[fits]
+
+            picks[rows, cols] = teams.lookup(team_pks)
+            pick_pks[rows, cols] = team_pks
+        return cls(apostador_ids=apostador_ids, ordem=ordem, picks=picks, pick_pks=pick_pks)
+
+
+@dataclass
+class Scores:
+    pontos: np.ndarray
+    jogos: np.ndarray
+    total: np.ndarray
+    total_jogos: np.ndarray
+    media_pontos: np.ndarray
+    aproveitamento: np.ndarray
+
+
+@dataclass
+class TeamIndex:
+    """Inverted index team row -> (apostador rows, pick columns), in CSR form."""
+
+    indptr: np.ndarray
+    rows: np.ndarray
+    cols: np.ndarray
+
+    @classmethod
+    def from_picks(cls, picks: np.ndarray, n_teams: int) -> "TeamIndex":
+        flat = picks.ravel()
+        order = np.argsort(flat, kind="stable")
+        counts = np.bincount(flat, minlength=n_teams + 1)
+        indptr = np.concatenate(([0], np.cumsum(counts)))
+        rows, cols = np.divmod(order, picks.shape[1])
+        return cls(indptr=indptr, rows=rows, cols=cols)
+
+    def rows_for(self, team_rows) -> np.ndarray:
+        """Distinct apostador rows that picked any of ``team_rows``."""
+        parts = [self.rows[self.indptr[t]:self.indptr[t + 1]] for t in team_rows]
+        if not parts:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(parts))
+
+
+def score(matrix: PickMatrix, teams: TeamTable, rows: np.ndarray | None = None) -> Scores:
+    """Score every apostador, or only ``rows`` when given."""
+    picks = matrix.picks if rows is None else matrix.picks[rows]
+    pontos = teams.points[picks]
+    jogos = teams.matches[picks]
+    total = pontos.sum(axis=1)
+    total_jogos = jogos.sum(axis=1)
+    played = total_jogos > 0
+    safe_jogos = np.where(played, total_jogos, 1)
+    media = np.where(played, total / safe_jogos, 0.0)
+    aproveitamento = np.where(played, (total / (safe_jogos * 3)) * 100, 0.0)
+    return Scores(
+        pontos=pontos,
+        jogos=jogos,
+        total=total,
+        total_jogos=total_jogos,
+        media_pontos=media,
+        aproveitamento=aproveitamento,
+    )
+
+
+def sort_key(scores: Scores, ordem: np.ndarray, row: int) -> tuple:
+    """Tuple equivalent of ``rank_order`` for a single row, used by targeted moves."""
+    return (-int(scores.total[row]), *(-scores.pontos[row]).tolist(), int(ordem[row]))
+
+
+def rank_order(total: np.ndarray, pontos: np.ndarray, ordem: np.ndarray) -> np.ndarray:
+    """
+    Row indices in ranking order.
+    Desempate: total (desc), pontos prioridade 1..7 (desc), ordem inscrição (asc).
+    ``np.lexsort`` treats the last key as primary, so priorities go in reverse.
+    """
+    keys = [ordem] + [-pontos[..., i] for i in reversed(range(pontos.shape[-1]))] + [-total]
+    return np.lexsort(keys, axis=-1)
@@ -0,0 +1,160 @@
+"""
+In-process broadcaster behind ``/api/ranking/stream`` (Server-Sent Events).
+
+Data version bumps (syncs, apostador edits) are debounced by
+SSE_DEBOUNCE_SECONDS and then published once: the new ranking is diffed
+against the last published one and encoded to SSE bytes a single time.
+Subscribers only hold the sequence number they last sent and all wait on
+the same ``asyncio.Event``, so an idle connection costs one suspended
+coroutine. A subscriber that falls behind skips straight to the latest
+event; ``previous`` in the payload tells the client it missed one and
+should reload. Versions are the ETag prefix (``http_cache.version_token``).
+"""
+
+import asyncio
+import json
+import logging
+from collections.abc import AsyncIterator
+
+from ..config import settings
+from ..database import run_in_session
+from ..http_cache import version_token
+from ..schemas import RankingResponse
+from . import data_version, ranking_cache
+from .ranking_service import diff_ranking
+
+logger = logging.getLogger("bolao.events")
+
+_loop: asyncio.AbstractEventLoop | None = None
+_publish_lock: asyncio.Lock | None = None
+_changed: asyncio.Event | None = None
+_pending: asyncio.TimerHandle | None = None
+_tasks: set[asyncio.Task] = set()
+_listening = False
+_subscribers = 0
+
+_seq = 0
+_frames = b""
+_token: str | None = None
+_ranking: RankingResponse | None = None
+
+
+def _frame(event: str, data: dict) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n".encode()
+
+
+def _on_bump(version: int) -> None:
+    # Called from whichever thread bumped the version (worker threads included).
+    loop = _loop
+    if loop is not None and not loop.is_closed():
+        loop.call_soon_threadsafe(_debounce)
+
+
+def _debounce() -> None:
+    global _pending
+    if _pending is not None:
+        _pending.cancel()
+    _pending = _loop.call_later(settings.SSE_DEBOUNCE_SECONDS, _start_publish)
+
+
+def _start_publish() -> None:
+    # Hold a reference until it finishes, or the task may be collected mid-run.
+    task = _loop.create_task(_publish())
+    _tasks.add(task)
+    task.add_done_callback(_publish_done)
+
+
+def _publish_done(task: asyncio.Task) -> None:
+    _tasks.discard(task)
+    if not task.cancelled() and (e := task.exception()) is not None:
+        logger.error("SSE: falha ao publicar: %s", e, exc_info=e)
+
+
+async def _load() -> RankingResponse:
+    return await run_in_session(ranking_cache.get_ranking)
+
+
+async def _publish() -> None:
+    global _seq, _frames, _token, _ranking, _changed, _pending
+    _pending = None
+    async with _publish_lock:
+        if not _subscribers:
+            # Nobody to diff for; the next subscriber starts from a fresh base.
+            _ranking = None
+            return
+        try:
+            ranking = await _load()
+        except Exception as e:
+            logger.warning("SSE: falha ao montar o ranking: %s", e)
+            return
+        token, previous = version_token(), _token
+        if token == previous:
+            return
+        frames = [_frame("version", {"version": token, "previous": previous})]
+        if _ranking is not None:
+            changed, removed = diff_ranking(_ranking, ranking)
+            frames.append(_frame("ranking-diff", {
+                "version": token,
+                "previous": previous,
+                "rodada": ranking.rodada,
+                "updated_at": ranking.updated_at,
+                "changed": [e.model_dump(mode="json") for e in changed],
+                "removed": removed,
+            }))
+            logger.info("SSE: versão %s, %d alterados, %d assinantes.", token, len(changed), _subscribers)
+        _seq, _frames, _token, _ranking = _seq + 1, b"".join(frames), token, ranking
+        event, _changed = _changed, asyncio.Event()
+        event.set()
+
+
+async def _ensure_base() -> None:
+    global _token, _ranking
+    async with _publish_lock:
+        if _ranking is None:
+            _ranking = await _load()
+            _token = version_token()
+
+
+async def subscribe() -> AsyncIterator[bytes]:
+    """SSE byte stream for one client: current version, then updates and heartbeats."""
+    global _subscribers
+    _subscribers += 1
+    try:
+        await _ensure_base()
+        seq = _seq
+        yield b"retry: 5000\n\n" + _frame("version", {"version": _token, "previous": None})
+        while True:
+            if seq == _seq:
+                try:
+                    async with asyncio.timeout(settings.SSE_HEARTBEAT_SECONDS):
+                        await _changed.wait()
+                except TimeoutError:
+                    yield b": ping\n\n"
+                    continue
+            seq = _seq
+            yield _frames
+    finally:
+        _subscribers -= 1
+
+
+def subscribers() -> int:
+    return _subscribers
+
+
+def start() -> None:
+    global _loop, _publish_lock, _changed, _listening
+    if not _listening:
+        data_version.add_listener(_on_bump)
+        _listening = True
+    _loop = asyncio.get_running_loop()
+    _publish_lock = asyncio.Lock()
+    _changed = asyncio.Event()
+
+
+def shutdown() -> None:
+    global _loop, _pending, _ranking, _token
+    if _pending is not None:
+        _pending.cancel()
+    for task in _tasks:
+        task.cancel()
+    _loop, _pending, _ranking, _token = None, None, None, None
@@ -1,11 +1,18 @@
+import bisect
+import copy
 import logging
+from dataclasses import dataclass, fields, replace
+from datetime import date
+from itertools import chain
 
+import numpy as np
 from sqlalchemy import desc, func
 from sqlalchemy.orm import Session
 
 from ..config import settings
-from ..models import Apostador, Palpite, Snapshot, Team
+from ..models import Apostador, Palpite, Snapshot, Team, TeamStanding
 from ..schemas import RankingEntry, RankingResponse
+from . import ranking_engine
 from .session_utils import get_session_date
 
 logger = logging.getLogger("bolao.ranking")
@@ -13,16 +20,37 @@ logger = logging.getLogger("bolao.ranking")
 BRT_FORMAT = "%d/%m/%Y às %H:%M (Brasília)"
 
 
-def _get_last_sync_time(db: Session) -> str:
-    last = db.query(func.max(Team.updated_at)).scalar()
+def _get_last_sync_time(db: Session, session: date | None = None) -> str:
+    if session is None:
+        last = db.query(func.max(Team.updated_at)).scalar()
+    else:
+        last = (
+            db.query(func.max(TeamStanding.updated_at))
+            .filter(TeamStanding.session_date == session)
+            .scalar()
+        )
     if last:
         return last.strftime(BRT_FORMAT)
     return "Sem dados"
 
 
-def _get_previous_snapshot(db: Session) -> dict[int, Snapshot]:
-    """Return a map of apostador_id -> Snapshot from the most recent previous session."""
-    current_session = get_session_date()
+def _get_rodada(db: Session, session: date | None = None) -> int:
+    if session is None:
+        return db.query(func.max(Team.matches)).scalar() or 0
+    return (
+        db.query(func.max(TeamStanding.matches))
+        .filter(TeamStanding.session_date == session)
+        .scalar()
+        or 0
+    )
+
+
+def _get_previous_snapshot(db: Session, session: date | None = None) -> dict[int, Snapshot]:
+    """
+    Return a map of apostador_id -> Snapshot from the most recent session
+    before ``session`` (default: the current one).
+    """
+    current_session = session or get_session_date()
     prev_date = (
         db.query(Snapshot.session_date)
         .filter(Snapshot.session_date < current_session)
@@ -40,124 +68,241 @@ def _get_previous_snapshot(db: Session) -> dict[int, Snapshot]:
     return {s.apostador_id: s for s in snapshots}
 
 
-def build_ranking(db: Session) -> RankingResponse:
-    teams = {t.sofascore_id: t for t in db.query(Team).all()}
-    team_by_pk = {t.id: t for t in teams.values()}
-    apostadores = db.query(Apostador).all()
+def _query_teams(db: Session, team_pks=None, session: date | None = None):
+    """Team rows for the engine; with ``session``, values come from that session's standings."""
+    if session is not None:
+        return (
+            db.query(
+                Team.id, Team.sofascore_id, Team.name, Team.name_code,
+                TeamStanding.points, TeamStanding.matches, TeamStanding.position,
+            )
+            .join(TeamStanding, TeamStanding.team_id == Team.id)
+            .filter(TeamStanding.session_date == session)
+            .all()
+        )
+
+    query = db.query(
+        Team.id, Team.sofascore_id, Team.name, Team.name_code,
+        Team.points, Team.matches, Team.position,
+    )
+    if team_pks is not None:
+        query = query.filter(Team.id.in_(team_pks))
+    return query.all()
+
 
-    updated_at = _get_last_sync_time(db)
+@dataclass
+class RankingState:
+    """
+    Everything needed to patch the ranking when a few teams change:
+    the columnar scores, the current order, the team -> apostador inverted
+    index and the built entry of each apostador row.
+    """
 
-    max_matches_val = db.query(func.max(Team.matches)).scalar()
+    teams: ranking_engine.TeamTable
+    matrix: ranking_engine.PickMatrix
+    scores: ranking_engine.Scores
+    team_index: ranking_engine.TeamIndex
+    nomes: list[str]
+    prev_pontuacao: dict[int, int]
+    prev_rank: dict[int, int]
+    order: list[int]
+    entries: list[RankingEntry | None]
+    updated_at: str
+    rodada: int
 
-    if not apostadores:
+    def response(self) -> RankingResponse:
         return RankingResponse(
-            updated_at=updated_at,
+            updated_at=self.updated_at,
             display_column=settings.DISPLAY_COLUMN,
-            rodada=max_matches_val or 0,
-            entries=[],
+            rodada=self.rodada,
+            entries=[self.entries[row] for row in self.order],
         )
 
-    prev_snapshots = _get_previous_snapshot(db)
-    ap_id_map = {ap.nome: ap.id for ap in apostadores}
-
-    rows: list[dict] = []
-    for ap in apostadores:
-        palpites = sorted(ap.palpites, key=lambda p: p.prioridade)
-        pontos: list[int] = []
-        nomes: list[str] = []
-        codes: list[str] = []
-        team_ids: list[int] = []
-        team_positions: list[int] = []
-        total = 0
-        total_jogos = 0
-
-        for i in range(settings.TIMES_PER_APOSTADOR):
-            if i < len(palpites):
-                team = team_by_pk.get(palpites[i].team_id)
-                pts = team.points if team else 0
-                name = team.name if team else f"ID:{palpites[i].team_id}"
-                code = team.name_code if team else ""
-                sf_id = team.sofascore_id if team else 0
-                pos = team.position if team else 0
-                matches = team.matches if team else 0
-                pontos.append(pts)
-                nomes.append(name)
-                codes.append(code)
-                team_ids.append(sf_id)
-                team_positions.append(pos)
-                total += pts
-                total_jogos += matches
-            else:
-                pontos.append(0)
-                nomes.append("")
-                codes.append("")
-                team_ids.append(0)
-                team_positions.append(0)
-
-        media_pontos = round(total / total_jogos, 2) if total_jogos > 0 else 0.0
-        aproveitamento = round((total / (total_jogos * 3)) * 100, 2) if total_jogos > 0 else 0.0
-
-        rows.append(
-            {
-                "apostador": ap.nome,
-                "ordem_inscricao": ap.ordem_inscricao,
-                "total": total,
-                "total_jogos": total_jogos,
-                "media_pontos": media_pontos,
-                "aproveitamento": aproveitamento,
-                "pontos": pontos,
-                "times": nomes,
-                "times_codes": codes,
-                "team_ids": team_ids,
-                "team_positions": team_positions,
-            }
+    def _build_entry(self, row: int, current_rank: int) -> RankingEntry:
+        picks = self.matrix.picks[row]
+        scores = self.scores
+        times = self.teams.names[picks].tolist()
+        for c in np.nonzero(picks == self.teams.sentinel)[0]:
+            pk = int(self.matrix.pick_pks[row, c])
+            if pk:
+                times[c] = f"ID:{pk}"
+
+        total = int(scores.total[row])
+        prev_pontuacao = self.prev_pontuacao.get(row)
+        prev_rank = self.prev_rank.get(row)
+        return RankingEntry.model_construct(
+            rank=current_rank,
+            apostador=self.nomes[row],
+            ordem_inscricao=int(self.matrix.ordem[row]),
+            total=total,
+            total_jogos=int(scores.total_jogos[row]),
+            media_pontos=round(float(scores.media_pontos[row]), 2),
+            aproveitamento=round(float(scores.aproveitamento[row]), 2),
+            delta_pontos=total - prev_pontuacao if prev_pontuacao is not None else None,
+            delta_rank=prev_rank - current_rank if prev_rank is not None else None,
+            pontos=scores.pontos[row].tolist(),
+            times=times,
+            times_codes=self.teams.codes[picks].tolist(),
+            team_ids=self.teams.sofascore_ids[picks].tolist(),
+            team_positions=self.teams.positions[picks].tolist(),
         )
 
-    rows.sort(key=_sort_key)
 
-    entries = []
-    for idx, r in enumerate(rows):
+def load_ranking_state(db: Session, session: date | None = None) -> RankingState:
+    """
+    Build the state for the current standings or, with ``session``, for a
+    past session from its recorded team standings.
+    """
+    teams = ranking_engine.TeamTable.from_rows(_query_teams(db, session=session))
+    apostadores = (
+        db.query(Apostador.id, Apostador.nome, Apostador.ordem_inscricao)
+        .order_by(Apostador.id)
+        .all()
+    )
+    # Flattened first: np.array() on Row objects probes each one for the
+    # array protocol through Row.__getattr__, which is far slower.
+    palpites = np.fromiter(
+        chain.from_iterable(
+            db.query(Palpite.apostador_id, Palpite.team_id, Palpite.prioridade).all()
+        ),
+        dtype=np.int64,
+    ).reshape(-1, 3)
+    matrix = ranking_engine.PickMatrix.from_palpites(
+        apostador_ids=np.array([a.id for a in apostadores], dtype=np.int64),
+        ordem=np.array([a.ordem_inscricao for a in apostadores], dtype=np.int64),
+        palpites=palpites,
+        teams=teams,
+        width=settings.TIMES_PER_APOSTADOR,
+    )
+    scores = ranking_engine.score(matrix, teams)
+    order = ranking_engine.rank_order(scores.total, scores.pontos, matrix.ordem).tolist()
+
+    row_of = {a.id: row for row, a in enumerate(apostadores)}
+    prev_snapshots = _get_previous_snapshot(db, session) if apostadores else {}
+    prev_pontuacao: dict[int, int] = {}
+    prev_rank: dict[int, int] = {}
+    for ap_id, snap in prev_snapshots.items():
+        row = row_of.get(ap_id)
+        if row is not None:
+            prev_pontuacao[row] = snap.pontuacao
+            prev_rank[row] = snap.rank
+
+    state = RankingState(
+        teams=teams,
+        matrix=matrix,
+        scores=scores,
+        team_index=ranking_engine.TeamIndex.from_picks(matrix.picks, teams.sentinel),
+        nomes=[a.nome for a in apostadores],
+        prev_pontuacao=prev_pontuacao,
+        prev_rank=prev_rank,
+        order=order,
+        entries=[None] * len(apostadores),
+        updated_at=_get_last_sync_time(db, session),
+        rodada=_get_rodada(db, session),
+    )
+    for idx, row in enumerate(order):
+        state.entries[row] = state._build_entry(row, idx + 1)
+    return state
+
+
+def update_ranking_state(
+    db: Session, state: RankingState, team_pks: set[int]
+) -> RankingState:
+    """
+    Return a new state with the given teams reloaded. Only apostadores who
+    picked one of them are rescored, and the order is repaired by moving
+    those whose sort key changed instead of sorting everything again.
+    """
+    teams = copy.copy(state.teams)
+    teams.points = teams.points.copy()
+    teams.matches = teams.matches.copy()
+    teams.positions = teams.positions.copy()
+    teams.names = teams.names.copy()
+    teams.codes = teams.codes.copy()
+
+    fresh = _query_teams(db, team_pks)
+    team_rows = teams.lookup(np.array([t.id for t in fresh], dtype=np.int64))
+    for t, idx in zip(fresh, team_rows.tolist()):
+        teams.points[idx] = t.points
+        teams.matches[idx] = t.matches
+        teams.positions[idx] = t.position
+        teams.names[idx] = t.name
+        teams.codes[idx] = t.name_code
+
+    affected = state.team_index.rows_for(team_rows.tolist())
+    scores = ranking_engine.Scores(
+        **{f.name: getattr(state.scores, f.name).copy() for f in fields(state.scores)}
+    )
+    if len(affected):
+        partial = ranking_engine.score(state.matrix, teams, affected)
+        for f in fields(scores):
+            getattr(scores, f.name)[affected] = getattr(partial, f.name)
+
+    ordem = state.matrix.ordem
+    moved = {
+        row for row in affected.tolist()
+        if ranking_engine.sort_key(scores, ordem, row)
+        != ranking_engine.sort_key(state.scores, ordem, row)
+    }
+    order = [row for row in state.order if row not in moved] if moved else list(state.order)
+    for row in moved:
+        bisect.insort(order, row, key=lambda r: ranking_engine.sort_key(scores, ordem, r))
+
+    new_state = replace(
+        state,
+        teams=teams,
+        scores=scores,
+        order=order,
+        entries=list(state.entries),
+        updated_at=_get_last_sync_time(db),
+        rodada=_get_rodada(db),
+    )
+    rescored = set(affected.tolist())
+    for idx, row in enumerate(order):
         current_rank = idx + 1
-        ap_id = ap_id_map.get(r["apostador"])
-        prev = prev_snapshots.get(ap_id) if ap_id else None
-
-        delta_pontos = r["total"] - prev.pontuacao if prev else None
-        delta_rank = prev.rank - current_rank if prev else None
-
-        entries.append(
-            RankingEntry(
-                rank=current_rank,
-                apostador=r["apostador"],
-                ordem_inscricao=r["ordem_inscricao"],
-                total=r["total"],
-                total_jogos=r["total_jogos"],
-                media_pontos=r["media_pontos"],
-                aproveitamento=r["aproveitamento"],
-                delta_pontos=delta_pontos,
-                delta_rank=delta_rank,
-                pontos=r["pontos"],
-                times=r["times"],
-                times_codes=r["times_codes"],
-                team_ids=r["team_ids"],
-                team_positions=r["team_positions"],
+        entry = new_state.entries[row]
+        if row in rescored:
+            new_state.entries[row] = new_state._build_entry(row, current_rank)
+        elif entry.rank != current_rank:
+            prev_rank = new_state.prev_rank.get(row)
+            new_state.entries[row] = entry.model_copy(
+                update={
+                    "rank": current_rank,
+                    "delta_rank": prev_rank - current_rank if prev_rank is not None else None,
+                }
             )
-        )
 
-    return RankingResponse(
-        updated_at=updated_at,
-        display_column=settings.DISPLAY_COLUMN,
-        rodada=max_matches_val or 0,
-        entries=entries,
+    logger.info(
+        "Ranking incremental: %d times, %d apostadores reavaliados, %d movidos.",
+        len(team_pks), len(rescored), len(moved),
+    )
+    return new_state
+
+
+def build_ranking(db: Session, session: date | None = None) -> RankingResponse:
+    return load_ranking_state(db, session).response()
+
+
+def has_session_standings(db: Session, session: date) -> bool:
+    return (
+        db.query(TeamStanding.id)
+        .filter(TeamStanding.session_date == session)
+        .first()
+        is not None
     )
 
 
-def _sort_key(row: dict):
+def diff_ranking(
+    old: RankingResponse, new: RankingResponse
+) -> tuple[list[RankingEntry], list[int]]:
     """
-    Desempate: total (desc), pontos prioridade 1..7 (desc), ordem inscrição (asc).
-    Negate numeric values for descending sort.
+    Entries of ``new`` that differ from ``old`` (matched by ordem_inscricao)
+    and the ordem_inscricao of entries that disappeared.
     """
-    key = [-row["total"]]
-    for pts in row["pontos"]:
-        key.append(-pts)
-    key.append(row["ordem_inscricao"])
-    return tuple(key)
+    previous = {e.ordem_inscricao: e for e in old.entries}
+    changed = []
+    for entry in new.entries:
+        before = previous.pop(entry.ordem_inscricao, None)
+        if before is not entry and before != entry:
+            changed.append(entry)
+    return changed, sorted(previous)
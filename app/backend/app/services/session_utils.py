@@ -43,3 +43,51 @@ def get_session_date() -> date:
 
 def format_date_key(d: date) -> str:
     return d.isoformat()
+
+
+def seconds_until_session() -> int:
+    """
+    Seconds from now until the next session boundary (00:00, Brasília): the
+    start of the session closing day or, on that day, of the next one, when
+    the following session begins.
+    """
+    now = brasilia_now()
+    session = get_session_date()
+    boundary = session if session > now.date() else session + timedelta(days=1)
+    start = datetime.combine(boundary, datetime.min.time())
+    return max(int((start - now).total_seconds()), 0)
+
+
+# Usual Brasileirão kick-off windows (Brasília, hours), with time for the last
+# games to finish: weekday -> (start, end). Tue/Fri only have stray games.
+MATCH_WINDOWS = {
+    0: (19.0, 24.0),  # Mon
+    1: (19.0, 24.0),  # Tue
+    2: (19.0, 24.0),  # Wed
+    3: (19.0, 24.0),  # Thu
+    4: (19.0, 24.0),  # Fri
+    5: (11.0, 24.0),  # Sat
+    6: (11.0, 24.0),  # Sun
+}
+
+
+def in_match_window(now: datetime | None = None) -> bool:
+    now = now or brasilia_now()
+    start, end = MATCH_WINDOWS[now.weekday()]
+    hour = now.hour + now.minute / 60
+    return start <= hour < end
+
+
+def seconds_until_match_window(now: datetime | None = None) -> int:
+    """Seconds until the next match window opens (0 while inside one)."""
+    now = now or brasilia_now()
+    if in_match_window(now):
+        return 0
+    for offset in range(8):
+        day = now.date() + timedelta(days=offset)
+        start = datetime.combine(day, datetime.min.time()) + timedelta(
+            hours=MATCH_WINDOWS[day.weekday()][0]
+        )
+        if start > now:
+            return int((start - now).total_seconds())
+    return 0
@@ -0,0 +1,190 @@
+"""
+Monte Carlo simulation of the rest of the season.
+
+Each team plays its remaining matches independently, with win/draw
+probabilities taken from its own record shrunk towards the league average.
+Fixtures are not modelled, so two teams can both win "their" head-to-head;
+that is acceptable for title odds and keeps everything vectorized over
+(simulations x teams). Seasons are simulated in chunks sized so that one
+chunk's (simulations x apostadores x picks) arrays stay within
+SIMULATION_CHUNK_MB. The sync job warms the result after each sync, so
+requests don't pay for it.
+"""
+
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..database import run_in_session
+from ..models import Team
+from ..schemas import SimulacaoEntry, SimulacaoResponse
+from . import data_version, ranking_cache, ranking_engine
+
+logger = logging.getLogger("bolao.simulacao")
+
+PRIOR_MATCHES = 5.0
+PRIOR_WIN = 0.37
+PRIOR_DRAW = 0.26
+
+_lock = threading.Lock()
+_cached: tuple[int, SimulacaoResponse] | None = None
+_pool: ProcessPoolExecutor | None = None
+
+
+def _outcome_probabilities(
+    wins: np.ndarray, draws: np.ndarray, matches: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Per-team P(win) and P(draw | not win)."""
+    denom = matches + PRIOR_MATCHES
+    p_win = (wins + PRIOR_MATCHES * PRIOR_WIN) / denom
+    p_draw = (draws + PRIOR_MATCHES * PRIOR_DRAW) / denom
+    p_draw_given_no_win = np.clip(p_draw / np.maximum(1.0 - p_win, 1e-9), 0.0, 1.0)
+    return p_win, p_draw_given_no_win
+
+
+def _simulate_chunk(
+    seed: np.random.SeedSequence,
+    runs: int,
+    points: np.ndarray,
+    remaining: np.ndarray,
+    p_win: np.ndarray,
+    p_draw: np.ndarray,
+    picks: np.ndarray,
+    ordem: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Simulate ``runs`` seasons. Returns per-apostador counts of 1st places,
+    top-3 finishes and the sum of final ranks. Module-level so that it can
+    be sent to a process pool.
+    """
+    rng = np.random.default_rng(seed)
+    n_teams = len(points)
+    wins = rng.binomial(remaining, p_win, size=(runs, n_teams))
+    draws = rng.binomial(remaining - wins, p_draw)
+
+    final = np.zeros((runs, n_teams + 1), dtype=np.int64)
+    final[:, :n_teams] = points + 3 * wins + draws
+
+    pontos = final[:, picks]
+    total = pontos.sum(axis=-1)
+    order = ranking_engine.rank_order(
+        total, pontos, np.broadcast_to(ordem, total.shape)
+    )
+    ranks = np.empty_like(order)
+    np.put_along_axis(
+        ranks, order, np.arange(1, order.shape[1] + 1)[None, :], axis=1
+    )
+    return (ranks == 1).sum(axis=0), (ranks <= 3).sum(axis=0), ranks.sum(axis=0)
+
+
+def chunk_size(apostadores: int, picks_per: int) -> int:
+    """
+    Seasons per chunk: SIMULATION_CHUNK_SIZE, lowered so that a chunk's
+    per-apostador arrays (the gathered picks, their negated sort keys,
+    totals and ranks, about 2 * picks_per + 6 int64s each) fit in
+    SIMULATION_CHUNK_MB.
+    """
+    per_run = max(apostadores, 1) * (2 * picks_per + 6) * 8
+    budget = settings.SIMULATION_CHUNK_MB * 1024 * 1024
+    return max(min(settings.SIMULATION_CHUNK_SIZE, budget // per_run), 1)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=settings.SIMULATION_WORKERS)
+    return _pool
+
+
+def _run(db: Session) -> SimulacaoResponse:
+    state = ranking_cache.get_state(db)
+    if not state.order:
+        return SimulacaoResponse(rodada=state.rodada, simulacoes=0, entries=[])
+
+    records = {
+        t.id: t
+        for t in db.query(Team.id, Team.wins, Team.draws, Team.matches).all()
+    }
+    teams = state.teams
+    n_teams = teams.sentinel
+    wins = np.array([records[pk].wins if pk in records else 0 for pk in teams.pks.tolist()])
+    draws = np.array([records[pk].draws if pk in records else 0 for pk in teams.pks.tolist()])
+    matches = teams.matches[:n_teams]
+    remaining = np.clip(settings.SEASON_ROUNDS - matches, 0, None)
+    p_win, p_draw = _outcome_probabilities(wins, draws, matches)
+
+    runs = max(settings.SIMULATION_RUNS, 0)
+    chunk = chunk_size(len(state.order), state.matrix.picks.shape[1])
+    sizes = [min(chunk, runs - start) for start in range(0, runs, chunk)]
+    seeds = np.random.SeedSequence(settings.SIMULATION_SEED).spawn(len(sizes))
+    args = [
+        (seed, size, teams.points[:n_teams], remaining, p_win, p_draw,
+         state.matrix.picks, state.matrix.ordem)
+        for seed, size in zip(seeds, sizes)
+    ]
+
+    if settings.SIMULATION_WORKERS > 1 and len(args) > 1:
+        results = list(_get_pool().map(_simulate_chunk, *zip(*args)))
+    else:
+        results = [_simulate_chunk(*a) for a in args]
+
+    n = len(state.order)
+    first = sum((r[0] for r in results), np.zeros(n, dtype=np.int64))
+    top3 = sum((r[1] for r in results), np.zeros(n, dtype=np.int64))
+    rank_sum = sum((r[2] for r in results), np.zeros(n, dtype=np.int64))
+    total_runs = max(runs, 1)
+
+    entries = []
+    for idx, row in enumerate(state.order):
+        entry = state.entries[row]
+        entries.append(
+            SimulacaoEntry(
+                rank=idx + 1,
+                apostador=entry.apostador,
+                ordem_inscricao=entry.ordem_inscricao,
+                total=entry.total,
+                chance_titulo=round(float(first[row]) / total_runs * 100, 2),
+                chance_podio=round(float(top3[row]) / total_runs * 100, 2),
+                rank_esperado=round(float(rank_sum[row]) / total_runs, 2) if runs else float(idx + 1),
+            )
+        )
+
+    logger.info("Simulação: %d temporadas, %d apostadores.", runs, n)
+    return SimulacaoResponse(rodada=state.rodada, simulacoes=runs, entries=entries)
+
+
+def get_simulacao(db: Session) -> SimulacaoResponse:
+    """Simulation for the current data version; computed at most once per version."""
+    global _cached
+    version = data_version.current()
+    cached = _cached
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    with _lock:
+        cached = _cached
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        result = _run(db)
+        if data_version.current() == version:
+            _cached = (version, result)
+    return result
+
+
+async def warm() -> None:
+    """Compute the simulation for the current version in a worker thread."""
+    try:
+        await run_in_session(get_simulacao)
+    except Exception as e:
+        logger.warning("Simulação: falha ao pré-calcular: %s", e)
+
+
+def shutdown() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
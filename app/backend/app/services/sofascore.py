@@ -1,11 +1,10 @@
 import asyncio
 import logging
+import time
 import urllib.parse
 
-import cloudscraper
-import httpx
-
 from ..config import settings
+from . import http_clients, strategy_health
 
 logger = logging.getLogger("bolao.sofascore")
 
@@ -24,12 +23,11 @@ _HTTPX_HEADERS = {
 
 async def _fetch_httpx(url: str) -> dict | None:
     try:
-        async with httpx.AsyncClient(timeout=15.0, headers=_HTTPX_HEADERS) as client:
-            resp = await client.get(url)
-            if resp.status_code == 200:
-                logger.info("httpx direto: OK (%d bytes)", len(resp.content))
-                return resp.json()
-            logger.warning("httpx direto: status %d", resp.status_code)
+        resp = await http_clients.get_httpx().get(url, headers=_HTTPX_HEADERS)
+        if resp.status_code == 200:
+            logger.info("httpx direto: OK (%d bytes)", len(resp.content))
+            return resp.json()
+        logger.warning("httpx direto: status %d", resp.status_code)
     except Exception as e:
         logger.warning("httpx direto falhou: %s", e)
     return None
@@ -39,18 +37,13 @@ async def _fetch_httpx(url: str) -> dict | None:
 # Strategy 2: cloudscraper (bypasses Cloudflare JS challenge)
 # ---------------------------------------------------------------------------
 
-def _create_scraper() -> cloudscraper.CloudScraper:
-    return cloudscraper.create_scraper(
-        browser={"browser": "chrome", "platform": "windows", "mobile": False}
-    )
-
-
 async def _fetch_cloudscraper(url: str) -> dict | None:
     try:
-        scraper = _create_scraper()
+        scraper = http_clients.get_scraper()
         resp = await asyncio.to_thread(scraper.get, url, timeout=20)
         if resp.status_code == 200:
             logger.info("cloudscraper: OK (%d bytes)", len(resp.content))
+            await asyncio.to_thread(http_clients.save_scraper_cookies)
             return resp.json()
         logger.warning("cloudscraper: status %d — %s", resp.status_code, resp.text[:200])
     except Exception as e:
@@ -69,15 +62,14 @@ async def _fetch_scrapedo(url: str) -> dict | None:
         return None
 
     encoded_url = urllib.parse.quote(url, safe="")
-    proxy_url = f"https://api.scrape.do/?token={token}&url={encoded_url}"
+    proxy_url = f"{settings.SCRAPEDO_BASE_URL}?token={token}&url={encoded_url}"
 
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            resp = await client.get(proxy_url)
-            if resp.status_code == 200:
-                logger.info("scrape.do: OK (%d bytes)", len(resp.content))
-                return resp.json()
-            logger.warning("scrape.do: status %d — %s", resp.status_code, resp.text[:200])
+        resp = await http_clients.get_httpx().get(proxy_url, timeout=30.0)
+        if resp.status_code == 200:
+            logger.info("scrape.do: OK (%d bytes)", len(resp.content))
+            return resp.json()
+        logger.warning("scrape.do: status %d — %s", resp.status_code, resp.text[:200])
     except Exception as e:
         logger.warning("scrape.do falhou: %s", e)
     return None
@@ -87,35 +79,87 @@ async def _fetch_scrapedo(url: str) -> dict | None:
 # Fetch with fallback chain + retries
 # ---------------------------------------------------------------------------
 
-_STRATEGIES = [
-    ("httpx", _fetch_httpx),
-    ("cloudscraper", _fetch_cloudscraper),
-    ("scrape.do", _fetch_scrapedo),
-]
+_STRATEGIES = {
+    "httpx": _fetch_httpx,
+    "cloudscraper": _fetch_cloudscraper,
+    "scrape.do": _fetch_scrapedo,
+}
+
+
+def _chain() -> list[str]:
+    names = [n for n in _STRATEGIES if n != "scrape.do" or settings.SCRAPEDO_TOKEN]
+    return strategy_health.order(names)
+
+
+async def _timed(name: str, url: str) -> dict | None:
+    start = time.monotonic()
+    data = await _STRATEGIES[name](url)
+    strategy_health.record(name, bool(data), time.monotonic() - start)
+    return data
+
+
+async def _run_chain(url: str, chain: list[str], errors: list[str]) -> tuple[str, dict] | None:
+    """
+    Walk ``chain`` until a strategy answers. In hedged mode the next strategy
+    is started when the current one hasn't answered within its p50 latency;
+    the first success wins and the others are cancelled.
+    """
+    queue = list(chain)
+    pending: dict[asyncio.Task, str] = {}
+    try:
+        while queue or pending:
+            timeout = None
+            if queue:
+                name = queue.pop(0)
+                pending[asyncio.create_task(_timed(name, url))] = name
+                if settings.SOFASCORE_HEDGE and queue:
+                    timeout = strategy_health.hedge_delay(name)
+            done, _ = await asyncio.wait(
+                pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                name = pending.pop(task)
+                data = task.result()
+                if data:
+                    return name, data
+                errors.append(name)
+            if not done:
+                logger.info("%s sem resposta em %.1fs, iniciando a próxima estratégia.", name, timeout)
+    finally:
+        for task in pending:
+            task.cancel()
+    return None
 
 
 async def fetch_with_retry(url: str) -> dict:
     """
-    Tries multiple strategies with retries and exponential backoff.
-    Order: httpx → cloudscraper → scrape.do, repeated up to MAX_RETRIES.
+    Tries the strategies with retries and exponential backoff. Each attempt
+    orders them by recent success (see strategy_health) and skips those
+    whose circuit breaker is open.
     """
     max_retries = settings.SOFASCORE_MAX_RETRIES
     base_delay = settings.SOFASCORE_RETRY_DELAY
     errors: list[str] = []
 
-    for attempt in range(max_retries + 1):
-        if attempt > 0:
-            delay = base_delay * attempt
-            logger.info("Tentativa %d/%d — aguardando %.1fs...", attempt + 1, max_retries + 1, delay)
-            await asyncio.sleep(delay)
-
-        for name, fetch_fn in _STRATEGIES:
-            data = await fetch_fn(url)
-            if data:
-                if attempt > 0:
+    await asyncio.to_thread(strategy_health.load)
+    try:
+        for attempt in range(max_retries + 1):
+            if attempt > 0:
+                delay = min(base_delay * 2 ** (attempt - 1), settings.SOFASCORE_MAX_RETRY_DELAY)
+                logger.info("Tentativa %d/%d — aguardando %.1fs...", attempt + 1, max_retries + 1, delay)
+                await asyncio.sleep(delay)
+
+            chain = _chain()
+            failed: list[str] = []
+            result = await _run_chain(url, chain, failed)
+            if result:
+                name, data = result
+                if attempt > 0 or name != chain[0]:
                     logger.info("Sucesso na tentativa %d via %s.", attempt + 1, name)
                 return data
-            errors.append(f"{name} (tentativa {attempt + 1})")
+            errors.extend(f"{name} (tentativa {attempt + 1})" for name in failed)
+    finally:
+        await asyncio.to_thread(strategy_health.save)
 
     raise RuntimeError(
         f"Sofascore falhou após {max_retries + 1} tentativas em todos os métodos: "
@@ -0,0 +1,151 @@
+"""
+Health of the Sofascore fetch strategies.
+
+Each strategy keeps a success-rate and latency EWMA, a window of recent
+success latencies (for the hedging delay) and a circuit breaker that skips
+it for SOFASCORE_BREAKER_COOLDOWN seconds after SOFASCORE_BREAKER_THRESHOLD
+consecutive failures. The state lives in memory and is persisted to
+``app_state`` so it survives restarts: when the preferred order (or an
+open breaker) changes, otherwise at most every SAVE_INTERVAL seconds, so
+frequent live polls don't write on every fetch.
+"""
+
+import json
+import logging
+import math
+import statistics
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+
+from ..config import settings
+from ..database import SessionLocal
+from . import app_state
+
+logger = logging.getLogger("bolao.sofascore")
+
+STATE_KEY = "sofascore_health"
+EWMA_ALPHA = 0.3
+LATENCY_WINDOW = 20
+SAVE_INTERVAL = 900.0
+
+_lock = threading.Lock()
+_health: dict[str, "StrategyHealth"] = {}
+_loaded = False
+_saved: tuple[tuple[str, ...], float] | None = None  # (order, monotonic time)
+
+
+@dataclass
+class StrategyHealth:
+    success_rate: float = 1.0
+    latency: float | None = None
+    recent: list[float] = field(default_factory=list)
+    consecutive_failures: int = 0
+    open_until: float = 0.0
+
+    def is_open(self, now: float) -> bool:
+        return now < self.open_until
+
+    def p50(self) -> float | None:
+        return statistics.median(self.recent) if self.recent else None
+
+    def record(self, ok: bool, elapsed: float, now: float) -> None:
+        self.success_rate += EWMA_ALPHA * (float(ok) - self.success_rate)
+        if ok:
+            self.latency = elapsed if self.latency is None else (
+                self.latency + EWMA_ALPHA * (elapsed - self.latency)
+            )
+            self.recent = (self.recent + [elapsed])[-LATENCY_WINDOW:]
+            self.consecutive_failures = 0
+            self.open_until = 0.0
+            return
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= settings.SOFASCORE_BREAKER_THRESHOLD:
+            self.open_until = now + settings.SOFASCORE_BREAKER_COOLDOWN
+
+
+def _get(name: str) -> StrategyHealth:
+    return _health.setdefault(name, StrategyHealth())
+
+
+def load() -> None:
+    """Restore the persisted state once per process."""
+    global _loaded
+    if _loaded:
+        return
+    try:
+        with SessionLocal() as db:
+            raw = app_state.get_value(db, STATE_KEY)
+        saved = json.loads(raw) if raw else {}
+        with _lock:
+            for name, values in saved.items():
+                _health[name] = StrategyHealth(**values)
+    except Exception as e:
+        logger.warning("Saúde das estratégias não restaurada: %s", e)
+    _loaded = True
+
+
+def save(force: bool = False) -> bool:
+    """Persist the state if the order changed or SAVE_INTERVAL passed. Returns whether it did."""
+    global _saved
+    if not _loaded:  # nothing fetched in this process; keep what's stored
+        return False
+    with _lock:
+        names = sorted(_health)
+    preferred = tuple(order(names))
+    now = time.monotonic()
+    if not force and _saved is not None and (
+        _saved[0] == preferred and now - _saved[1] < SAVE_INTERVAL
+    ):
+        return False
+    with _lock:
+        data = json.dumps({name: asdict(h) for name, h in _health.items()})
+    try:
+        with SessionLocal() as db:
+            app_state.set_value(db, STATE_KEY, data)
+            db.commit()
+    except Exception as e:
+        logger.warning("Saúde das estratégias não salva: %s", e)
+        return False
+    _saved = (preferred, now)
+    return True
+
+
+def record(name: str, ok: bool, elapsed: float) -> None:
+    with _lock:
+        h = _get(name)
+        h.record(ok, elapsed, time.time())
+        if h.consecutive_failures == settings.SOFASCORE_BREAKER_THRESHOLD:
+            logger.warning(
+                "%s: %d falhas seguidas, pausada por %.0fs.",
+                name, h.consecutive_failures, settings.SOFASCORE_BREAKER_COOLDOWN,
+            )
+
+
+def order(names: list[str]) -> list[str]:
+    """
+    Strategies with a closed breaker, best recent success rate first (then
+    lowest latency, unmeasured last; ties keep the given order). When every
+    breaker is open, all of them are returned, soonest to reopen first.
+    """
+    now = time.time()
+    with _lock:
+        health = {name: _get(name) for name in names}
+    closed = [n for n in names if not health[n].is_open(now)]
+    if not closed:
+        return sorted(names, key=lambda n: health[n].open_until)
+    return sorted(
+        closed,
+        key=lambda n: (
+            -round(health[n].success_rate, 2),
+            math.inf if health[n].latency is None else health[n].latency,
+        ),
+    )
+
+
+def hedge_delay(name: str) -> float:
+    """Seconds to wait on ``name`` before starting the next strategy in hedged mode."""
+    with _lock:
+        p50 = _get(name).p50()
+    return p50 if p50 is not None else settings.SOFASCORE_HEDGE_DELAY
+
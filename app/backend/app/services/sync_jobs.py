@@ -0,0 +1,241 @@
+"""
+Background sync jobs.
+
+Admin and cron syncs are recorded as ``SyncJob`` rows and run as asyncio
+tasks, so the endpoints answer immediately with the job id. A lock row in
+``app_state`` keeps a single sync running across workers, and DB sessions
+are opened only around the stages that touch the database, never while
+waiting on Sofascore. Job bookkeeping goes through the async engine, so a
+slow database doesn't stall other requests on the worker; the standings
+and snapshot stages (re-ranking included) run in a worker thread with a
+sync session, off the event loop.
+"""
+
+import asyncio
+import logging
+import traceback
+from datetime import timedelta
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..database import AsyncSessionLocal, run_in_session
+from ..models import Apostador, SyncJob
+from ..schemas import SyncJobOut, SyncResponse
+from . import app_state, badges_service, historico_service, simulation_service, sync_service
+from .session_utils import brasilia_now
+
+logger = logging.getLogger("bolao.admin")
+
+LOCK_KEY = "sync_lock"
+# Set by live polling when it changed the standings without writing a snapshot.
+SNAPSHOT_PENDING_KEY = "snapshot_pending"
+ACTIVE = ("queued", "running")
+RETRY_DELAY = 10.0
+
+_tasks: set[asyncio.Task] = set()
+
+
+async def _update(job_id: int, **values) -> None:
+    """Update the job row and keep its lock alive."""
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(SyncJob)
+            .where(SyncJob.id == job_id)
+            .values(**values, updated_at=brasilia_now())
+        )
+        await db.run_sync(app_state.refresh_lock, LOCK_KEY, str(job_id))
+        await db.commit()
+
+
+async def fail_abandoned(db: AsyncSession) -> int:
+    """
+    Mark queued/running jobs not updated for SYNC_LOCK_TTL (their process
+    died) as failed. Commits; returns how many were marked.
+    """
+    now = brasilia_now()
+    # Read first: this runs on every status poll and must not take a write lock.
+    abandoned = (await db.scalars(
+        select(SyncJob.id).where(
+            SyncJob.status.in_(ACTIVE),
+            SyncJob.updated_at < now - timedelta(seconds=settings.SYNC_LOCK_TTL),
+        )
+    )).all()
+    if not abandoned:
+        return 0
+    await db.execute(
+        update(SyncJob)
+        .where(SyncJob.id.in_(abandoned), SyncJob.status.in_(ACTIVE))
+        .values(
+            status="failed", stage="done", finished_at=now, updated_at=now,
+            message="Sync abandonado: o processo foi encerrado.",
+        )
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    logger.warning("%d sync(s) abandonado(s) marcado(s) como falha.", len(abandoned))
+    return len(abandoned)
+
+
+async def active_job(db: AsyncSession) -> SyncJob | None:
+    """The queued or running job, after failing abandoned ones."""
+    await fail_abandoned(db)
+    return await db.scalar(
+        select(SyncJob)
+        .where(SyncJob.status.in_(ACTIVE))
+        .order_by(SyncJob.id.desc())
+        .limit(1)
+    )
+
+
+async def enqueue(db: AsyncSession, source: str, retries: int = 0) -> SyncJob:
+    """
+    Start a sync in the background, or return the one already in progress.
+    ``retries`` extra attempts are made, RETRY_DELAY seconds apart, if
+    another sync holds the lock or the fetch fails.
+    """
+    job = await active_job(db)
+    if job is not None:
+        return job
+
+    job = SyncJob(source=source)
+    db.add(job)
+    await db.commit()
+    await db.refresh(job)
+    task = asyncio.create_task(run_job(job.id, source, retries))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return job
+
+
+def job_out(job: SyncJob) -> SyncJobOut:
+    return SyncJobOut(
+        id=job.id,
+        source=job.source,
+        status=job.status,
+        stage=job.stage,
+        attempts=job.attempts,
+        message=job.message,
+        result=SyncResponse.model_validate_json(job.result) if job.result else None,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+    )
+
+
+async def run_job(job_id: int, source: str, retries: int = 0) -> None:
+    """
+    Take the sync lock and run the sync. Finding the lock held (e.g. by a
+    live poll) and a failed fetch both use up one of ``retries``.
+    """
+    owner = str(job_id)
+    while True:
+        async with AsyncSessionLocal() as db:
+            locked = await db.run_sync(
+                app_state.try_lock, LOCK_KEY, owner, settings.SYNC_LOCK_TTL
+            )
+        if locked:
+            break
+        if not retries:
+            await _update(
+                job_id, status="skipped", stage="done", finished_at=brasilia_now(),
+                message="Outro sync já está em andamento.",
+            )
+            return
+        retries -= 1
+        logger.warning("%s: outro sync em andamento, retentando em %.0fs...", source, RETRY_DELAY)
+        await _update(job_id, message="Aguardando outro sync terminar.")
+        await asyncio.sleep(RETRY_DELAY)
+
+    try:
+        await _update(job_id, status="running", started_at=brasilia_now())
+        for attempt in range(retries + 1):
+            label = f"{source} (tentativa {attempt + 1})" if retries else source
+            await _update(job_id, attempts=attempt + 1, message="")
+            try:
+                response = await _sync(job_id, label)
+            except Exception as e:
+                logger.error("%s — sync falhou: %s\n%s", label, e, traceback.format_exc())
+                if attempt < retries:
+                    logger.warning("%s falhou, retentando em %.0fs...", label, RETRY_DELAY)
+                    await asyncio.sleep(RETRY_DELAY)
+                    continue
+                await _update(
+                    job_id, status="failed", stage="done", finished_at=brasilia_now(),
+                    message=f"Sync falhou: {e}",
+                )
+                return
+            await _update(
+                job_id, status="succeeded", stage="done", finished_at=brasilia_now(),
+                message=response.message, result=response.model_dump_json(),
+            )
+            return
+    finally:
+        async with AsyncSessionLocal() as db:
+            await db.run_sync(app_state.release_lock, LOCK_KEY, owner)
+
+
+async def _sync(job_id: int, source: str) -> SyncResponse:
+    await _update(job_id, stage="fetch")
+    standings = await sync_service.fetch_standings()
+
+    await _update(job_id, stage="standings")
+    result = await run_in_session(sync_service.store_standings, standings)
+
+    badges_downloaded = 0
+    if not result.unchanged:
+        await _update(job_id, stage="badges")
+        try:
+            team_ids = [s["teamId"] for s in standings]
+            badges_downloaded = await badges_service.download_all_badges(team_ids)
+        except Exception as e:
+            logger.warning("%s — badges falhou (não-crítico): %s", source, e)
+
+    await _update(job_id, stage="snapshot")
+    apostadores_count, session_key = await run_in_session(
+        _record_snapshot, source, result.unchanged
+    )
+
+    # Warm the simulation for the new version instead of the first request.
+    task = asyncio.create_task(simulation_service.warm())
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+
+    badge_msg = f", {badges_downloaded} escudos baixados" if badges_downloaded else ""
+    if result.unchanged:
+        msg = f"{source} OK: {len(standings)} times, classificação sem alterações."
+    else:
+        changed = len(result.changed) + result.created
+        msg = f"{source} OK: {len(standings)} times, {changed} atualizados{badge_msg}."
+    logger.info(msg)
+    return SyncResponse(
+        teams_count=len(standings),
+        apostadores_count=apostadores_count,
+        historico_session=session_key,
+        unchanged=result.unchanged,
+        message=msg,
+    )
+
+
+def _record_snapshot(db: Session, source: str, unchanged: bool) -> tuple[int, str | None]:
+    """
+    Record the session snapshot when standings changed (here or in a live
+    poll since the last snapshot) or none exists yet.
+    """
+    apostadores_count = db.query(Apostador).count()
+    pending = app_state.get_value(db, SNAPSHOT_PENDING_KEY) == "1"
+    if apostadores_count == 0 or (
+        unchanged and not pending and historico_service.session_recorded(db)
+    ):
+        return apostadores_count, None
+    try:
+        session_key = historico_service.record_snapshot(db)
+    except Exception as e:
+        logger.error("%s — record_snapshot falhou: %s\n%s", source, e, traceback.format_exc())
+        return apostadores_count, None
+    if pending:
+        app_state.set_value(db, SNAPSHOT_PENDING_KEY, "")
+        db.commit()
+    return apostadores_count, session_key
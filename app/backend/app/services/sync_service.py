@@ -1,16 +1,53 @@
+import hashlib
+import json
 import logging
+from dataclasses import dataclass, field
 
 from sqlalchemy.orm import Session
 
 from ..config import settings
+from ..database import bulk_upsert
 from ..models import Team
-from . import sofascore
+from . import app_state, ranking_cache, sofascore
 from .session_utils import brasilia_now
 
 logger = logging.getLogger("bolao.sync")
 
+STANDINGS_HASH_KEY = "standings_hash"
 
-async def sync_standings(db: Session) -> list[dict]:
+# Sofascore row key -> Team column.
+_COLUMNS = {
+    "teamId": "sofascore_id",
+    "teamName": "name",
+    "teamSlug": "slug",
+    "teamNameCode": "name_code",
+    "position": "position",
+    "points": "points",
+    "matches": "matches",
+    "wins": "wins",
+    "draws": "draws",
+    "losses": "losses",
+    "scoresFor": "goals_for",
+    "scoresAgainst": "goals_against",
+}
+
+
+@dataclass
+class StandingsSync:
+    standings: list[dict]
+    # Team.id of existing teams whose stored values changed.
+    changed: set[int] = field(default_factory=set)
+    created: int = 0
+    # Fetched payload identical to the last applied one; nothing was read or written.
+    same_payload: bool = False
+
+    @property
+    def unchanged(self) -> bool:
+        return not self.changed and not self.created
+
+
+async def fetch_standings() -> list[dict]:
+    """Fetch standings from Sofascore, refusing suspiciously short tables."""
     standings = await sofascore.fetch_standings()
 
     if len(standings) < settings.MIN_TEAMS_PROTECTION:
@@ -18,46 +55,73 @@ async def sync_standings(db: Session) -> list[dict]:
             f"Proteção: apenas {len(standings)} times retornados "
             f"(mínimo: {settings.MIN_TEAMS_PROTECTION}). Dados não atualizados."
         )
+    return standings
 
-    updated = 0
-    created = 0
-    for row in standings:
-        team = db.query(Team).filter(Team.sofascore_id == row["teamId"]).first()
-        if team:
-            team.name = row["teamName"]
-            team.slug = row["teamSlug"]
-            team.name_code = row["teamNameCode"]
-            team.position = row["position"]
-            team.points = row["points"]
-            team.matches = row["matches"]
-            team.wins = row["wins"]
-            team.draws = row["draws"]
-            team.losses = row["losses"]
-            team.goals_for = row["scoresFor"]
-            team.goals_against = row["scoresAgainst"]
-            team.updated_at = brasilia_now()
-            updated += 1
-        else:
-            team = Team(
-                sofascore_id=row["teamId"],
-                name=row["teamName"],
-                slug=row["teamSlug"],
-                name_code=row["teamNameCode"],
-                position=row["position"],
-                points=row["points"],
-                matches=row["matches"],
-                wins=row["wins"],
-                draws=row["draws"],
-                losses=row["losses"],
-                goals_for=row["scoresFor"],
-                goals_against=row["scoresAgainst"],
-            )
-            db.add(team)
-            created += 1
 
+def store_standings(db: Session, standings: list[dict]) -> StandingsSync:
+    """Apply fetched standings unless they match the last applied payload."""
+    digest = standings_hash(standings)
+    if app_state.get_value(db, STANDINGS_HASH_KEY) == digest:
+        logger.info("Sync: classificação idêntica à última (%s), nada a gravar.", digest[:12])
+        return StandingsSync(standings=standings, same_payload=True)
+
+    result = apply_standings(db, standings)
+    app_state.set_value(db, STANDINGS_HASH_KEY, digest)
     db.commit()
+    return result
+
+
+async def sync_standings(db: Session) -> StandingsSync:
+    return store_standings(db, await fetch_standings())
+
+
+def standings_hash(standings: list[dict]) -> str:
+    """Content hash of the normalized ``fetch_standings`` output."""
+    payload = json.dumps(standings, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def apply_standings(db: Session, standings: list[dict]) -> StandingsSync:
+    """
+    Write standings with one bulk upsert keyed on ``sofascore_id``. Existing
+    values are read in a single query so only new or changed teams are
+    written, and the caller learns which teams actually moved.
+    """
+    columns = list(_COLUMNS.values())
+    existing = {
+        row.sofascore_id: row
+        for row in db.query(Team.id, *(getattr(Team, c) for c in columns)).all()
+    }
+
+    now = brasilia_now()
+    result = StandingsSync(standings=standings)
+    rows: list[dict] = []
+    for s in standings:
+        values = {column: s[key] for key, column in _COLUMNS.items()}
+        current = existing.get(values["sofascore_id"])
+        if current is None:
+            result.created += 1
+        elif all(getattr(current, c) == v for c, v in values.items()):
+            continue
+        else:
+            result.changed.add(current.id)
+        rows.append({**values, "updated_at": now})
+
+    if rows:
+        bulk_upsert(
+            db,
+            Team,
+            rows,
+            index_elements=["sofascore_id"],
+            update_columns=[c for c in rows[0] if c != "sofascore_id"],
+        )
+        db.commit()
+        ranking_cache.apply_team_changes(
+            db, None if result.created else result.changed, "sync"
+        )
+
     logger.info(
-        "Sync: %d times (%d atualizados, %d novos).",
-        len(standings), updated, created,
+        "Sync: %d times (%d alterados, %d novos).",
+        len(standings), len(result.changed), result.created,
     )
-    return standings
+    return result
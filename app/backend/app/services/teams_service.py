@@ -0,0 +1,16 @@
+"""Encoded team lists behind ``/api/teams`` and ``/api/standings``."""
+
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.orm import InstrumentedAttribute, Session
+
+from ..models import Team
+from ..schemas import TeamOut
+
+_teams_adapter = TypeAdapter(list[TeamOut])
+
+
+def encode_teams(db: Session, order_by: InstrumentedAttribute) -> bytes:
+    """All teams ordered by ``order_by``, as TeamOut JSON bytes."""
+    teams = db.scalars(select(Team).order_by(order_by)).all()
+    return _teams_adapter.dump_json(_teams_adapter.validate_python(teams, from_attributes=True))
@@ -0,0 +1,5 @@
+"""Offline Sofascore stand-in; see ``server``."""
+
+from .server import app
+
+__all__ = ["app"]
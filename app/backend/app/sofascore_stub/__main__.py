@@ -0,0 +1,12 @@
+"""Run the stub: ``python -m app.sofascore_stub [--host H] [--port P]``."""
+
+import argparse
+
+import uvicorn
+
+parser = argparse.ArgumentParser(description="Sofascore offline stub")
+parser.add_argument("--host", default="127.0.0.1")
+parser.add_argument("--port", type=int, default=8765)
+args = parser.parse_args()
+
+uvicorn.run("app.sofascore_stub:app", host=args.host, port=args.port)
@@ -0,0 +1,239 @@
+"""
+Offline stand-in for Sofascore, Cloudflare and scrape.do.
+
+Serves the recorded fixtures in ``fixtures/`` and the badges in
+``static/badges`` under the same URL shapes the app fetches, with knobs
+for latency and failures. Point the app at it with::
+
+    BOLAO_SOFASCORE_BASE_URL=http://127.0.0.1:8765/api/v1
+    BOLAO_SOFASCORE_BADGE_URL=http://127.0.0.1:8765/api/v1/team/{team_id}/image
+    BOLAO_SCRAPEDO_BASE_URL=http://127.0.0.1:8765/scrapedo/
+    BOLAO_SCRAPEDO_TOKEN=stub
+
+Knobs start from ``BOLAO_STUB_*`` environment variables and can be changed
+at runtime with ``PATCH /_stub/config``.
+"""
+
+import asyncio
+import copy
+import email.utils
+import hashlib
+import json
+import random
+import urllib.parse
+from collections import Counter
+from pathlib import Path
+
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import HTMLResponse, JSONResponse
+from pydantic import BaseModel
+from pydantic_settings import BaseSettings
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+BADGES_DIR = Path(__file__).resolve().parent.parent.parent / "static" / "badges"
+
+CHALLENGE_PAGE = """<!DOCTYPE html><html lang="en-US"><head><title>Just a moment...</title>
+<meta http-equiv="refresh" content="360"></head><body>
+<div id="challenge-body-text">www.sofascore.com needs to review the security of your connection before proceeding.</div>
+<form id="challenge-form" action="/cdn-cgi/challenge-platform/h/b/orchestrate/jsch/v1" method="POST"></form>
+<script>window._cf_chl_opt={cvId:'3',cType:'managed'};</script>
+</body></html>"""
+
+
+class StubConfig(BaseSettings):
+    LATENCY_MS: float = 0.0
+    JITTER_MS: float = 0.0
+    CHALLENGE_RATE: float = 0.0
+    FORBIDDEN_RATE: float = 0.0
+    RATE_LIMIT_RATE: float = 0.0
+    SERVER_ERROR_RATE: float = 0.0
+    # Keep only the first N standings rows (0 = all).
+    TRUNCATE_ROWS: int = 0
+    SCRAPEDO_LATENCY_MS: float = 0.0
+    SCRAPEDO_ERROR_RATE: float = 0.0
+    SEED: int = 0
+
+    class Config:
+        env_prefix = "BOLAO_STUB_"
+
+
+class StubConfigUpdate(BaseModel):
+    LATENCY_MS: float | None = None
+    JITTER_MS: float | None = None
+    CHALLENGE_RATE: float | None = None
+    FORBIDDEN_RATE: float | None = None
+    RATE_LIMIT_RATE: float | None = None
+    SERVER_ERROR_RATE: float | None = None
+    TRUNCATE_ROWS: int | None = None
+    SCRAPEDO_LATENCY_MS: float | None = None
+    SCRAPEDO_ERROR_RATE: float | None = None
+    SEED: int | None = None
+
+
+def _load_fixtures() -> tuple[dict[tuple[int, int], dict], dict[int, dict]]:
+    standings, seasons = {}, {}
+    for path in FIXTURES_DIR.glob("standings_*.json"):
+        tournament_id, season_id = map(int, path.stem.split("_")[1:])
+        standings[(tournament_id, season_id)] = json.loads(path.read_text())
+    for path in FIXTURES_DIR.glob("seasons_*.json"):
+        seasons[int(path.stem.split("_")[1])] = json.loads(path.read_text())
+    return standings, seasons
+
+
+class StubState:
+    def __init__(self):
+        self.config = StubConfig()
+        self.rng = random.Random(self.config.SEED)
+        self.standings, self.seasons = _load_fixtures()
+        self.stats: Counter[str] = Counter()
+
+    def reset(self) -> None:
+        self.__init__()
+
+
+state = StubState()
+app = FastAPI(title="Sofascore stub", docs_url=None, redoc_url=None)
+
+
+async def _latency(base_ms: float) -> None:
+    delay = base_ms + state.rng.uniform(0, state.config.JITTER_MS)
+    if delay > 0:
+        await asyncio.sleep(delay / 1000)
+
+
+def _fault() -> Response | None:
+    """Roll the configured failure rates; ``None`` means serve normally."""
+    cfg = state.config
+    roll = state.rng.random()
+    for rate, build in (
+        (cfg.CHALLENGE_RATE, lambda: HTMLResponse(
+            CHALLENGE_PAGE, status_code=403,
+            headers={"Server": "cloudflare", "cf-mitigated": "challenge"},
+        )),
+        (cfg.FORBIDDEN_RATE, lambda: JSONResponse(
+            {"error": {"code": 403, "reason": "Forbidden"}}, status_code=403
+        )),
+        (cfg.RATE_LIMIT_RATE, lambda: JSONResponse(
+            {"error": {"code": 429, "reason": "Too Many Requests"}},
+            status_code=429, headers={"Retry-After": "5"},
+        )),
+        (cfg.SERVER_ERROR_RATE, lambda: JSONResponse(
+            {"error": {"code": 503, "reason": "Service Unavailable"}}, status_code=503
+        )),
+    ):
+        if roll < rate:
+            return build()
+        roll -= rate
+    return None
+
+
+def _not_found() -> JSONResponse:
+    return JSONResponse({"error": {"code": 404, "reason": "Not Found"}}, status_code=404)
+
+
+def _api_payload(path: str) -> dict | None:
+    """Fixture for an ``/api/v1/...`` path, or None."""
+    parts = path.strip("/").split("/")
+    if parts[:3] != ["api", "v1", "unique-tournament"]:
+        return None
+    try:
+        tournament_id = int(parts[3])
+        if parts[4:] == ["seasons"]:
+            return state.seasons.get(tournament_id)
+        if parts[4] == "season" and parts[6:] == ["standings", "total"]:
+            data = state.standings.get((tournament_id, int(parts[5])))
+            if data is not None and state.config.TRUNCATE_ROWS:
+                data = copy.deepcopy(data)
+                data["standings"][0]["rows"] = data["standings"][0]["rows"][: state.config.TRUNCATE_ROWS]
+            return data
+    except (IndexError, ValueError):
+        return None
+    return None
+
+
+def _badge(team_id: int, request: Request) -> Response:
+    path = BADGES_DIR / f"{team_id}.webp"
+    if not path.is_file():
+        return _not_found()
+    body = path.read_bytes()
+    etag = f'"{hashlib.md5(body).hexdigest()}"'
+    last_modified = email.utils.formatdate(path.stat().st_mtime, usegmt=True)
+    headers = {"ETag": etag, "Last-Modified": last_modified, "Cache-Control": "max-age=3600"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="image/webp", headers=headers)
+
+
+@app.get("/api/v1/team/{team_id}/image")
+async def team_image(team_id: int, request: Request):
+    state.stats["badge"] += 1
+    await _latency(state.config.LATENCY_MS)
+    return _fault() or _badge(team_id, request)
+
+
+@app.get("/api/v1/{path:path}")
+async def api(path: str):
+    state.stats["api"] += 1
+    await _latency(state.config.LATENCY_MS)
+    fault = _fault()
+    if fault is not None:
+        state.stats[f"fault_{fault.status_code}"] += 1
+        return fault
+    data = _api_payload(f"/api/v1/{path}")
+    return JSONResponse(data) if data is not None else _not_found()
+
+
+@app.get("/scrapedo/")
+async def scrapedo(token: str, url: str):
+    """scrape.do proxy: renders through Cloudflare, so challenge knobs don't apply."""
+    state.stats["scrapedo"] += 1
+    if not token:
+        return JSONResponse({"message": "Token is required"}, status_code=401)
+    await _latency(state.config.SCRAPEDO_LATENCY_MS)
+    if state.rng.random() < state.config.SCRAPEDO_ERROR_RATE:
+        return JSONResponse({"message": "Target timeout"}, status_code=502)
+    data = _api_payload(urllib.parse.urlsplit(url).path)
+    return JSONResponse(data) if data is not None else _not_found()
+
+
+@app.get("/_stub/config")
+def get_config():
+    return state.config.model_dump()
+
+
+@app.patch("/_stub/config")
+def update_config(update: StubConfigUpdate):
+    values = update.model_dump(exclude_none=True)
+    state.config = state.config.model_copy(update=values)
+    if "SEED" in values:
+        state.rng = random.Random(state.config.SEED)
+    return state.config.model_dump()
+
+
+@app.get("/_stub/stats")
+def get_stats():
+    return dict(state.stats)
+
+
+@app.post("/_stub/reset")
+def reset():
+    """Reload fixtures, knobs (from the environment) and counters."""
+    state.reset()
+    return state.config.model_dump()
+
+
+@app.post("/_stub/advance")
+def advance(rounds: int = 1):
+    """Play ``rounds`` random rounds on every standings fixture, so syncs see changes."""
+    for data in state.standings.values():
+        rows = data["standings"][0]["rows"]
+        for _ in range(rounds):
+            for row in rows:
+                outcome = state.rng.choices(("wins", "draws", "losses"), (0.37, 0.26, 0.37))[0]
+                row["matches"] += 1
+                row[outcome] += 1
+                row["points"] += {"wins": 3, "draws": 1, "losses": 0}[outcome]
+        rows.sort(key=lambda r: (-r["points"], -r["wins"]))
+        for i, row in enumerate(rows):
+            row["position"] = i + 1
+    return {"rounds": rounds}
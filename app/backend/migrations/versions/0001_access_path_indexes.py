@@ -0,0 +1,54 @@
+"""Indexes for the snapshot, palpite and apostador-name access paths
+
+- snapshots (session_date, rank): historico/export order.
+- snapshots (apostador_id, session_date): one apostador's history and the
+  FK side of deletes.
+- palpites (team_id): joins and deletes from the team side (the unique
+  constraints only lead with apostador_id).
+- Postgres: pg_trgm GIN on apostadores.nome for ILIKE '%x%' searches.
+
+The previous-session lookup is already served by uq_session_apostador,
+which leads with session_date.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_snapshots_session_rank", "snapshots", ["session_date", "rank"], if_not_exists=True
+    )
+    op.create_index(
+        "ix_snapshots_apostador_session",
+        "snapshots",
+        ["apostador_id", "session_date"],
+        if_not_exists=True,
+    )
+    op.create_index("ix_palpites_team_id", "palpites", ["team_id"], if_not_exists=True)
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.create_index(
+            "ix_apostadores_nome_trgm",
+            "apostadores",
+            ["nome"],
+            postgresql_using="gin",
+            postgresql_ops={"nome": "gin_trgm_ops"},
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.drop_index("ix_apostadores_nome_trgm", table_name="apostadores", if_exists=True)
+    op.drop_index("ix_palpites_team_id", table_name="palpites", if_exists=True)
+    op.drop_index("ix_snapshots_apostador_session", table_name="snapshots", if_exists=True)
+    op.drop_index("ix_snapshots_session_rank", table_name="snapshots", if_exists=True)
@@ -0,0 +1,245 @@
+"""
+Read latency while a sync is writing, per engine profile.
+
+For each profile ("default" = SQLAlchemy defaults, "auto" = the tuned
+profile from ``app.database``) a scratch database is seeded with teams,
+apostadores, palpites and a past session. A writer process then replays
+sync-like transactions (teams, team_standings and snapshots upserts,
+with ``--hold`` seconds of work in between, as the sync does while it
+re-ranks) while reader threads run the queries behind a ranking rebuild.
+Latency percentiles and errors are printed per profile.
+
+    cd app/backend
+    poetry run python -m scripts.bench_engine_profiles
+    poetry run python -m scripts.bench_engine_profiles --url postgresql://.../scratch
+
+``--url`` must point to a scratch database: the tables are created and
+dropped by the benchmark, which refuses to start if any of them already
+exists unless ``--drop`` is given. Without it, a temporary SQLite file
+is used.
+"""
+
+import argparse
+import multiprocessing
+import random
+import statistics
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import create_engine, inspect, select, update
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.database import Base, apply_profile, bulk_upsert, engine_options
+from app.models import Apostador, Palpite, Snapshot, Team, TeamStanding
+from app.services.session_utils import get_session_date
+
+N_TEAMS = 20
+PICKS = 7
+
+
+def _seed(session_factory, apostadores: int) -> None:
+    rnd = random.Random(0)
+    previous = get_session_date() - timedelta(days=7)
+    with session_factory() as db:
+        db.add_all(
+            Team(id=i, sofascore_id=1000 + i, name=f"Time {i}", points=rnd.randint(0, 60))
+            for i in range(1, N_TEAMS + 1)
+        )
+        db.add_all(
+            Apostador(id=i, nome=f"Apostador {i}", ordem_inscricao=i)
+            for i in range(1, apostadores + 1)
+        )
+        db.flush()
+        db.add_all(
+            Palpite(apostador_id=a, team_id=t, prioridade=p + 1)
+            for a in range(1, apostadores + 1)
+            for p, t in enumerate(rnd.sample(range(1, N_TEAMS + 1), PICKS))
+        )
+        db.add_all(
+            Snapshot(session_date=previous, rodada=1, apostador_id=a, pontuacao=a, rank=a)
+            for a in range(1, apostadores + 1)
+        )
+        db.commit()
+
+
+def _make_engine(url: str, profile: str):
+    return apply_profile(create_engine(url, **engine_options(url, profile)), profile)
+
+
+def _sync_once(
+    db: Session, rnd: random.Random, apostadores: int, session: date, hold: float
+) -> None:
+    """One sync-shaped transaction: standings, session standings and snapshots."""
+    now = datetime.now()
+    for team_id in range(1, N_TEAMS + 1):
+        db.execute(update(Team).where(Team.id == team_id).values(points=rnd.randint(0, 60)))
+    time.sleep(hold)
+    bulk_upsert(
+        db,
+        TeamStanding,
+        [
+            dict(session_date=session, team_id=t, position=t, points=rnd.randint(0, 60),
+                 matches=10, updated_at=now)
+            for t in range(1, N_TEAMS + 1)
+        ],
+        ["session_date", "team_id"],
+        ["position", "points", "matches", "updated_at"],
+    )
+    time.sleep(hold)
+    bulk_upsert(
+        db,
+        Snapshot,
+        [
+            dict(session_date=session, rodada=2, apostador_id=a,
+                 pontuacao=rnd.randint(0, 400), rank=a)
+            for a in range(1, apostadores + 1)
+        ],
+        ["session_date", "apostador_id"],
+        ["rodada", "pontuacao", "rank"],
+    )
+    db.commit()
+
+
+def _writer(url: str, profile: str, apostadores: int, hold: float, stop, writes) -> None:
+    # Its own process, so the writer doesn't share the readers' GIL.
+    engine = _make_engine(url, profile)
+    factory = sessionmaker(bind=engine, autoflush=False)
+    rnd = random.Random(1)
+    session = get_session_date()
+    while not stop.is_set():
+        with factory() as db:
+            _sync_once(db, rnd, apostadores, session, hold)
+        writes.value += 1
+        # A new session every sync, so snapshots insert rather than update.
+        session += timedelta(days=1)
+    engine.dispose()
+
+
+def _read_standings(db: Session, previous: date) -> None:
+    """The query behind ``/api/standings``."""
+    db.execute(select(Team).order_by(Team.position)).all()
+
+
+def _read_ranking(db: Session, previous: date) -> None:
+    """The SELECTs of a ranking rebuild."""
+    _read_standings(db, previous)
+    db.execute(select(Apostador.id, Apostador.nome, Apostador.ordem_inscricao)).all()
+    db.execute(select(Palpite.apostador_id, Palpite.team_id, Palpite.prioridade)).all()
+    db.execute(
+        select(Snapshot.apostador_id, Snapshot.pontuacao, Snapshot.rank)
+        .where(Snapshot.session_date == previous)
+    ).all()
+
+
+READS = {"standings": _read_standings, "ranking": _read_ranking}
+
+
+def _existing_tables(url: str) -> list[str]:
+    engine = create_engine(url)
+    try:
+        return sorted(set(inspect(engine).get_table_names()) & set(Base.metadata.tables))
+    finally:
+        engine.dispose()
+
+
+def _run(url: str, profile: str, args) -> dict:
+    engine = _make_engine(url, profile)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine, autoflush=False)
+    _seed(factory, args.apostadores)
+    previous = get_session_date() - timedelta(days=7)
+    read = READS[args.read]
+
+    ctx = multiprocessing.get_context("spawn")
+    stop_writer, writes = ctx.Event(), ctx.Value("i", 0)
+    writer = ctx.Process(
+        target=_writer,
+        args=(url, profile, args.apostadores, args.hold, stop_writer, writes),
+    )
+    stop = threading.Event()
+    latencies: list[float] = []
+    errors = 0
+    lock = threading.Lock()
+
+    def reader():
+        nonlocal errors
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                with factory() as db:
+                    read(db, previous)
+            except Exception:
+                with lock:
+                    errors += 1
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    writer.start()
+    time.sleep(1.0)  # let the writer connect before timing reads
+    readers = [threading.Thread(target=reader) for _ in range(args.readers)]
+    for t in readers:
+        t.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for t in readers:
+        t.join()
+    stop_writer.set()
+    writer.join()
+
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+    ms = sorted(x * 1000 for x in latencies)
+    pick = lambda q: ms[min(len(ms) - 1, int(q * len(ms)))] if ms else float("nan")
+    return {
+        "profile": profile,
+        "reads": len(ms),
+        "p50": statistics.median(ms) if ms else float("nan"),
+        "p95": pick(0.95),
+        "p99": pick(0.99),
+        "max": ms[-1] if ms else float("nan"),
+        "errors": errors,
+        "writes": writes.value,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", help="scratch database (default: temporary SQLite file)")
+    parser.add_argument("--apostadores", type=int, default=2000)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--read", choices=READS, default="standings")
+    parser.add_argument("--hold", type=float, default=0.05,
+                        help="seconds of work between the writes of each sync")
+    parser.add_argument("--drop", action="store_true",
+                        help="drop the app tables already in --url")
+    args = parser.parse_args()
+
+    if args.url and not args.drop:
+        existing = _existing_tables(args.url)
+        if existing:
+            parser.error(f"--url já tem tabelas do app ({', '.join(existing)}); "
+                         "use um banco descartável ou passe --drop")
+
+    results = []
+    for profile in ("default", "auto"):
+        if args.url:
+            url = args.url
+        else:
+            url = f"sqlite:///{Path(tempfile.mkdtemp()) / f'bench_{profile}.db'}"
+        results.append(_run(url, profile, args))
+
+    print(f"{'perfil':<8} {'leituras':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'max ms':>8} {'erros':>6} {'syncs':>6}")
+    for r in results:
+        print(f"{r['profile']:<8} {r['reads']:>8} {r['p50']:>8.1f} {r['p95']:>8.1f} "
+              f"{r['p99']:>8.1f} {r['max']:>8.1f} {r['errors']:>6} {r['writes']:>6}")
+
+
+if __name__ == "__main__":
+    main()
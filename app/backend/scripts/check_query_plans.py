@@ -0,0 +1,188 @@
+"""
+Check that the hot snapshot/palpite/apostador queries use their indexes.
+
+Seeds a scratch database with a season's worth of data (every apostador
+in every session), runs ANALYZE and inspects the plan of each query: a
+sequential scan on a table the query should reach through an index is a
+failure, and the exit status is 1.
+
+    cd app/backend
+    poetry run python -m scripts.check_query_plans
+    poetry run python -m scripts.check_query_plans --url postgresql://.../scratch
+
+``--url`` must point to a scratch database: the tables are created and
+dropped by the script, which refuses to start if any of them already
+exists unless ``--drop`` is given. Without it, a temporary SQLite file
+is used; that check also runs under pytest (``tests/test_query_plans.py``).
+The name search only counts on Postgres (pg_trgm); SQLite scans apostadores.
+"""
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+
+from sqlalchemy import Connection, Engine, create_engine, desc, insert, inspect, select, text
+
+from app.database import Base
+from app.models import Apostador, Palpite, Snapshot, Team
+
+N_TEAMS = 24  # four of them (e.g. promoted mid-season) nobody picked
+PICKED_TEAMS = 20
+PICKS = 7
+FIRST_SESSION = date(2026, 1, 27)
+
+
+def _sessions(n: int) -> list[date]:
+    """Tuesdays and Fridays from FIRST_SESSION."""
+    out, day = [], FIRST_SESSION
+    while len(out) < n:
+        out.append(day)
+        day += timedelta(days=3 if day.weekday() == 1 else 4)
+    return out
+
+
+def _seed(conn: Connection, apostadores: int, sessions: list[date]) -> None:
+    rnd = random.Random(0)
+    conn.execute(insert(Team), [
+        dict(id=i, sofascore_id=1000 + i, name=f"Time {i}", slug="", name_code="",
+             position=i, points=0, matches=0, wins=0, draws=0, losses=0,
+             goals_for=0, goals_against=0)
+        for i in range(1, N_TEAMS + 1)
+    ])
+    conn.execute(insert(Apostador), [
+        dict(id=i, nome=f"Apostador {i:05d}", ordem_inscricao=i)
+        for i in range(1, apostadores + 1)
+    ])
+    conn.execute(insert(Palpite), [
+        dict(apostador_id=a, team_id=t, prioridade=p + 1)
+        for a in range(1, apostadores + 1)
+        for p, t in enumerate(rnd.sample(range(1, PICKED_TEAMS + 1), PICKS))
+    ])
+    for rodada, session in enumerate(sessions, 1):
+        conn.execute(insert(Snapshot), [
+            dict(session_date=session, rodada=rodada, apostador_id=a,
+                 pontuacao=rnd.randint(0, 400), rank=rank)
+            for rank, a in enumerate(rnd.sample(range(1, apostadores + 1), apostadores), 1)
+        ])
+
+
+def _queries(sessions: list[date], apostadores: int) -> list[tuple[str, object, set[str]]]:
+    """(name, statement, tables that must not be scanned)."""
+    current = sessions[-1] + timedelta(days=3)
+    name = f"%{apostadores // 2:05d}%"
+    return [
+        (
+            "sessão anterior (_get_previous_snapshot)",
+            select(Snapshot.session_date)
+            .where(Snapshot.session_date < current)
+            .order_by(desc(Snapshot.session_date))
+            .limit(1),
+            {"snapshots"},
+        ),
+        (
+            "snapshots de uma sessão",
+            select(Snapshot).where(Snapshot.session_date == sessions[-1]),
+            {"snapshots"},
+        ),
+        (
+            "sessão ordenada por rank",
+            select(Snapshot.apostador_id, Snapshot.rank)
+            .where(Snapshot.session_date == sessions[-1])
+            .order_by(Snapshot.rank),
+            {"snapshots"},
+        ),
+        (
+            "histórico de um apostador (busca por nome)",
+            select(Snapshot.session_date, Apostador.nome, Snapshot.pontuacao, Snapshot.rank)
+            .join(Apostador, Snapshot.apostador_id == Apostador.id)
+            .where(Snapshot.apostador_id.in_(
+                select(Apostador.id).where(Apostador.nome.ilike(name))
+            ))
+            .order_by(Snapshot.session_date, Snapshot.rank),
+            {"snapshots", "apostadores"},
+        ),
+        (
+            "palpites de um time (FK ao remover)",
+            select(Palpite.id).where(Palpite.team_id == N_TEAMS),
+            {"palpites"},
+        ),
+    ]
+
+
+def _sqlite_scans(conn: Connection, stmt) -> list[str]:
+    sql = str(stmt.compile(conn, compile_kwargs={"literal_binds": True}))
+    plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").all()
+    # "SEARCH t ..." seeks an index; "SCAN t" reads all of t, through an
+    # index ("SCAN t USING [COVERING] INDEX") or not.
+    return [row[-1].split()[1] for row in plan if row[-1].startswith("SCAN ")]
+
+
+def _postgres_scans(conn: Connection, stmt) -> list[str]:
+    sql = str(stmt.compile(conn, compile_kwargs={"literal_binds": True}))
+    plan = conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+    plan = json.loads(plan) if isinstance(plan, str) else plan
+    scans, nodes = [], [plan[0]["Plan"]]
+    while nodes:
+        node = nodes.pop()
+        if node["Node Type"] == "Seq Scan":
+            scans.append(node["Relation Name"])
+        nodes.extend(node.get("Plans", []))
+    return scans
+
+
+def check(engine: Engine, apostadores: int, n_sessions: int) -> list[tuple[str, list[str]]]:
+    """
+    Seed the (empty) tables of ``engine`` and return, per query, the guarded
+    tables its plan scans.
+    """
+    sessions = _sessions(n_sessions)
+    with engine.begin() as conn:
+        _seed(conn, apostadores, sessions)
+    results = []
+    with engine.connect() as conn:
+        conn.execute(text("ANALYZE"))
+        postgres = engine.dialect.name == "postgresql"
+        scans_of = _postgres_scans if postgres else _sqlite_scans
+        for name, stmt, guarded in _queries(sessions, apostadores):
+            if not postgres:
+                guarded = guarded - {"apostadores"}
+            results.append((name, sorted(set(scans_of(conn, stmt)) & guarded)))
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", help="scratch database (default: temporary SQLite file)")
+    parser.add_argument("--apostadores", type=int, default=3000)
+    parser.add_argument("--sessions", type=int, default=76)
+    parser.add_argument("--drop", action="store_true",
+                        help="drop the app tables already in --url")
+    args = parser.parse_args()
+
+    url = args.url or f"sqlite:///{Path(tempfile.mkdtemp()) / 'plans.db'}"
+    engine = create_engine(url)
+    existing = sorted(set(inspect(engine).get_table_names()) & set(Base.metadata.tables))
+    if existing and not args.drop:
+        engine.dispose()
+        parser.error(f"--url já tem tabelas do app ({', '.join(existing)}); "
+                     "use um banco descartável ou passe --drop")
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    failures = 0
+    try:
+        for name, bad in check(engine, args.apostadores, args.sessions):
+            failures += bool(bad)
+            status = f"FALHA (seq scan em {', '.join(bad)})" if bad else "ok"
+            print(f"{name:<45} {status}")
+    finally:
+        Base.metadata.drop_all(engine)
+        engine.dispose()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
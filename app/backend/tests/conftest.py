@@ -0,0 +1,152 @@
+import os
+import random
+import tempfile
+import time
+
+# The app's engines are created at import time; point them at a scratch
+# database before anything imports app.database.
+_SCRATCH = tempfile.mkdtemp(prefix="bolao-tests-")
+os.environ.setdefault("BOLAO_DATABASE_URL", f"sqlite:///{_SCRATCH}/app.db")
+os.environ.setdefault("BOLAO_SCRAPER_COOKIES_FILE", "")
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.database import Base
+from app.database import engine as app_engine
+from app.services import badges_service, data_version, http_clients, strategy_health
+from app.sofascore_stub import server as stub_server
+
+STUB_URL = "http://sofascore.test"
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    session = sessionmaker(bind=engine, autoflush=False)()
+    yield session
+    session.close()
+
+
+class StubScraper:
+    """cloudscraper stand-in that sends its requests to the stub app."""
+
+    def __init__(self):
+        self._client = TestClient(stub_server.app)
+        self.headers = {}
+        self.cookies = httpx.Cookies()
+
+    def get(self, url, headers=None, timeout=None):
+        return self._client.get(url, headers=headers)
+
+    def close(self):
+        self._client.close()
+
+
+@pytest.fixture
+def stub(monkeypatch, tmp_path):
+    """The Sofascore stub behind every outbound client; yields its state."""
+    stub_server.state.reset()
+    monkeypatch.setattr(settings, "SOFASCORE_BASE_URL", f"{STUB_URL}/api/v1")
+    monkeypatch.setattr(
+        settings, "SOFASCORE_BADGE_URL", f"{STUB_URL}/api/v1/team/{{team_id}}/image"
+    )
+    monkeypatch.setattr(settings, "SOFASCORE_RETRY_DELAY", 0.01)
+    monkeypatch.setattr(settings, "SCRAPEDO_TOKEN", "")
+    monkeypatch.setattr(
+        http_clients,
+        "_new_httpx",
+        lambda: httpx.AsyncClient(transport=httpx.ASGITransport(app=stub_server.app)),
+    )
+    monkeypatch.setattr(http_clients, "_httpx", None)
+    monkeypatch.setattr(http_clients, "get_scraper", StubScraper)
+    monkeypatch.setattr(http_clients, "scraper_copy", StubScraper)
+    monkeypatch.setattr(badges_service, "BADGES_DIR", tmp_path / "badges")
+    monkeypatch.setattr(strategy_health, "_health", {})
+    monkeypatch.setattr(strategy_health, "_saved", None)
+    return stub_server.state
+
+
+@pytest.fixture
+def client(stub, monkeypatch):
+    """The app on an empty database, fetching from the stub."""
+    from app.main import app
+
+    # Syncs warm the simulation; keep it short unless a test asks for more.
+    monkeypatch.setattr(settings, "SIMULATION_RUNS", 500)
+
+    Base.metadata.drop_all(app_engine)
+    # Cached responses are keyed by the data version.
+    data_version.bump("tests")
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.fixture
+def admin_headers(client):
+    token = client.post(
+        "/api/auth/login",
+        json={"username": settings.ADMIN_USERNAME, "password": settings.ADMIN_PASSWORD},
+    ).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def wait_job(client, admin_headers):
+    """Poll a sync job until it finishes; returns it."""
+
+    def wait(job: dict) -> dict:
+        deadline = time.monotonic() + 30
+        while job["status"] in ("queued", "running"):
+            assert time.monotonic() < deadline, job
+            time.sleep(0.02)
+            job = client.get(f"/api/admin/sync/{job['id']}", headers=admin_headers).json()
+        return job
+
+    return wait
+
+
+@pytest.fixture
+def run_sync(client, admin_headers, wait_job):
+    """Start an admin sync and wait for it; returns the finished job."""
+
+    def run() -> dict:
+        return wait_job(client.post("/api/admin/sync", headers=admin_headers).json())
+
+    return run
+
+
+@pytest.fixture
+def add_apostadores(client, admin_headers):
+    """Import ``n`` apostadores with random picks among the synced teams."""
+
+    def add(n: int, seed: int = 1) -> list[dict]:
+        team_ids = [t["sofascore_id"] for t in client.get("/api/teams").json()]
+        rng = random.Random(seed)
+        items = [
+            {
+                "nome": f"Apostador {i}",
+                "ordem_inscricao": i,
+                "palpites": [
+                    {"team_id": team_id, "prioridade": p}
+                    for p, team_id in enumerate(rng.sample(team_ids, 7), start=1)
+                ],
+            }
+            for i in range(1, n + 1)
+        ]
+        result = client.post("/api/apostadores/import", json=items, headers=admin_headers)
+        assert result.json()["created"] == n, result.json()
+        return items
+
+    return add
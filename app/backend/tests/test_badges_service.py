@@ -0,0 +1,97 @@
+import asyncio
+import json
+import os
+import time
+
+import pytest
+
+from app.services import badges_service, http_clients
+
+BADGE = b"RIFF" + b"\0" * 200
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, content: bytes = b"", headers: dict | None = None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+
+class FakeScraper:
+    """Answers from ``routes`` (team id -> response or exception) and records requests."""
+
+    def __init__(self, routes: dict, requests: list):
+        self.routes = routes
+        self.requests = requests
+        self.closed = False
+
+    def get(self, url, headers=None, timeout=None):
+        team_id = int(url.rstrip("/").split("/")[-2])
+        self.requests.append((team_id, dict(headers or {})))
+        answer = self.routes[team_id]
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def badges(tmp_path, monkeypatch):
+    monkeypatch.setattr(badges_service, "BADGES_DIR", tmp_path)
+    monkeypatch.setattr(
+        badges_service.settings, "SOFASCORE_BADGE_URL", "https://img.test/team/{team_id}/image"
+    )
+    monkeypatch.setattr(badges_service.settings, "BADGE_REVALIDATE_HOURS", 1)
+    routes, requests, scrapers = {}, [], []
+
+    def scraper_copy():
+        scraper = FakeScraper(routes, requests)
+        scrapers.append(scraper)
+        return scraper
+
+    monkeypatch.setattr(http_clients, "scraper_copy", scraper_copy)
+    return tmp_path, routes, requests, scrapers
+
+
+def test_download_revalidate_and_failure(badges):
+    path, routes, requests, scrapers = badges
+    stale = time.time() - 7200
+    # 1: missing; 2: stale with a sidecar entry; 3: fresh; 4: missing, fails.
+    (path / "2.webp").write_bytes(b"old" * 100)
+    (path / "3.webp").write_bytes(b"old" * 100)
+    (path / badges_service.META_FILE).write_text(json.dumps({
+        "2": {"etag": '"e2"', "checked_at": stale},
+        "3": {"etag": '"e3"', "checked_at": time.time()},
+    }))
+    routes[1] = FakeResponse(200, BADGE, {"ETag": '"e1"', "Last-Modified": "Mon, 01 Jan 2024"})
+    routes[2] = FakeResponse(304)
+    routes[4] = ConnectionError("boom")
+
+    written = asyncio.run(badges_service.download_all_badges([1, 2, 3, 4, 1]))
+
+    assert written == 1
+    assert (path / "1.webp").read_bytes() == BADGE
+    assert (path / "2.webp").read_bytes() == b"old" * 100
+    assert sorted(r[0] for r in requests) == [1, 2, 4]
+    assert dict(requests)[2] == {"If-None-Match": '"e2"'}
+    assert dict(requests)[1] == {}
+
+    meta = json.loads((path / badges_service.META_FILE).read_text())
+    assert meta["1"]["etag"] == '"e1"'
+    assert meta["1"]["last_modified"] == "Mon, 01 Jan 2024"
+    assert meta["2"]["etag"] == '"e2"' and meta["2"]["checked_at"] > stale
+    assert meta["3"]["checked_at"] < time.time()
+    assert "4" not in meta
+
+    assert scrapers and all(s.closed for s in scrapers)
+    assert not [f for f in os.listdir(path) if f.endswith(".tmp")]
+
+
+def test_download_badge_rejects_small_body(badges):
+    path, routes, _, scrapers = badges
+    routes[5] = FakeResponse(200, b"tiny")
+    assert asyncio.run(badges_service.download_badge(5)) == (False, None)
+    assert not (path / "5.webp").exists()
+    assert scrapers[0].closed
@@ -0,0 +1,39 @@
+from app.config import settings
+from app.sofascore_stub import server as stub_server
+
+
+def test_bounds_and_flags(client, run_sync, add_apostadores):
+    # Two rounds left, so some apostadores are already out of the race.
+    stub_server.advance(settings.SEASON_ROUNDS - 2 - 20)
+    run_sync()
+    items = add_apostadores(40)
+    teams = {t["sofascore_id"]: t for t in client.get("/api/teams").json()}
+    picks = {i["nome"]: [p["team_id"] for p in i["palpites"]] for i in items}
+
+    entries = client.get("/api/ranking/eliminacao").json()["entries"]
+    assert [e["rank"] for e in entries] == list(range(1, 41))
+    for e in entries:
+        remaining = sum(settings.SEASON_ROUNDS - teams[t]["matches"] for t in picks[e["apostador"]])
+        assert e["total_minimo"] == e["total"]
+        assert e["total_maximo"] == e["total"] + 3 * remaining
+
+    assert not entries[0]["eliminado"]
+    assert any(e["eliminado"] for e in entries)
+    for a in entries:
+        others = [b for b in entries if b is not a]
+        if any(b["total_minimo"] > a["total_maximo"] for b in others):
+            assert a["eliminado"]
+        if a["eliminado"]:
+            assert any(b["total_minimo"] >= a["total_maximo"] for b in others)
+        if a["podio_garantido"]:
+            assert sum(b["total_maximo"] >= a["total_minimo"] for b in others) < 3
+
+
+def test_season_over_is_exact(client, run_sync, add_apostadores):
+    stub_server.advance(settings.SEASON_ROUNDS - 20)
+    run_sync()
+    add_apostadores(10)
+    entries = client.get("/api/ranking/eliminacao").json()["entries"]
+    assert all(e["total_minimo"] == e["total_maximo"] for e in entries)
+    assert [e["eliminado"] for e in entries] == [False] + [True] * 9
+    assert [e["podio_garantido"] for e in entries] == [True] * 3 + [False] * 7
@@ -0,0 +1,72 @@
+import csv
+import io
+import json
+
+from app.config import settings
+from app.routers import export
+
+SLOTS = range(1, settings.TIMES_PER_APOSTADOR + 1)
+COLUMNS = {
+    "ranking": [
+        "rank", "apostador", "ordem_inscricao", "total", "total_jogos",
+        "media_pontos", "aproveitamento", "delta_pontos", "delta_rank",
+    ] + [f"time_{i}" for i in SLOTS] + [f"pontos_{i}" for i in SLOTS],
+    "historico": ["session_date", "rodada", "apostador", "pontuacao", "rank"],
+    "apostadores": ["apostador", "ordem_inscricao"]
+    + [f"time_{i}" for i in SLOTS] + [f"team_id_{i}" for i in SLOTS],
+}
+
+
+def _csv(client, name: str) -> list[dict]:
+    r = client.get(f"/api/export/{name}")
+    assert r.headers["content-type"] == "text/csv; charset=utf-8"
+    assert r.headers["content-disposition"] == f'attachment; filename="bolao-{name}.csv"'
+    reader = csv.DictReader(io.StringIO(r.text))
+    rows = list(reader)
+    assert reader.fieldnames == COLUMNS[name]
+    return rows
+
+
+def _ndjson(client, name: str) -> list[dict]:
+    r = client.get(f"/api/export/{name}", params={"formato": "ndjson"})
+    assert r.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in r.text.splitlines()]
+    assert all(list(row) == COLUMNS[name] for row in rows)
+    return rows
+
+
+def test_export_columns_and_rows(client, run_sync, add_apostadores, monkeypatch):
+    # Several batches per export.
+    monkeypatch.setattr(export, "EXPORT_BATCH_SIZE", 7)
+    run_sync()
+    items = add_apostadores(25)
+    run_sync()  # records the session snapshot
+
+    ranking = client.get("/api/ranking").json()["entries"]
+    teams = {t["sofascore_id"]: t["name"] for t in client.get("/api/teams").json()}
+
+    rows = _csv(client, "ranking")
+    assert [r["apostador"] for r in rows] == [e["apostador"] for e in ranking]
+    assert [int(r["total"]) for r in rows] == [e["total"] for e in ranking]
+    assert _ndjson(client, "ranking")[0]["pontos_1"] == ranking[0]["pontos"][0]
+
+    rows = _csv(client, "historico")
+    assert len(rows) == 25
+    assert {(r["apostador"], int(r["pontuacao"])) for r in rows} == {
+        (e["apostador"], e["total"]) for e in ranking
+    }
+    assert len(_ndjson(client, "historico")) == 25
+
+    rows = _ndjson(client, "apostadores")
+    assert [r["apostador"] for r in rows] == [i["nome"] for i in items]
+    for row, item in zip(rows, items):
+        for p in item["palpites"]:
+            assert row[f"team_id_{p['prioridade']}"] == p["team_id"]
+            assert row[f"time_{p['prioridade']}"] == teams[p["team_id"]]
+    assert len(_csv(client, "apostadores")) == 25
+
+
+def test_empty_exports(client):
+    for name in COLUMNS:
+        assert _csv(client, name) == []
+        assert _ndjson(client, name) == []
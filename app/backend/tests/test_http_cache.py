@@ -0,0 +1,104 @@
+import re
+from datetime import datetime
+
+import pytest
+
+from app import http_cache
+from app.config import settings
+from app.services import session_utils
+from app.sofascore_stub import server as stub_server
+
+READS = ["/api/ranking", "/api/teams", "/api/standings", "/api/ranking/eliminacao"]
+
+
+def test_etag_and_conditional_get(client, run_sync, add_apostadores):
+    run_sync()
+    add_apostadores(10)
+    for path in READS:
+        r = client.get(path, headers={"Accept-Encoding": "identity"})
+        etag = r.headers["etag"]
+        assert r.status_code == 200
+        assert re.fullmatch(r'"[0-9a-f]+\.\d+\.\d{4}-\d\d-\d\d"', etag)
+        assert r.headers["x-data-version"] == etag.strip('"').rpartition(".")[0]
+        assert re.fullmatch(
+            r"public, max-age=0, stale-while-revalidate=\d+", r.headers["cache-control"]
+        )
+
+        for if_none_match in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+            cached = client.get(path, headers={"If-None-Match": if_none_match})
+            assert cached.status_code == 304, (path, if_none_match)
+            assert cached.content == b""
+            assert cached.headers["etag"] == etag
+            assert cached.headers["cache-control"] == r.headers["cache-control"]
+        assert client.get(path, headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_etag_changes_with_the_data(client, run_sync, add_apostadores, admin_headers):
+    run_sync()
+    add_apostadores(5)
+    run_sync()  # records the session snapshot
+    etag = client.get("/api/ranking").headers["etag"]
+
+    # An unchanged sync keeps the version; clients keep their copies.
+    run_sync()
+    assert client.get("/api/ranking", headers={"If-None-Match": etag}).status_code == 304
+
+    apostador = client.get("/api/apostadores").json()[0]
+    client.delete(f"/api/apostadores/{apostador['id']}", headers=admin_headers)
+    r = client.get("/api/ranking", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.headers["etag"] != etag
+    assert len(r.json()["entries"]) == 4
+
+    etag = r.headers["etag"]
+    stub_server.advance()
+    run_sync()
+    assert client.get("/api/ranking", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_encoded_variants(client, run_sync, add_apostadores):
+    run_sync()
+    add_apostadores(30)
+    plain = client.get("/api/ranking", headers={"Accept-Encoding": "identity"})
+    etag = plain.headers["etag"]
+    assert "content-encoding" not in plain.headers
+    assert plain.headers["vary"] == "Accept-Encoding"
+
+    gz = client.get("/api/ranking", headers={"Accept-Encoding": "gzip"})
+    assert gz.headers["content-encoding"] == "gzip"
+    assert gz.headers["vary"] == "Accept-Encoding"
+    assert gz.headers["etag"] == f'{etag[:-1]}-gz"'
+    assert gz.content == plain.content  # decoded by the client
+    assert client.get(
+        "/api/ranking", headers={"Accept-Encoding": "gzip;q=0"}
+    ).headers.get("content-encoding") is None
+
+    # Either variant revalidates, and the 304 names the one the client holds.
+    for held in (etag, gz.headers["etag"]):
+        for accept in ("identity", "gzip"):
+            r = client.get(
+                "/api/ranking", headers={"Accept-Encoding": accept, "If-None-Match": held}
+            )
+            assert r.status_code == 304
+            assert r.headers["etag"] == held
+
+
+def test_small_payloads_are_not_compressed(client):
+    r = client.get("/api/teams", headers={"Accept-Encoding": "gzip"})
+    assert r.json() == []
+    assert "content-encoding" not in r.headers
+    assert "vary" not in r.headers
+
+
+@pytest.mark.parametrize(
+    ("now", "stale"),
+    [
+        (datetime(2026, 10, 19, 12), 12 * 3600),  # Mon: until Tue starts
+        (datetime(2026, 10, 20, 10), 14 * 3600),  # Tue: until the Fri session starts on Wed
+        (datetime(2026, 10, 23, 22), 2 * 3600),  # Fri
+        (datetime(2026, 10, 17, 10), settings.HTTP_CACHE_MAX_STALE),  # Sat: 62h to Tue, capped
+    ],
+)
+def test_stale_while_revalidate_runs_to_the_next_session_boundary(monkeypatch, now, stale):
+    monkeypatch.setattr(session_utils, "brasilia_now", lambda: now)
+    assert http_cache.cache_control() == f"public, max-age=0, stale-while-revalidate={stale}"
@@ -0,0 +1,98 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from app.config import settings
+from app.database import SessionLocal
+from app.services import app_state, live_polling, session_utils, sync_jobs
+from app.sofascore_stub import server as stub_server
+
+# 2026-10-17 is a Saturday (window 11h-24h); 2026-10-20 a Tuesday (19h-24h).
+SATURDAY = datetime(2026, 10, 17)
+TUESDAY = datetime(2026, 10, 20)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    def at(now: datetime) -> None:
+        monkeypatch.setattr(session_utils, "brasilia_now", lambda: now)
+
+    return at
+
+
+@pytest.mark.parametrize(
+    ("now", "expected"),
+    [
+        (SATURDAY.replace(hour=10), 3600),  # an hour before kick-off
+        (SATURDAY.replace(hour=10, minute=59, second=30), settings.LIVE_POLL_SECONDS),
+        (SATURDAY.replace(hour=15), settings.LIVE_POLL_SECONDS),
+        (TUESDAY.replace(hour=1), settings.LIVE_IDLE_MAX_SECONDS),  # 18h away, capped
+        (TUESDAY.replace(hour=23, minute=59), settings.LIVE_POLL_SECONDS),
+    ],
+)
+def test_next_delay_follows_the_windows(clock, now, expected):
+    clock(now)
+    assert live_polling.next_delay() == expected
+
+
+def test_unchanged_polls_back_off(clock):
+    clock(SATURDAY.replace(hour=15))
+    poll, after = settings.LIVE_POLL_SECONDS, settings.LIVE_BACKOFF_AFTER
+    assert live_polling.next_delay(after - 1) == poll
+    assert live_polling.next_delay(after) == 2 * poll
+    assert live_polling.next_delay(after + 1) == 4 * poll
+    assert live_polling.next_delay(after + 50) == settings.LIVE_BACKOFF_MAX_SECONDS
+    # Outside a window the count doesn't matter.
+    clock(SATURDAY.replace(hour=10))
+    assert live_polling.next_delay(after + 50) == 3600
+
+
+def _pending() -> str | None:
+    with SessionLocal() as db:
+        return app_state.get_value(db, sync_jobs.SNAPSHOT_PENDING_KEY)
+
+
+def test_polls_apply_changes_and_flag_the_snapshot(client, run_sync, add_apostadores, stub):
+    run_sync()
+    add_apostadores(6)
+    run_sync()
+    version = client.get("/api/ranking").headers["x-data-version"]
+    historico = client.get("/api/historico").json()
+
+    assert asyncio.run(live_polling.poll_once()) is False
+    assert not _pending()
+
+    stub_server.advance()
+    assert asyncio.run(live_polling.poll_once()) is True
+    assert _pending() == "1"
+    assert client.get("/api/ranking").headers["x-data-version"] != version
+    # Polls never write snapshots; the next sync does, and clears the flag.
+    assert client.get("/api/historico").json() == historico
+    job = run_sync()
+    assert job["result"]["unchanged"] is True
+    assert job["result"]["historico_session"]
+    assert not _pending()
+
+    # A sync in progress makes the poll skip without fetching.
+    with SessionLocal() as db:
+        assert app_state.try_lock(db, sync_jobs.LOCK_KEY, "1", settings.SYNC_LOCK_TTL)
+    fetches = stub.stats["api"]
+    stub_server.advance()
+    assert asyncio.run(live_polling.poll_once()) is False
+    assert stub.stats["api"] == fetches
+
+
+def test_run_counts_unchanged_polls_in_a_window(client, run_sync, clock, monkeypatch):
+    run_sync()
+    monkeypatch.setattr(live_polling, "_unchanged", 0)
+    clock(SATURDAY.replace(hour=15))
+    for expected in (1, 2):
+        asyncio.run(live_polling._run())
+        assert live_polling._unchanged == expected
+    stub_server.advance()
+    asyncio.run(live_polling._run())
+    assert live_polling._unchanged == 0
+    clock(SATURDAY.replace(hour=10))
+    asyncio.run(live_polling._run())
+    assert live_polling._unchanged == 0
@@ -0,0 +1,30 @@
+import asyncio
+import threading
+import time
+
+from app.services import payload_cache
+
+
+def test_concurrent_misses_build_once():
+    calls = []
+    main_thread = threading.get_ident()
+
+    def build(db) -> bytes:
+        calls.append(threading.get_ident())
+        time.sleep(0.05)
+        return b'{"ok":true}' * 200
+
+    async def run():
+        return await asyncio.gather(
+            *(payload_cache.get_payload("test_single_flight", "v1", build) for _ in range(5))
+        )
+
+    payloads = asyncio.run(run())
+    assert len(calls) == 1
+    assert calls[0] != main_thread
+    assert all(p is payloads[0] for p in payloads)
+    assert payloads[0].gzip is not None
+    # Cached for the key; a new key rebuilds.
+    assert asyncio.run(payload_cache.get_payload("test_single_flight", "v1", build)) is payloads[0]
+    asyncio.run(payload_cache.get_payload("test_single_flight", "v2", build))
+    assert len(calls) == 2
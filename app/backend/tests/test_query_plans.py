@@ -0,0 +1,9 @@
+"""The hot snapshot/palpite queries reach SQLite through their indexes."""
+
+from scripts.check_query_plans import check
+
+
+def test_sqlite_query_plans_use_indexes(engine):
+    results = check(engine, apostadores=500, n_sessions=20)
+    assert results
+    assert [(name, bad) for name, bad in results if bad] == []
@@ -0,0 +1,67 @@
+from app.sofascore_stub import server as stub_server
+
+
+def _delta(client, since: str) -> dict:
+    r = client.get("/api/ranking", params={"since": since})
+    assert r.status_code == 200
+    assert r.headers["cache-control"] == "no-store"
+    assert "etag" not in r.headers
+    assert r.headers["x-data-version"] == r.json()["version"]
+    return r.json()
+
+
+def test_delta_patches_the_held_ranking(client, run_sync, add_apostadores, admin_headers):
+    run_sync()
+    add_apostadores(20)
+    run_sync()
+    held = client.get("/api/ranking")
+    version = held.headers["x-data-version"]
+    entries = {e["ordem_inscricao"]: e for e in held.json()["entries"]}
+
+    same = _delta(client, version)
+    assert same["full_refresh"] is False
+    assert same["changed"] == same["removed"] == []
+
+    stub_server.advance()
+    run_sync()
+    apostador = client.get("/api/apostadores").json()[3]
+    client.delete(f"/api/apostadores/{apostador['id']}", headers=admin_headers)
+
+    delta = _delta(client, version)
+    assert delta["full_refresh"] is False
+    assert delta["since"] == version
+    assert delta["removed"] == [apostador["ordem_inscricao"]]
+    for ordem in delta["removed"]:
+        del entries[ordem]
+    for e in delta["changed"]:
+        entries[e["ordem_inscricao"]] = e
+    current = client.get("/api/ranking").json()
+    assert sorted(entries.values(), key=lambda e: e["rank"]) == current["entries"]
+    assert delta["rodada"] == current["rodada"]
+
+
+def test_unknown_versions_get_a_full_refresh(client, run_sync, add_apostadores):
+    run_sync()
+    add_apostadores(5)
+    full = client.get("/api/ranking").json()["entries"]
+    for since in ("garbage", "otherepoch.3", "0"):
+        delta = _delta(client, since)
+        assert delta["full_refresh"] is True
+        assert delta["removed"] == []
+        assert delta["changed"] == full
+
+
+def test_delta_and_full_ranking_do_not_share_validators(client, run_sync, add_apostadores):
+    run_sync()
+    add_apostadores(30)
+    full = client.get("/api/ranking", headers={"Accept-Encoding": "gzip"})
+    version = full.headers["x-data-version"]
+    delta = client.get(
+        "/api/ranking", params={"since": version}, headers={"Accept-Encoding": "gzip"}
+    )
+    assert delta.headers["cache-control"] == "no-store"
+    assert "etag" not in delta.headers
+    assert delta.json()["changed"] == []
+    assert client.get(
+        "/api/ranking", params={"since": version, "session": "2026-01-06"}
+    ).status_code == 400
@@ -0,0 +1,100 @@
+import json
+import time
+from collections.abc import Callable
+
+import pytest
+
+from app.config import settings
+from app.services import ranking_events
+from app.sofascore_stub import server as stub_server
+
+
+@pytest.fixture
+def events(client, monkeypatch):
+    """
+    Subscribe on the app's event loop; returns a function that collects
+    chunks until ``done(chunks)`` in the background.
+    """
+    monkeypatch.setattr(settings, "SSE_DEBOUNCE_SECONDS", 0.05)
+
+    def subscribe(done: Callable[[list[str]], bool]):
+        async def collect() -> list[str]:
+            chunks = []
+            stream = ranking_events.subscribe()
+            try:
+                async for chunk in stream:
+                    chunks.append(chunk.decode())
+                    if done(chunks):
+                        return chunks
+            finally:
+                await stream.aclose()
+
+        future = client.portal.start_task_soon(collect)
+        # Wait until the subscriber holds its base ranking.
+        deadline = time.monotonic() + 5
+        while not ranking_events.subscribers() or ranking_events._token is None:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        return future
+
+    return subscribe
+
+
+def _frames(chunk: str) -> list[tuple[str, dict]]:
+    frames = []
+    for block in chunk.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if ": " in line)
+        if "event" in fields:
+            frames.append((fields["event"], json.loads(fields["data"])))
+    return frames
+
+
+def _apply(entries: list[dict], diff: dict) -> list[dict]:
+    by_ordem = {e["ordem_inscricao"]: e for e in entries}
+    for ordem in diff["removed"]:
+        del by_ordem[ordem]
+    for e in diff["changed"]:
+        by_ordem[e["ordem_inscricao"]] = e
+    return sorted(by_ordem.values(), key=lambda e: e["rank"])
+
+
+def test_diff_frames_patch_the_ranking(client, run_sync, add_apostadores, admin_headers, events):
+    run_sync()
+    add_apostadores(15)
+    run_sync()
+    before = client.get("/api/ranking")
+    # Until the diff for the deletions below.
+    stream = events(lambda chunks: '"removed":[]' not in chunks[-1] and len(chunks) > 1)
+
+    stub_server.advance()
+    run_sync()
+    # Two edits in quick succession are published once.
+    for apostador in client.get("/api/apostadores").json()[:2]:
+        client.delete(f"/api/apostadores/{apostador['id']}", headers=admin_headers)
+    hello, *updates = stream.result(timeout=10)
+
+    assert hello.startswith("retry: 5000\n\n")
+    [(event, data)] = _frames(hello)
+    assert event == "version"
+    assert data == {"version": before.headers["x-data-version"], "previous": None}
+
+    entries = before.json()["entries"]
+    version = data["version"]
+    for chunk in updates:
+        (event, data), (diff_event, diff) = _frames(chunk)
+        assert (event, diff_event) == ("version", "ranking-diff")
+        assert data["previous"] == diff["previous"] == version
+        assert data["version"] == diff["version"] != version
+        entries, version = _apply(entries, diff), diff["version"]
+    assert len(diff["removed"]) == 2
+
+    after = client.get("/api/ranking")
+    assert version == after.headers["x-data-version"]
+    assert entries == after.json()["entries"]
+
+
+def test_idle_stream_sends_heartbeats(client, run_sync, events, monkeypatch):
+    run_sync()
+    monkeypatch.setattr(settings, "SSE_HEARTBEAT_SECONDS", 0.05)
+    _, ping = events(lambda chunks: len(chunks) == 2).result(timeout=5)
+    assert ping == ": ping\n\n"
@@ -0,0 +1,149 @@
+"""The NumPy ranking engine against the per-apostador loop it replaced."""
+
+import random
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import desc, func
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import Apostador, Palpite, Snapshot, Team
+from app.schemas import RankingEntry, RankingResponse
+from app.services import ranking_service
+from app.services.ranking_service import BRT_FORMAT, build_ranking, update_ranking_state
+from app.services.session_utils import get_session_date
+
+
+def _reference_build_ranking(db: Session) -> RankingResponse:
+    """The loop implementation ``build_ranking`` had before the engine."""
+    team_by_pk = {t.id: t for t in db.query(Team).all()}
+    apostadores = db.query(Apostador).all()
+    last = db.query(func.max(Team.updated_at)).scalar()
+    updated_at = last.strftime(BRT_FORMAT) if last else "Sem dados"
+    rodada = db.query(func.max(Team.matches)).scalar() or 0
+    if not apostadores:
+        return RankingResponse(
+            updated_at=updated_at, display_column=settings.DISPLAY_COLUMN, rodada=rodada, entries=[]
+        )
+
+    prev_snapshots = {}
+    prev_date = (
+        db.query(Snapshot.session_date)
+        .filter(Snapshot.session_date < get_session_date())
+        .order_by(desc(Snapshot.session_date))
+        .first()
+    )
+    if prev_date:
+        prev_snapshots = {
+            s.apostador_id: s
+            for s in db.query(Snapshot).filter(Snapshot.session_date == prev_date[0])
+        }
+
+    rows = []
+    for ap in apostadores:
+        palpites = sorted(ap.palpites, key=lambda p: p.prioridade)
+        row = dict(
+            ap_id=ap.id, apostador=ap.nome, ordem_inscricao=ap.ordem_inscricao, total=0,
+            total_jogos=0, pontos=[], times=[], times_codes=[], team_ids=[], team_positions=[],
+        )
+        for i in range(settings.TIMES_PER_APOSTADOR):
+            if i < len(palpites):
+                team = team_by_pk.get(palpites[i].team_id)
+                row["pontos"].append(team.points if team else 0)
+                row["times"].append(team.name if team else f"ID:{palpites[i].team_id}")
+                row["times_codes"].append(team.name_code if team else "")
+                row["team_ids"].append(team.sofascore_id if team else 0)
+                row["team_positions"].append(team.position if team else 0)
+                row["total"] += team.points if team else 0
+                row["total_jogos"] += team.matches if team else 0
+            else:
+                for key, empty in (("pontos", 0), ("times", ""), ("times_codes", ""),
+                                   ("team_ids", 0), ("team_positions", 0)):
+                    row[key].append(empty)
+        rows.append(row)
+
+    rows.sort(key=lambda r: (-r["total"], *(-p for p in r["pontos"]), r["ordem_inscricao"]))
+
+    entries = []
+    for idx, r in enumerate(rows):
+        prev = prev_snapshots.get(r["ap_id"])
+        total, jogos = r["total"], r["total_jogos"]
+        entries.append(RankingEntry(
+            rank=idx + 1,
+            apostador=r["apostador"],
+            ordem_inscricao=r["ordem_inscricao"],
+            total=total,
+            total_jogos=jogos,
+            media_pontos=round(total / jogos, 2) if jogos > 0 else 0.0,
+            aproveitamento=round((total / (jogos * 3)) * 100, 2) if jogos > 0 else 0.0,
+            delta_pontos=total - prev.pontuacao if prev else None,
+            delta_rank=prev.rank - (idx + 1) if prev else None,
+            pontos=r["pontos"],
+            times=r["times"],
+            times_codes=r["times_codes"],
+            team_ids=r["team_ids"],
+            team_positions=r["team_positions"],
+        ))
+    return RankingResponse(
+        updated_at=updated_at, display_column=settings.DISPLAY_COLUMN, rodada=rodada, entries=entries
+    )
+
+
+def _seed(db: Session, n: int, seed: int) -> list[Team]:
+    rnd = random.Random(seed)
+    teams = []
+    for i in range(20):
+        team = Team(
+            sofascore_id=1000 + i, name=f"Time {i}", name_code=f"T{i:02d}", position=i + 1,
+            # Few distinct values, so totals and priority points tie often.
+            points=rnd.choice([10, 10, 12, 15]), matches=rnd.randint(0, 3),
+        )
+        db.add(team)
+        teams.append(team)
+    db.flush()
+    # Teams with no games played, for the zero-division paths.
+    for team in teams[:3]:
+        team.matches = 0
+
+    previous = get_session_date() - timedelta(days=3)
+    for i in range(n):
+        ap = Apostador(nome=f"Apostador {i}", ordem_inscricao=rnd.randint(1, 10**6) * n + i)
+        db.add(ap)
+        db.flush()
+        picks = rnd.sample(teams, settings.TIMES_PER_APOSTADOR if i % 10 else 4)  # partial picks
+        for p, team in enumerate(picks):
+            db.add(Palpite(apostador_id=ap.id, team_id=team.id, prioridade=p + 1))
+        if i % 7 == 0:  # a team id that doesn't exist
+            db.add(Palpite(apostador_id=ap.id, team_id=9000 + i, prioridade=len(picks) + 1))
+        if i % 3:
+            db.add(Snapshot(session_date=previous, rodada=1, apostador_id=ap.id,
+                            pontuacao=rnd.randint(0, 80), rank=rnd.randint(1, n)))
+    # An older session, which must be ignored.
+    db.add(Snapshot(session_date=previous - timedelta(days=4), rodada=1, apostador_id=1,
+                    pontuacao=999, rank=1))
+    db.commit()
+    return teams
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_build_ranking_matches_loop(db, seed):
+    _seed(db, 300, seed)
+    assert build_ranking(db).model_dump() == _reference_build_ranking(db).model_dump()
+
+
+def test_build_ranking_empty(db):
+    assert build_ranking(db).model_dump() == _reference_build_ranking(db).model_dump()
+
+
+def test_incremental_update_matches_rebuild(db):
+    teams = _seed(db, 300, 4)
+    state = ranking_service.load_ranking_state(db)
+    rnd = random.Random(4)
+    changed = rnd.sample(teams, 3)
+    for team in changed:
+        team.points += rnd.randint(1, 6)
+        team.matches += 1
+    db.commit()
+    updated = update_ranking_state(db, state, {t.id for t in changed})
+    assert updated.response().model_dump() == _reference_build_ranking(db).model_dump()
@@ -0,0 +1,57 @@
+import time
+
+from app.config import settings
+from app.services import data_version, simulation_service
+from app.sofascore_stub import server as stub_server
+
+
+def _simulacao(client) -> list[dict]:
+    # A bump invalidates the per-version cache, so each call simulates again.
+    data_version.bump("tests")
+    return client.get("/api/ranking/simulacao").json()["entries"]
+
+
+def test_simulation_is_deterministic_for_a_seed(client, run_sync, add_apostadores, monkeypatch):
+    run_sync()
+    add_apostadores(30)
+    monkeypatch.setattr(settings, "SIMULATION_RUNS", 1200)
+    monkeypatch.setattr(settings, "SIMULATION_CHUNK_SIZE", 250)
+
+    first = _simulacao(client)
+    assert first == _simulacao(client)
+    assert abs(sum(e["chance_titulo"] for e in first) - 100) < 0.1
+    assert abs(sum(e["chance_podio"] for e in first) - 300) < 0.1
+    assert all(1 <= e["rank_esperado"] <= 30 for e in first)
+
+    # Worker processes get the same chunks and seeds.
+    monkeypatch.setattr(settings, "SIMULATION_WORKERS", 2)
+    try:
+        assert _simulacao(client) == first
+    finally:
+        simulation_service.shutdown()
+
+    monkeypatch.setattr(settings, "SIMULATION_SEED", settings.SIMULATION_SEED + 1)
+    assert _simulacao(client) != first
+
+
+def test_sync_warms_the_simulation(client, run_sync, add_apostadores, monkeypatch):
+    run_sync()
+    add_apostadores(5)
+    monkeypatch.setattr(settings, "SIMULATION_RUNS", 200)
+    stub_server.advance()
+    run_sync()
+    # Computed in the background for the new version, without any request.
+    deadline = time.monotonic() + 10
+    while (cached := simulation_service._cached) is None or cached[0] != data_version.current():
+        assert time.monotonic() < deadline
+        time.sleep(0.02)
+
+
+def test_chunk_size_fits_the_memory_budget(monkeypatch):
+    monkeypatch.setattr(settings, "SIMULATION_CHUNK_SIZE", 500)
+    monkeypatch.setattr(settings, "SIMULATION_CHUNK_MB", 32)
+    assert simulation_service.chunk_size(10, 7) == 500
+    big = simulation_service.chunk_size(20_000, 7)
+    assert 1 <= big < 500
+    assert big * 20_000 * (2 * 7 + 6) * 8 <= 32 * 1024 * 1024
+    assert simulation_service.chunk_size(10**9, 7) == 1
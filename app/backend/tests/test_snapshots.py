@@ -0,0 +1,39 @@
+from sqlalchemy import func, select
+
+from app.database import SessionLocal
+from app.models import Snapshot, TeamStanding
+from app.sofascore_stub import server as stub_server
+
+
+def _counts() -> tuple[int, int]:
+    with SessionLocal() as db:
+        return (
+            db.scalar(select(func.count()).select_from(Snapshot)),
+            db.scalar(select(func.count()).select_from(TeamStanding)),
+        )
+
+
+def test_snapshot_is_upserted_within_a_session(client, run_sync, add_apostadores):
+    run_sync()
+    assert _counts() == (0, 0)  # nobody to rank yet
+    add_apostadores(12)
+
+    job = run_sync()
+    assert job["result"]["historico_session"]
+    assert _counts() == (12, 20)
+    before = {s["apostador"]: s for s in client.get("/api/historico").json()}
+    assert {a: s["pontuacao"] for a, s in before.items()} == {
+        e["apostador"]: e["total"] for e in client.get("/api/ranking").json()["entries"]
+    }
+
+    # A new round in the same session overwrites the session's rows.
+    stub_server.advance()
+    run_sync()
+    assert _counts() == (12, 20)
+    after = {s["apostador"]: s for s in client.get("/api/historico").json()}
+    assert after.keys() == before.keys()
+    assert all(s["rodada"] == before[a]["rodada"] + 1 for a, s in after.items())
+    assert {a: s["pontuacao"] for a, s in after.items()} == {
+        e["apostador"]: e["total"] for e in client.get("/api/ranking").json()["entries"]
+    }
+    assert sorted(s["rank"] for s in after.values()) == list(range(1, 13))
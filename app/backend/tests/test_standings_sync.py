@@ -0,0 +1,50 @@
+from app.sofascore_stub import server as stub_server
+
+FIXTURE = (325, 87678)
+
+
+def _rows() -> list[dict]:
+    return stub_server.state.standings[FIXTURE]["standings"][0]["rows"]
+
+
+def _teams(client) -> dict[int, dict]:
+    return {t["sofascore_id"]: t for t in client.get("/api/teams").json()}
+
+
+def test_upsert_writes_only_changed_teams(client, run_sync):
+    job = run_sync()
+    assert job["status"] == "succeeded"
+    teams = _teams(client)
+    assert len(teams) == 20
+    for row in _rows():
+        team = teams[row["team"]["id"]]
+        assert (team["name"], team["position"], team["points"], team["goals_for"]) == (
+            row["team"]["name"], row["position"], row["points"], row["scoresFor"]
+        )
+
+    moved = _rows()[5]
+    moved["scoresFor"] += 1
+    job = run_sync()
+    assert "1 atualizados" in job["message"]
+    after = _teams(client)
+    assert after.keys() == teams.keys()
+    assert after[moved["team"]["id"]]["goals_for"] == moved["scoresFor"]
+    assert after[moved["team"]["id"]]["updated_at"] > teams[moved["team"]["id"]]["updated_at"]
+    assert all(
+        after[i]["updated_at"] == teams[i]["updated_at"] for i in teams if i != moved["team"]["id"]
+    )
+
+    stub_server.advance()
+    job = run_sync()
+    assert "20 atualizados" in job["message"]
+    assert len(_teams(client)) == 20
+
+
+def test_short_table_is_refused(client, run_sync, stub):
+    run_sync()
+    teams = _teams(client)
+    stub.config = stub.config.model_copy(update={"TRUNCATE_ROWS": 10})
+    job = run_sync()
+    assert job["status"] == "failed"
+    assert "Proteção" in job["message"]
+    assert _teams(client) == teams
@@ -0,0 +1,137 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.database import SessionLocal
+from app.services import app_state, http_clients, sofascore, strategy_health
+from app.sofascore_stub import server as stub_server
+
+
+class SlowTransport(httpx.AsyncBaseTransport):
+    """Answers from the stub after ``delay`` seconds; records being cancelled."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.cancelled = False
+        self._stub = httpx.ASGITransport(app=stub_server.app)
+
+    async def handle_async_request(self, request):
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return await self._stub.handle_async_request(request)
+
+
+def _use_httpx_transport(monkeypatch, transport: httpx.AsyncBaseTransport) -> None:
+    monkeypatch.setattr(http_clients, "_new_httpx", lambda: httpx.AsyncClient(transport=transport))
+    monkeypatch.setattr(http_clients, "_httpx", None)
+
+
+def _fetch() -> list[dict]:
+    return asyncio.run(sofascore.fetch_standings())
+
+
+def _health(name: str) -> strategy_health.StrategyHealth:
+    return strategy_health._health[name]
+
+
+def test_working_strategy_stays_first(client):
+    for _ in range(3):
+        assert len(_fetch()) == 20
+    assert len(_health("httpx").recent) == 3
+    assert _health("cloudscraper").recent == []
+    assert sofascore._chain() == ["httpx", "cloudscraper"]
+
+
+def test_failing_strategy_drops_behind_and_opens_its_breaker(client, monkeypatch):
+    monkeypatch.setattr(settings, "SOFASCORE_BREAKER_THRESHOLD", 2)
+    _use_httpx_transport(monkeypatch, httpx.MockTransport(lambda request: httpx.Response(403)))
+
+    assert len(_fetch()) == 20
+    assert _health("httpx").consecutive_failures == 1
+    assert sofascore._chain() == ["cloudscraper", "httpx"]
+
+    # Tried first again, httpx fails once more and its breaker opens.
+    _health("cloudscraper").success_rate = 0.0
+    assert len(_fetch()) == 20
+    assert _health("httpx").is_open(time.time())
+    assert sofascore._chain() == ["cloudscraper"]
+
+
+def test_all_breakers_open_soonest_first(client):
+    now = time.time()
+    strategy_health._health.update(
+        httpx=strategy_health.StrategyHealth(open_until=now + 60),
+        cloudscraper=strategy_health.StrategyHealth(open_until=now + 30),
+    )
+    assert sofascore._chain() == ["cloudscraper", "httpx"]
+
+
+def test_hedging_starts_the_next_strategy(client, monkeypatch):
+    monkeypatch.setattr(settings, "SOFASCORE_HEDGE", True)
+    monkeypatch.setattr(settings, "SOFASCORE_HEDGE_DELAY", 0.05)
+    slow = SlowTransport(5.0)
+    _use_httpx_transport(monkeypatch, slow)
+
+    start = time.monotonic()
+    assert len(_fetch()) == 20
+    assert time.monotonic() - start < 2.0
+    assert slow.cancelled
+    assert len(_health("cloudscraper").recent) == 1
+    # The cancelled strategy isn't counted as a success or a failure.
+    assert _health("httpx").recent == [] and _health("httpx").consecutive_failures == 0
+
+
+def test_hedging_waits_for_the_median_latency(client, monkeypatch):
+    monkeypatch.setattr(settings, "SOFASCORE_HEDGE", True)
+    _use_httpx_transport(monkeypatch, SlowTransport(0.2))
+    _fetch()
+    _fetch()
+    delay = strategy_health.hedge_delay("httpx")
+    assert 0.2 <= delay < 1.0
+    # Answering within its median, httpx wins without the fallback starting.
+    assert _health("cloudscraper").recent == []
+    assert strategy_health.hedge_delay("cloudscraper") == settings.SOFASCORE_HEDGE_DELAY
+
+
+@pytest.mark.parametrize("rate", ["FORBIDDEN_RATE", "SERVER_ERROR_RATE"])
+def test_upstream_errors_use_up_the_retries(client, monkeypatch, stub, rate):
+    monkeypatch.setattr(settings, "SOFASCORE_MAX_RETRIES", 1)
+    stub.config = stub.config.model_copy(update={rate: 1.0})
+    with pytest.raises(RuntimeError, match="2 tentativas"):
+        _fetch()
+    assert stub.stats["api"] == 4  # two strategies, two attempts
+
+
+def test_state_is_saved_when_the_order_changes(client, monkeypatch):
+    writes = []
+    set_value = app_state.set_value
+
+    def counting(db, key, value):
+        if key == strategy_health.STATE_KEY:
+            writes.append(value)
+        set_value(db, key, value)
+
+    monkeypatch.setattr(app_state, "set_value", counting)
+    for _ in range(5):
+        _fetch()
+    assert len(writes) == 1
+
+    # httpx starts failing and drops behind cloudscraper: one more save.
+    _use_httpx_transport(monkeypatch, httpx.MockTransport(lambda request: httpx.Response(403)))
+    for _ in range(3):
+        _fetch()
+    assert len(writes) == 2
+    assert sofascore._chain() == ["cloudscraper", "httpx"]
+
+    # Otherwise at most every SAVE_INTERVAL.
+    monkeypatch.setattr(strategy_health, "SAVE_INTERVAL", 0.0)
+    _fetch()
+    assert len(writes) == 3
+    with SessionLocal() as db:
+        assert app_state.get_value(db, strategy_health.STATE_KEY) == writes[-1]
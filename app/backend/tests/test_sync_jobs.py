@@ -0,0 +1,95 @@
+import threading
+from datetime import timedelta
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models import AppState, SyncJob
+from app.services import app_state, sync_jobs
+from app.services.session_utils import brasilia_now
+
+
+def _hold_lock(owner: str = "live") -> bool:
+    with SessionLocal() as db:
+        return app_state.try_lock(db, sync_jobs.LOCK_KEY, owner, settings.SYNC_LOCK_TTL)
+
+
+def _release_lock(owner: str = "live") -> None:
+    with SessionLocal() as db:
+        app_state.release_lock(db, sync_jobs.LOCK_KEY, owner)
+
+
+def _add_job(**values) -> int:
+    with SessionLocal() as db:
+        job = SyncJob(source="Sync", **values)
+        db.add(job)
+        db.commit()
+        return job.id
+
+
+def test_concurrent_requests_share_one_job(client, admin_headers, wait_job, stub):
+    stub.config = stub.config.model_copy(update={"LATENCY_MS": 300})
+    first = client.post("/api/admin/sync", headers=admin_headers)
+    second = client.post("/api/admin/sync", headers=admin_headers)
+    assert first.status_code == second.status_code == 202
+    assert first.json()["status"] in sync_jobs.ACTIVE
+    assert second.json()["id"] == first.json()["id"]
+
+    job = wait_job(first.json())
+    assert job["status"] == "succeeded"
+    assert job["stage"] == "done"
+    assert job["result"]["teams_count"] == 20
+    # The lock is released with the job.
+    assert _hold_lock("test")
+
+
+def test_held_lock_skips_an_admin_sync(client, admin_headers, wait_job):
+    assert _hold_lock()
+    job = wait_job(client.post("/api/admin/sync", headers=admin_headers).json())
+    assert job["status"] == "skipped"
+    assert job["message"] == "Outro sync já está em andamento."
+    # Someone else's lock is left alone.
+    assert not _hold_lock("test")
+
+
+def test_cron_sync_waits_for_the_lock(client, wait_job, monkeypatch):
+    monkeypatch.setattr(sync_jobs, "RETRY_DELAY", 0.2)
+    assert _hold_lock()
+    releaser = threading.Timer(0.3, _release_lock)
+    releaser.start()
+    job = client.post("/api/admin/cron/sync", params={"token": settings.CRON_SECRET})
+    assert job.status_code == 202
+    job = wait_job(job.json())
+    releaser.join()
+    assert job["status"] == "succeeded"
+    assert job["attempts"] == 1
+
+
+def test_expired_lock_is_taken_over(client, run_sync):
+    assert _hold_lock("dead")
+    with SessionLocal() as db:
+        db.query(AppState).filter(AppState.key == sync_jobs.LOCK_KEY).update(
+            {"updated_at": brasilia_now() - timedelta(seconds=settings.SYNC_LOCK_TTL + 1)}
+        )
+        db.commit()
+    assert run_sync()["status"] == "succeeded"
+
+
+def test_abandoned_jobs_are_failed(client, admin_headers, wait_job):
+    stale = brasilia_now() - timedelta(seconds=settings.SYNC_LOCK_TTL + 60)
+    abandoned = _add_job(status="running", stage="fetch", updated_at=stale)
+    recent = _add_job(status="queued", updated_at=brasilia_now())
+
+    job = client.get(f"/api/admin/sync/{abandoned}", headers=admin_headers).json()
+    assert job["status"] == "failed"
+    assert job["stage"] == "done"
+    assert job["message"] == "Sync abandonado: o processo foi encerrado."
+    # A job still within the TTL is left alone, and is the one a sync joins.
+    assert client.get(f"/api/admin/sync/{recent}", headers=admin_headers).json()["status"] == "queued"
+    assert client.post("/api/admin/sync", headers=admin_headers).json()["id"] == recent
+
+    with SessionLocal() as db:
+        db.query(SyncJob).filter(SyncJob.id == recent).update({"updated_at": stale})
+        db.commit()
+    job = wait_job(client.post("/api/admin/sync", headers=admin_headers).json())
+    assert job["id"] not in (abandoned, recent)
+    assert job["status"] == "succeeded"
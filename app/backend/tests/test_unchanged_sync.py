@@ -0,0 +1,25 @@
+from app.sofascore_stub import server as stub_server
+
+
+def test_unchanged_payload_skips_the_pipeline(client, run_sync, add_apostadores, stub):
+    run_sync()
+    add_apostadores(8)
+    run_sync()  # records the session snapshot
+    teams = client.get("/api/teams").json()
+    version = client.get("/api/ranking").headers["x-data-version"]
+    badge_requests = stub.stats["badge"]
+
+    job = run_sync()
+    assert job["status"] == "succeeded"
+    assert job["result"]["unchanged"] is True
+    assert job["result"]["historico_session"] is None
+    assert "sem alterações" in job["message"]
+    assert client.get("/api/teams").json() == teams
+    assert client.get("/api/ranking").headers["x-data-version"] == version
+    assert stub.stats["badge"] == badge_requests
+
+    stub_server.advance()
+    job = run_sync()
+    assert job["result"]["unchanged"] is False
+    assert job["result"]["historico_session"]
+    assert client.get("/api/ranking").headers["x-data-version"] != version
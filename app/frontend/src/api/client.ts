@@ -1,10 +1,12 @@
 import type {
   ApostadorOut,
   ConfigOut,
+  HistoricoEvolucao,
   ImportResult,
+  RankingDelta,
   RankingResponse,
   SnapshotOut,
-  SyncResponse,
+  SyncJob,
   Team,
 } from "../types";
 
@@ -90,6 +92,11 @@ export const api = {
 
   getRanking: () => request<RankingResponse>("/ranking"),
 
+  getRankingSince: (version: string) =>
+    request<RankingDelta>(`/ranking?since=${encodeURIComponent(version)}`),
+
+  streamRanking: () => new EventSource(`${BASE}/ranking/stream`),
+
   getHistorico: (apostador?: string) => {
     const params = apostador
       ? `?apostador=${encodeURIComponent(apostador)}`
@@ -97,6 +104,9 @@ export const api = {
     return request<SnapshotOut[]>(`/historico${params}`);
   },
 
+  getHistoricoEvolucao: () =>
+    request<HistoricoEvolucao>("/historico/evolucao"),
+
   // --- Auth ---
   login: (username: string, password: string) =>
     request<{ access_token: string; token_type: string }>("/auth/login", {
@@ -108,7 +118,9 @@ export const api = {
 
   // --- Admin (protected) ---
   sync: () =>
-    authRequest<SyncResponse>("/admin/sync", { method: "POST" }),
+    authRequest<SyncJob>("/admin/sync", { method: "POST" }),
+
+  getSyncJob: (id: number) => authRequest<SyncJob>(`/admin/sync/${id}`),
 
   getConfig: () => authRequest<ConfigOut>("/admin/config"),
 };
@@ -8,7 +8,7 @@ import {
   XAxis,
   YAxis,
 } from "recharts";
-import type { SnapshotOut } from "../types";
+import type { HistoricoEvolucao } from "../types";
 
 const COLORS = [
   "#2c5aa0",
@@ -36,15 +36,17 @@ interface TooltipPayloadEntry {
 
 type SnapshotLookup = Map<string, Map<string, { pontuacao: number; rank: number }>>;
 
-function buildLookup(snapshots: SnapshotOut[]): SnapshotLookup {
+function buildLookup(data: HistoricoEvolucao): SnapshotLookup {
   const lookup: SnapshotLookup = new Map();
-  for (const s of snapshots) {
-    if (!lookup.has(s.session_date)) lookup.set(s.session_date, new Map());
-    lookup.get(s.session_date)!.set(s.apostador, {
-      pontuacao: s.pontuacao,
-      rank: s.rank,
+  data.sessions.forEach((date, i) => {
+    const session = new Map<string, { pontuacao: number; rank: number }>();
+    data.apostadores.forEach((name, j) => {
+      const pontuacao = data.pontuacao[i][j];
+      const rank = data.rank[i][j];
+      if (pontuacao != null && rank != null) session.set(name, { pontuacao, rank });
     });
-  }
+    lookup.set(date, session);
+  });
   return lookup;
 }
 
@@ -163,18 +165,18 @@ function CustomTooltip({
 }
 
 interface Props {
-  snapshots: SnapshotOut[];
+  data: HistoricoEvolucao;
   metric: "pontuacao" | "rank";
   fullscreen?: boolean;
 }
 
-export default function EvolutionChart({ snapshots, metric, fullscreen }: Props) {
+export default function EvolutionChart({ data, metric, fullscreen }: Props) {
   const [highlighted, setHighlighted] = useState<string | null>(null);
   const [showAll, setShowAll] = useState(false);
   const [hoveredLine, setHoveredLine] = useState<string | null>(null);
   const [visible, setVisible] = useState<Set<string> | null>(null);
 
-  if (snapshots.length === 0) {
+  if (data.sessions.length === 0) {
     return (
       <div className="text-center py-12 text-gray-400">
         Sem dados de histórico ainda.
@@ -182,11 +184,9 @@ export default function EvolutionChart({ snapshots, metric, fullscreen }: Props)
     );
   }
 
-  const apostadores = [...new Set(snapshots.map((s) => s.apostador))].sort(
-    (a, b) => a.localeCompare(b, "pt-BR"),
-  );
-  const sessions = [...new Set(snapshots.map((s) => s.session_date))].sort();
-  const lookup = buildLookup(snapshots);
+  const apostadores = [...data.apostadores].sort((a, b) => a.localeCompare(b, "pt-BR"));
+  const sessions = data.sessions;
+  const lookup = buildLookup(data);
 
   const lastSession = sessions[sessions.length - 1];
   const top10Names = useMemo(() => {
@@ -198,22 +198,15 @@ export default function EvolutionChart({ snapshots, metric, fullscreen }: Props)
 
   const visibleSet = visible ?? new Set(apostadores);
 
-  const rodadaByDate = new Map<string, number>();
-  for (const s of snapshots) {
-    if (!rodadaByDate.has(s.session_date) || s.rodada > rodadaByDate.get(s.session_date)!) {
-      rodadaByDate.set(s.session_date, s.rodada);
-    }
-  }
+  const rodadaByDate = new Map<string, number>(sessions.map((date, i) => [date, data.rodadas[i]]));
 
-  const chartData = sessions.map((date) => {
-    const row: Record<string, string | number> = {
-      date,
-      rodada: rodadaByDate.get(date) ?? 0,
-    };
-    const sessionSnaps = snapshots.filter((s) => s.session_date === date);
-    for (const snap of sessionSnaps) {
-      row[snap.apostador] = metric === "pontuacao" ? snap.pontuacao : snap.rank;
-    }
+  const values = metric === "pontuacao" ? data.pontuacao : data.rank;
+  const chartData = sessions.map((date, i) => {
+    const row: Record<string, string | number> = { date, rodada: data.rodadas[i] };
+    data.apostadores.forEach((name, j) => {
+      const value = values[i][j];
+      if (value != null) row[name] = value;
+    });
     return row;
   });
 
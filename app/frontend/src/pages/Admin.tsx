@@ -99,6 +99,10 @@ function LoginForm() {
   );
 }
 
+const SYNC_POLL_MS = 1500;
+// Stop waiting after this long; the job keeps running on the server.
+const SYNC_POLL_TIMEOUT_MS = 5 * 60 * 1000;
+
 function AdminPanel() {
   const { logout } = useAuth();
   const [config, setConfig] = useState<ConfigOut | null>(null);
@@ -115,8 +119,19 @@ function AdminPanel() {
     setError("");
     setSyncResult(null);
     try {
-      const result = await api.sync();
-      setSyncResult(result);
+      let job = await api.sync();
+      const deadline = Date.now() + SYNC_POLL_TIMEOUT_MS;
+      while (job.status === "queued" || job.status === "running") {
+        if (Date.now() > deadline) {
+          throw new Error("O sync está demorando; confira o resultado mais tarde.");
+        }
+        await new Promise((resolve) => setTimeout(resolve, SYNC_POLL_MS));
+        job = await api.getSyncJob(job.id);
+      }
+      if (job.status !== "succeeded" || !job.result) {
+        throw new Error(job.message || "Erro no sync.");
+      }
+      setSyncResult(job.result);
     } catch (e: unknown) {
       setError(e instanceof Error ? e.message : "Erro no sync.");
     } finally {
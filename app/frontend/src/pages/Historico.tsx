@@ -1,10 +1,25 @@
 import { useEffect, useRef, useState } from "react";
 import { api } from "../api/client";
 import EvolutionChart from "../components/EvolutionChart";
-import type { SnapshotOut } from "../types";
+import type { HistoricoEvolucao, SnapshotOut } from "../types";
+
+// Long rows for the table, by session and then rank.
+function toSnapshots(data: HistoricoEvolucao): SnapshotOut[] {
+  return data.sessions.flatMap((session_date, i) =>
+    data.apostadores
+      .flatMap((apostador, j) => {
+        const pontuacao = data.pontuacao[i][j];
+        const rank = data.rank[i][j];
+        return pontuacao != null && rank != null
+          ? [{ session_date, rodada: data.rodadas[i], apostador, pontuacao, rank }]
+          : [];
+      })
+      .sort((a, b) => a.rank - b.rank),
+  );
+}
 
 export default function Historico() {
-  const [snapshots, setSnapshots] = useState<SnapshotOut[]>([]);
+  const [evolucao, setEvolucao] = useState<HistoricoEvolucao | null>(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState("");
   const [metric, setMetric] = useState<"pontuacao" | "rank">("pontuacao");
@@ -15,8 +30,8 @@ export default function Historico() {
     setLoading(true);
     setError("");
     api
-      .getHistorico()
-      .then(setSnapshots)
+      .getHistoricoEvolucao()
+      .then(setEvolucao)
       .catch((e) => setError(e.message))
       .finally(() => setLoading(false));
   };
@@ -40,6 +55,9 @@ export default function Historico() {
       </div>
     );
 
+  if (!evolucao) return null;
+  const snapshots = toSnapshots(evolucao);
+
   return (
     <div>
       <div className="flex flex-col sm:flex-row sm:items-center justify-between gap-3 mb-4 sm:mb-6">
@@ -82,7 +100,7 @@ export default function Historico() {
       </div>
 
       <div className="bg-white dark:bg-gray-800 rounded-xl border border-gray-200 dark:border-gray-700 shadow-sm p-3 sm:p-6">
-        <EvolutionChart snapshots={snapshots} metric={metric} />
+        <EvolutionChart data={evolucao} metric={metric} />
       </div>
 
       {fullscreen && (
@@ -124,7 +142,7 @@ export default function Historico() {
             </button>
           </div>
           <div className="flex-1 p-4 sm:p-6" ref={chartContainerRef}>
-            <EvolutionChart snapshots={snapshots} metric={metric} fullscreen />
+            <EvolutionChart data={evolucao} metric={metric} fullscreen />
           </div>
         </div>
       )}
@@ -4,7 +4,7 @@ import RankingTable from "../components/RankingTable";
 import RankingCompact from "../components/RankingCompact";
 import ShareCard from "../components/ShareCard";
 import { exportRankingPdf } from "../utils/exportPdf";
-import type { RankingResponse } from "../types";
+import type { RankingDelta, RankingDiffEvent, RankingResponse, RankingVersionEvent } from "../types";
 
 type ViewMode = "compact" | "detailed";
 
@@ -62,6 +62,16 @@ function MetricsHelpModal({ onClose }: { onClose: () => void }) {
   );
 }
 
+function applyRankingDiff(data: RankingResponse, diff: RankingDiffEvent | RankingDelta): RankingResponse {
+  const removed = new Set(diff.removed);
+  const byOrdem = new Map(data.entries.map((e) => [e.ordem_inscricao, e]));
+  for (const entry of diff.changed) byOrdem.set(entry.ordem_inscricao, entry);
+  const entries = [...byOrdem.values()]
+    .filter((e) => !removed.has(e.ordem_inscricao))
+    .sort((a, b) => a.rank - b.rank);
+  return { ...data, rodada: diff.rodada, updated_at: diff.updated_at, entries };
+}
+
 export default function Ranking() {
   const [data, setData] = useState<RankingResponse | null>(null);
   const [loading, setLoading] = useState(true);
@@ -84,6 +94,40 @@ export default function Ranking() {
 
   useEffect(() => { loadData(); }, []);
 
+  useEffect(() => {
+    let version: string | null = null;
+    // Missed events (or a reconnect): catch up from the version we hold.
+    const catchUp = (from: string) =>
+      api
+        .getRankingSince(from)
+        .then((delta) =>
+          setData((d) => d && (delta.full_refresh
+            ? { ...d, rodada: delta.rodada, updated_at: delta.updated_at, entries: delta.changed }
+            : applyRankingDiff(d, delta))),
+        )
+        .catch(() => {});
+    const source = api.streamRanking();
+    source.addEventListener("version", (e) => {
+      const msg: RankingVersionEvent = JSON.parse((e as MessageEvent).data);
+      if (msg.previous !== null) return;
+      // Sent on every (re)connect; after a reconnect the server may be ahead.
+      if (version !== null && version !== msg.version) catchUp(version);
+      version = msg.version;
+    });
+    source.addEventListener("ranking-diff", (e) => {
+      const msg: RankingDiffEvent = JSON.parse((e as MessageEvent).data);
+      if (msg.previous === version) {
+        setData((d) => d && applyRankingDiff(d, msg));
+      } else if (version !== null) {
+        catchUp(version);
+      } else {
+        api.getRanking().then(setData).catch(() => {});
+      }
+      version = msg.version;
+    });
+    return () => source.close();
+  }, []);
+
   if (loading)
     return (
       <div className="flex justify-center py-20">
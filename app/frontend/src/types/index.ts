@@ -54,6 +54,29 @@ export interface RankingResponse {
   entries: RankingEntry[];
 }
 
+export interface RankingDelta {
+  version: string;
+  since: string;
+  full_refresh: boolean;
+  updated_at: string;
+  display_column: string;
+  rodada: number;
+  changed: RankingEntry[];
+  removed: number[];
+}
+
+export interface RankingVersionEvent {
+  version: string;
+  previous: string | null;
+}
+
+export interface RankingDiffEvent extends RankingVersionEvent {
+  rodada: number;
+  updated_at: string;
+  changed: RankingEntry[];
+  removed: number[];
+}
+
 export interface SnapshotOut {
   session_date: string;
   rodada: number;
@@ -62,13 +85,35 @@ export interface SnapshotOut {
   rank: number;
 }
 
+export interface HistoricoEvolucao {
+  sessions: string[];
+  rodadas: number[];
+  apostadores: string[];
+  pontuacao: (number | null)[][];
+  rank: (number | null)[][];
+}
+
 export interface SyncResponse {
   teams_count: number;
   apostadores_count: number;
   historico_session: string | null;
+  unchanged: boolean;
   message: string;
 }
 
+export interface SyncJob {
+  id: number;
+  source: string;
+  status: "queued" | "running" | "succeeded" | "failed" | "skipped";
+  stage: string;
+  attempts: number;
+  message: string;
+  result: SyncResponse | null;
+  created_at: string;
+  started_at: string | null;
+  finished_at: string | null;
+}
+
 export interface ImportResult {
   created: number;
   skipped: number;